@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Actions Output - Step outputs that may carry untrusted text
+
+Diagnoses, PR bodies and review reports quote log lines and diff lines,
+which anyone who can open a PR can influence. Multiline outputs are written
+with a random heredoc delimiter, so no line of the value can end the block
+early and inject further outputs. Workflows must still pass such outputs to
+scripts through ``env:`` rather than expanding them with ``${{ }}`` inside
+shell or JavaScript code.
+"""
+
+import secrets
+
+
+def multiline(name: str, value: str) -> str:
+    """A ``name<<delimiter`` block for $GITHUB_OUTPUT."""
+    delimiter = f'ghadelimiter_{secrets.token_hex(16)}'
+    while delimiter in value:
+        delimiter = f'ghadelimiter_{secrets.token_hex(16)}'
+    return f"{name}<<{delimiter}\n{value}\n{delimiter}\n"
+
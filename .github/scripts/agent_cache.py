@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Agent Cache - Shared location for on-disk state of the agent scripts
+
+Everything lives under one directory (``AGENT_CACHE_DIR``, default
+``.agent-cache``) so a single ``actions/cache`` step can carry it between
+workflow runs.
+"""
+
+import os
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = '.agent-cache'
+
+
+def cache_dir() -> Path:
+    """Return the cache directory, creating it if needed."""
+    path = Path(os.environ.get('AGENT_CACHE_DIR', DEFAULT_CACHE_DIR))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def cache_path(name: str) -> Path:
+    """Return the path of a named cache file inside the cache directory."""
+    return cache_dir() / name
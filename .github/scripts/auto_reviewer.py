@@ -3,19 +3,61 @@
 Auto-Reviewer - Automated PR Review System
 
 Analyzes pull requests and determines if they're safe to auto-merge.
+
+Given --head-sha, it first checks that the PR still points at that commit
+and exits with a SKIPPED verdict if a newer push superseded it.
+
+Changed files are classified with the CODEOWNERS-style rules in
+.github/review-policy (see path_policy.py). File pages are fetched as the
+analysis needs them, and it stops once the verdict can no longer change.
+With --local the changed files and line counts come from git in the PR
+checkout instead (see git_diff.py): no files API calls and no 3000-file cap.
+
+Reviews are cached per PR and head SHA (see review_cache.py): a re-run on the
+same head reuses the verdict, and after a push only the files touched since
+the cached head (compare API, or git with --local) are analyzed again.
+
+With --batch it reviews every open PR instead: a few paginated GraphQL
+queries list the PRs with their labels and changed-file stats, the PRs are
+reviewed concurrently over one client and cache, and the verdicts come out
+as one table plus a result file per PR.
+
+The added and removed lines are scanned for CRITICAL_PATTERNS (see
+diff_scanner.py); any hit sends the PR to a human, with file:line evidence.
 """
 
 import os
 import sys
 import json
 import argparse
-from typing import Dict, List, Tuple
-from github import Github
+import hashlib
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import git_diff
+import telemetry
+from actions_output import multiline
+from diff_scanner import MAX_HITS, DiffScanner, evidence
+from github_client import GitHubClient, GitHubError
+from path_policy import POLICY_FILE, PathPolicy
+from review_cache import ReviewCache
+
+
+def _patch_lines(file: Dict) -> Iterator[Tuple[str, str]]:
+    """(filename, hunk line) pairs of a files/compare API entry's patch"""
+    for line in (file.get('patch') or '').splitlines():
+        yield file['filename'], line
 
 
 class AutoReviewer:
     """Automatically review PRs for safety and quality"""
     
+    # Built-in policy, used when the repo has no .github/review-policy
     # Files that require human review
     CRITICAL_FILES = [
         'docs/SAFETY.md',
@@ -42,83 +84,352 @@ class AutoReviewer:
         '.yaml',
     ]
     
-    def __init__(self, repo_name: str, pr_number: int):
+    # Past either limit the verdict is COMMENT whatever the other files hold
+    SMALL_PR_LINES = 100
+    MAX_CRITICAL_FILES = 2
+    
+    # Past this many files touched since the cached review, review in full
+    # (the compare API lists no more than 300)
+    MAX_TOUCHED_FILES = 300
+    
+    def __init__(self, repo_name: str, pr_number: int, policy: Optional[PathPolicy] = None,
+                 local: bool = False, cache: Union[bool, ReviewCache] = True,
+                 client: Optional[GitHubClient] = None, pr: Optional[Dict] = None,
+                 files: Optional[Iterator[Dict]] = None):
         self.repo_name = repo_name
         self.pr_number = pr_number
-        self.github = Github(os.environ['GITHUB_TOKEN'])
-        self.repo = self.github.get_repo(repo_name)
-        self.pr = self.repo.get_pull(pr_number)
+        self.local = local
+        # (merge base, head) when the diff is read from git
+        self.span: Optional[Tuple[str, str]] = None
+        self.client = client or GitHubClient()
+        self.pr = pr or self.client.get_pull(repo_name, pr_number)
+        self.policy = policy or self.load_policy()
+        # Changed files already listed by the caller (batch mode), without patches
+        self.files = files
+        # A shared cache (batch mode) is saved by its owner
+        self.owns_cache = cache is True
+        self.cache: Optional[ReviewCache] = self.open_cache(self.policy) if cache is True else cache or None
+        self.cached = False
         
         # Analysis results
-        self.verdict = "COMMENT"  # APPROVE, REQUEST_CHANGES, COMMENT
+        self.verdict = "COMMENT"  # APPROVE, REQUEST_CHANGES, COMMENT, SKIPPED
         self.auto_merge = False
         self.summary = ""
         self.issues = []
         self.required_changes = []
         self.critical_files_found = []
+        self.critical_lines = []
+        # True when the analysis stopped before the last changed file
+        self.partial = False
+        self.files_reviewed = 0
+        self.lines_reviewed = 0
+    
+    @classmethod
+    def load_policy(cls) -> PathPolicy:
+        """The repo's review policy file, else the built-in lists as rules"""
+        path = os.environ.get('REVIEW_POLICY_FILE', POLICY_FILE)
+        if os.path.exists(path):
+            return PathPolicy.load(path)
+        # A pattern with a slash is a path from the root, as CRITICAL_FILES always meant
+        rules = [('*', 'critical')]
+        rules += [(f'*{suffix}', 'safe') for suffix in cls.SAFE_FILE_PATTERNS]
+        rules += [(('/' + f) if '/' in f else f, 'critical') for f in cls.CRITICAL_FILES]
+        return PathPolicy(rules)
+    
+    @classmethod
+    def config_key(cls, policy: PathPolicy) -> str:
+        """Fingerprint of everything a cached verdict depends on"""
+        config = [policy.rules, cls.CRITICAL_PATTERNS, cls.SMALL_PR_LINES, cls.MAX_CRITICAL_FILES]
+        return hashlib.sha256(json.dumps(config).encode()).hexdigest()[:16]
+    
+    @classmethod
+    def open_cache(cls, policy: PathPolicy) -> ReviewCache:
+        cache = ReviewCache(cls.config_key(policy))
+        cache.load()
+        if cache.load_error:
+            print(f"⚠️  Review cache ignored: {cache.load_error} - reviewing in full")
+        return cache
+    
+    def diff_range(self) -> Optional[Tuple[str, str]]:
+        """(merge base, head) of the PR in the local checkout, or None if it lacks them"""
+        base, head = self.pr['base'], self.pr['head']
+        try:
+            # Only the PR's own head commit: the checkout's HEAD may be a merge ref or a newer push
+            head_sha = git_diff.resolve(head['sha'])
+            base_sha = git_diff.resolve(base['sha'], f"origin/{base['ref']}", base['ref'])
+            return git_diff.merge_base(base_sha, head_sha), head_sha
+        except git_diff.GitError as e:
+            print(f"  ⚠️ Local diff unavailable ({e}), using the files API")
+            return None
+    
+    def changed_files(self) -> Iterator[Dict]:
+        """Changed files from git with --local (when the checkout allows), else as listed
+        by the caller, else from the files API"""
+        self.span = self.diff_range() if self.local else None
+        if self.span:
+            print(f"  Diff: git {self.span[0][:7]}...{self.span[1][:7]} (local checkout)")
+            return git_diff.numstat(*self.span)
+        if self.files is not None:
+            return self.files
+        return self.client.list_pull_files(self.repo_name, self.pr_number)
+    
+    def superseded(self, head_sha: str) -> bool:
+        """True when the PR's head moved past ``head_sha`` (the review would be stale)"""
+        current = self.pr['head']['sha']
+        if current == head_sha:
+            return False
+        self.verdict = "SKIPPED"
+        self.auto_merge = False
+        self.summary = (f"⏭️ Skipped: {head_sha[:7]} is no longer the head of this PR "
+                        f"(now {current[:7]}); the newer push gets its own review.")
+        return True
+    
+    def review_file(self, file: Dict) -> Dict:
+        """Policy label and size of one changed file (its hits are added by ``scan``)"""
+        filename = file['filename']
+        print(f"    Checking: {filename}")
+        record = {'label': 'critical', 'rule': None, 'changes': file['additions'] + file['deletions'],
+                  'counts': {}, 'hits': []}
+        rule = self.policy.rule_index(filename)
+        if rule < 0:
+            print("      ⚠️ No policy rule, treating as critical")
+        else:
+            record['rule'] = self.policy.rules[rule][0]
+            if self.policy.rules[rule][1] == 'safe':
+                record['label'] = 'safe'
+                print(f"      ✅ Safe file ({record['rule']})")
+            else:
+                print(f"      ⚠️ Critical file ({record['rule']})")
+        self.files_reviewed += 1
+        self.lines_reviewed += record['changes']
+        return record
+    
+    def scan(self, scanner: DiffScanner, records: Dict[str, Dict], lines: Iterable[Tuple[str, str]]):
+        """Scan (filename, hunk line) pairs, adding each file's hits to its record"""
+        for filename, group in groupby(lines, key=itemgetter(0)):
+            record = records.get(filename)
+            if record is None:
+                # Lines of a file the review has no record of must not pass unseen
+                group = list(group)
+                print(f"    ⚠️ {filename}: not among the reviewed files, treating as critical")
+                record = records[filename] = {
+                    'label': 'critical', 'rule': None, 'counts': {}, 'hits': [],
+                    'changes': sum(line[:1] in '+-' for _, line in group)}
+            kept, before = len(scanner.hits), scanner.counts.copy()
+            scanner.scan_lines(group)
+            record['hits'] = (record['hits'] + scanner.hits[kept:])[:MAX_HITS]
+            record['counts'] = dict(Counter(record['counts']) + (scanner.counts - before))
+    
+    def settled(self, critical: int, changes: int) -> bool:
+        """True once files not looked at yet cannot change the verdict"""
+        return critical > self.MAX_CRITICAL_FILES or changes >= self.SMALL_PR_LINES
+    
+    def review_files(self, scanner: DiffScanner) -> Tuple[Dict[str, Dict], bool]:
+        """Review the changed files from scratch: (records by file, whether hits were scanned)"""
+        records: Dict[str, Dict] = {}
+        critical = changes = 0
+        for file in self.changed_files():
+            record = records[file['filename']] = self.review_file(file)
+            # The files API carries each patch; git and listed files have theirs read below
+            self.scan(scanner, records, _patch_lines(file))
+            critical += record['label'] != 'safe'
+            changes += record['changes']
+            if self.settled(critical, changes):
+                break
+        
+        self.partial = len(records) < self.pr.get('changed_files', len(records))
+        if self.partial:
+            print(f"  Stopped after {len(records)} of {self.pr['changed_files']} files: "
+                  f"the verdict can no longer change")
+        if self.span:
+            lines = git_diff.diff_lines(*self.span)
+        elif self.files is not None:
+            lines = (line for file in self.client.list_pull_files(self.repo_name, self.pr_number)
+                     for line in _patch_lines(file))
+        else:
+            return records, True
+        # Only while the verdict is still open, so a settled review does not read the whole diff
+        if self.settled(critical, changes):
+            return records, False
+        self.scan(scanner, records, lines)
+        return records, True
+    
+    def review_changes(self, entry: Dict, scanner: DiffScanner) -> Optional[Tuple[Dict[str, Dict], bool]]:
+        """Re-review only the files touched since the cached review; None when a full review is needed"""
+        old_head = entry['head']
+        records = {filename: dict(record) for filename, record in entry['files'].items()}
+        scanned = entry['scanned']
+        
+        if self.local:
+            # Exact: the touched files' lines against the merge base, as a full review counts them
+            self.span = self.diff_range()
+            if not self.span or not entry.get('merge_base'):
+                return None
+            try:
+                touched = set(git_diff.changed_paths(git_diff.resolve(old_head), self.span[1]))
+                if entry['merge_base'] != self.span[0]:
+                    # The base moved: files it changed count differently now
+                    touched |= set(git_diff.changed_paths(entry['merge_base'], self.span[0]))
+            except git_diff.GitError as e:
+                print(f"  ⚠️ Cached head {old_head[:7]} not usable ({e}), reviewing in full")
+                return None
+            if len(touched) > self.MAX_TOUCHED_FILES:
+                return None
+            print(f"  Re-reviewing {len(touched)} file(s) touched since {old_head[:7]}")
+            paths = sorted(touched)
+            for path in paths:
+                records.pop(path, None)
+            if paths:
+                for file in git_diff.numstat(*self.span, paths=paths):
+                    records[file['filename']] = self.review_file(file)
+                if scanned:
+                    self.scan(scanner, records, git_diff.diff_lines(*self.span, paths=paths))
+        else:
+            # The compare API only has the new commits' lines: add them to the cached counts
+            # and hits, which can only overstate what the PR changes (never approve too much)
+            try:
+                comparison = self.client.compare(self.repo_name, old_head, self.pr['head']['sha'])
+            except GitHubError as e:
+                print(f"  ⚠️ Compare with {old_head[:7]} failed ({e}), reviewing in full")
+                return None
+            files = comparison.get('files', [])
+            if comparison.get('status') != 'ahead' or len(files) >= self.MAX_TOUCHED_FILES:
+                return None
+            print(f"  Re-reviewing {len(files)} file(s) changed since {old_head[:7]}")
+            for file in files:
+                filename = file['filename']
+                old = records.pop(file.get('previous_filename', filename), None) or records.pop(filename, None)
+                record = records[filename] = self.review_file(file)
+                if old:
+                    record['changes'] += old['changes']
+                    record['hits'], record['counts'] = old['hits'], old['counts']
+                self.scan(scanner, records, _patch_lines(file))
+        
+        # Files a partial review never saw can only add to a verdict the seen ones already settle
+        critical = sum(record['label'] != 'safe' for record in records.values())
+        changes = sum(record['changes'] for record in records.values())
+        if not self.settled(critical, changes) and (entry['partial'] or not scanned):
+            return None
+        self.partial = entry['partial']
+        return records, scanned
+    
+    def restore(self, entry: Dict):
+        """Take the verdict of a cached review"""
+        self.verdict = entry['verdict']
+        self.auto_merge = entry['auto_merge']
+        self.summary = entry['summary']
+        self.critical_files_found = entry['critical_files']
+        self.critical_lines = entry['critical_lines']
+        self.partial = entry['partial']
+        self.cached = True
+    
+    def store(self, records: Dict[str, Dict], scanned: bool):
+        """Cache this review for the PR's head SHA"""
+        if not self.cache:
+            return
+        self.cache.put(self.repo_name, self.pr_number, {
+            'head': self.pr['head']['sha'],
+            'merge_base': self.span[0] if self.span else None,
+            'partial': self.partial,
+            'scanned': scanned,
+            'files': records,
+            'verdict': self.verdict,
+            'auto_merge': self.auto_merge,
+            'summary': self.summary,
+            'critical_files': self.critical_files_found,
+            'critical_lines': self.critical_lines,
+        })
+        if self.owns_cache:
+            self.cache.save()
     
     def analyze(self) -> bool:
         """Analyze the PR and determine verdict"""
-        print(f"🔍 Analyzing PR #{self.pr_number}: {self.pr.title}")
+        print(f"🔍 Analyzing PR #{self.pr_number}: {self.pr['title']}")
         
         try:
             # Get PR details
-            files_changed = list(self.pr.get_files())
-            labels = [label.name for label in self.pr.labels]
+            labels = [label['name'] for label in self.pr['labels']]
+            head_sha = self.pr['head']['sha']
             
-            print(f"  Files changed: {len(files_changed)}")
+            print(f"  Files changed: {self.pr.get('changed_files', 'unknown')}")
             print(f"  Labels: {', '.join(labels)}")
             
+            # Same head as the last review: nothing to do
+            entry = self.cache.get(self.repo_name, self.pr_number) if self.cache else None
+            if entry and entry['head'] == head_sha:
+                self.restore(entry)
+                telemetry.get().count('review_cache', 1, 'Reviews by cache use', result='hit')
+                print(f"  Cached review of {head_sha[:7]}: {self.verdict}")
+                return True
+            
             # Check 1: Is this an automated fix?
             is_automated = any(label in labels for label in ['automated-fix', 'workflow-doctor'])
             
-            # Check 2: Analyze changed files
-            critical_files = []
-            safe_files = []
-            
-            for file in files_changed:
-                filename = file.filename
-                print(f"    Checking: {filename}")
-                
-                # Check if critical file
-                is_critical = any(critical in filename for critical in self.CRITICAL_FILES)
-                if is_critical:
-                    critical_files.append(filename)
-                    print(f"      ⚠️ Critical file detected")
-                elif any(filename.endswith(pattern) for pattern in self.SAFE_FILE_PATTERNS):
-                    safe_files.append(filename)
-                    print(f"      ✅ Safe file")
-                else:
-                    critical_files.append(filename)
-                    print(f"      ⚠️ Unknown file type, treating as critical")
+            # Check 2: Analyze changed files (and Check 4: size, Check 5: critical lines),
+            # only those touched since the cached review when there is one
+            scanner = DiffScanner(self.CRITICAL_PATTERNS)
+            reviewed = self.review_changes(entry, scanner) if entry else None
+            telemetry.get().count('review_cache', 1, 'Reviews by cache use',
+                                  result='incremental' if reviewed else 'full')
+            if reviewed is None:
+                if entry:
+                    print(f"  Cached review of {entry['head'][:7]} not reusable, reviewing in full")
+                scanner = DiffScanner(self.CRITICAL_PATTERNS)
+                reviewed = self.review_files(scanner)
+            records, scanned = reviewed
             
+            critical_files = [f for f, record in records.items() if record['label'] != 'safe']
+            safe_files = [f for f, record in records.items() if record['label'] == 'safe']
+            docs_only = all(f.endswith('.md') for f in records)
+            total_changes = sum(record['changes'] for record in records.values())
             self.critical_files_found = critical_files
             
+            # Check 5: Critical patterns in the changed lines
+            hit_counts: Counter = Counter()
+            for record in records.values():
+                hit_counts.update(record['counts'])
+            hit_total = sum(hit_counts.values())
+            hits = [hit for record in records.values() for hit in record['hits']]
+            self.critical_lines = evidence(hits[:MAX_HITS], hit_total)
+            
             # Check 3: Analyze PR content for critical patterns
             critical_patterns_found = []
-            pr_body = self.pr.body or ""
-            pr_title = self.pr.title or ""
+            pr_body = self.pr['body'] or ""
+            pr_title = self.pr['title'] or ""
             
             for pattern in self.CRITICAL_PATTERNS:
                 if pattern.lower() in pr_body.lower() or pattern.lower() in pr_title.lower():
                     critical_patterns_found.append(pattern)
             
             # Check 4: Size check (small PRs are safer)
-            total_changes = sum(f.additions + f.deletions for f in files_changed)
-            is_small = total_changes < 100
+            is_small = total_changes < self.SMALL_PR_LINES
+            at_least = 'at least ' if self.partial else ''
+            telemetry.get().count('files_reviewed', self.files_reviewed, 'Changed files examined')
+            telemetry.get().count('lines_reviewed', self.lines_reviewed, 'Changed lines examined')
+            telemetry.get().count('critical_lines', hit_total, 'Changed lines matching critical patterns')
             
             print(f"\n  Analysis:")
             print(f"    Automated: {is_automated}")
             print(f"    Critical files: {len(critical_files)}")
             print(f"    Safe files: {len(safe_files)}")
             print(f"    Critical patterns: {len(critical_patterns_found)}")
+            print(f"    Critical lines: {hit_total} ({scanner.lines_scanned} changed lines scanned this run)")
+            for line in self.critical_lines:
+                print(f"      ⚠️ {line}")
             print(f"    Total changes: {total_changes} lines")
             print(f"    Is small: {is_small}")
             
             # Decision logic - More permissive for productivity
             
+            # TIER 0: Changed lines touch critical code = Human review, however small
+            if hit_total:
+                self.verdict = "COMMENT"
+                self.auto_merge = False
+                self.summary = f"⚠️ Changed lines touch critical code ({', '.join(sorted(hit_counts))}: {hit_total} line(s)). Please review carefully before merging."
+                print("\n  Verdict: 💬 COMMENT (critical patterns in the diff)")
+            
             # TIER 1: Safe + Small = Auto-merge
-            if len(critical_files) == 0 and is_small and len(safe_files) > 0:
+            elif len(critical_files) == 0 and is_small and len(safe_files) > 0:
                 self.verdict = "APPROVE"
                 self.auto_merge = True
                 self.summary = f"✅ Safe changes: {len(safe_files)} documentation/config files, {total_changes} lines. Auto-merging."
@@ -132,31 +443,31 @@ class AutoReviewer:
                 print(f"\n  Verdict: ✅ APPROVE (manual merge recommended)")
             
             # TIER 3: Documentation only = Fast approve + auto-merge
-            elif all(f.endswith('.md') for f in [file.filename for file in files_changed]) and is_small:
+            elif docs_only and is_small:
                 self.verdict = "APPROVE"
                 self.auto_merge = True
                 self.summary = f"✅ Documentation changes only ({total_changes} lines). Safe to auto-merge."
                 print(f"\n  Verdict: ✅ APPROVE + AUTO-MERGE (docs only)")
             
             # TIER 4: Critical files but small = Approve, no auto-merge
-            elif len(critical_files) <= 2 and is_small:
+            elif len(critical_files) <= self.MAX_CRITICAL_FILES and is_small:
                 self.verdict = "APPROVE"
                 self.auto_merge = False
                 self.summary = f"✅ Small changes to {len(critical_files)} critical file(s). Approved, but please review and merge manually."
                 print(f"\n  Verdict: ✅ APPROVE (critical files, manual merge)")
             
             # TIER 5: Too many critical files = Human review
-            elif len(critical_files) > 2:
+            elif len(critical_files) > self.MAX_CRITICAL_FILES:
                 self.verdict = "COMMENT"
                 self.auto_merge = False
-                self.summary = f"⚠️ Multiple critical files modified ({len(critical_files)} files). Please review carefully before merging."
+                self.summary = f"⚠️ Multiple critical files modified ({at_least}{len(critical_files)} files). Please review carefully before merging."
                 print(f"\n  Verdict: 💬 COMMENT (too many critical files)")
             
             # TIER 6: Too large = Human review
             elif not is_small:
                 self.verdict = "COMMENT"
                 self.auto_merge = False
-                self.summary = f"⚠️ Large PR ({total_changes} lines changed). Please review carefully before merging."
+                self.summary = f"⚠️ Large PR ({at_least}{total_changes} lines changed). Please review carefully before merging."
                 print(f"\n  Verdict: 💬 COMMENT (too large)")
             
             # DEFAULT: Approve but manual merge (be helpful, not blocking)
@@ -166,6 +477,7 @@ class AutoReviewer:
                 self.summary = f"✅ Changes look safe but manual merge recommended for caution."
                 print(f"\n  Verdict: ✅ APPROVE (manual merge)")
             
+            self.store(records, scanned)
             return True
             
         except Exception as e:
@@ -175,22 +487,33 @@ class AutoReviewer:
             self.summary = f"⚠️ Analysis error: {str(e)}. Manual review required."
             return False
     
+    def results(self) -> Dict:
+        """The review's outcome; each list is rendered as markdown bullets"""
+        return {
+            'number': self.pr_number,
+            'head_sha': self.pr['head']['sha'],
+            'verdict': self.verdict,
+            'auto_merge': self.auto_merge,
+            'cached': self.cached,
+            'summary': self.summary,
+            'critical_files': '\n'.join([f"- `{f}`" for f in self.critical_files_found]) or "None",
+            'critical_lines': '\n'.join([f"- {line}" for line in self.critical_lines]) or "None",
+            'issues': '\n'.join([f"- {i}" for i in self.issues]) or "None",
+            'required_changes': '\n'.join([f"- {c}" for c in self.required_changes]) or "None",
+        }
+    
     def output_results(self):
         """Output results in GitHub Actions format"""
-        # Prepare outputs
-        critical_files_str = '\n'.join([f"- `{f}`" for f in self.critical_files_found]) or "None"
-        issues_str = '\n'.join([f"- {i}" for i in self.issues]) or "None"
-        required_changes_str = '\n'.join([f"- {c}" for c in self.required_changes]) or "None"
+        results = self.results()
         
         # Write to GITHUB_OUTPUT
         if 'GITHUB_OUTPUT' in os.environ:
             with open(os.environ['GITHUB_OUTPUT'], 'a') as f:
                 f.write(f"verdict={self.verdict}\n")
                 f.write(f"auto_merge={str(self.auto_merge).lower()}\n")
-                f.write(f"summary={self.summary}\n")
-                f.write(f"critical_files<<EOF\n{critical_files_str}\nEOF\n")
-                f.write(f"issues<<EOF\n{issues_str}\nEOF\n")
-                f.write(f"required_changes<<EOF\n{required_changes_str}\nEOF\n")
+                f.write(multiline('summary', self.summary))
+                for name in ('critical_files', 'critical_lines', 'issues', 'required_changes'):
+                    f.write(multiline(name, results[name]))
         
         # Also print for debugging
         print(f"\n📊 Results:")
@@ -199,28 +522,276 @@ class AutoReviewer:
         print(f"  Summary: {self.summary}")
 
 
+# Batch mode: open PRs per GraphQL page (with their first files), concurrent reviews
+# (bounded by the client's connection pool)
+BATCH_PAGE_SIZE = 50
+BATCH_FILES = 100
+BATCH_WORKERS = 4
+
+OPEN_PULLS_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $after: String, $files: Int!) {
+  rateLimit { cost remaining }
+  repository(owner: $owner, name: $name) {
+    pullRequests(states: OPEN, first: $first, after: $after,
+                 orderBy: {field: CREATED_AT, direction: ASC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number title body isDraft changedFiles
+        headRefOid headRefName baseRefOid baseRefName
+        labels(first: 50) { nodes { name } }
+        files(first: $files) {
+          pageInfo { hasNextPage endCursor }
+          nodes { path additions deletions changeType }
+        }
+      }
+    }
+  }
+}
+"""
+
+PULL_FILES_QUERY = """
+query($owner: String!, $name: String!, $number: Int!, $after: String, $files: Int!) {
+  rateLimit { cost remaining }
+  repository(owner: $owner, name: $name) {
+    pullRequest(number: $number) {
+      files(first: $files, after: $after) {
+        pageInfo { hasNextPage endCursor }
+        nodes { path additions deletions changeType }
+      }
+    }
+  }
+}
+"""
+
+
+class ReviewBatch:
+    """Review every open PR from a few GraphQL queries on a bounded worker pool
+    
+    One paginated query lists the open PRs with their labels and first page of
+    changed-file stats; a PR with more files pages on only while its verdict
+    is open. Patches are not in GraphQL, so a PR the stats leave open fetches
+    them from the files API before it can be approved. Reviews share one
+    client, policy and review cache, so a PR whose head was already reviewed
+    costs no calls at all.
+    """
+    
+    def __init__(self, repo_name: str, workers: int = BATCH_WORKERS, drafts: bool = False,
+                 cache: bool = True, limit: Optional[int] = None):
+        self.repo_name = repo_name
+        self.owner, self.name = repo_name.split('/', 1)
+        self.workers = max(1, workers)
+        self.include_drafts = drafts
+        self.limit = limit
+        self.client = GitHubClient()
+        self.policy = AutoReviewer.load_policy()
+        self.cache = AutoReviewer.open_cache(self.policy) if cache else None
+        self._lock = threading.Lock()
+        
+        # Results
+        self.points = 0
+        self.drafts: List[int] = []
+        self.reviewers: List[AutoReviewer] = []
+        self.failed: List[Dict] = []
+    
+    def _query(self, query: str, endpoint: str, **variables) -> Dict:
+        data = self.client.graphql(query, endpoint=endpoint, owner=self.owner, name=self.name,
+                                   files=BATCH_FILES, **variables)
+        with self._lock:
+            self.points += data['rateLimit']['cost']
+        return data['repository']
+    
+    @staticmethod
+    def _pull(node: Dict) -> Dict:
+        """A GraphQL PR node shaped like the REST pull the reviewer reads"""
+        return {
+            'number': node['number'],
+            'title': node['title'],
+            'body': node['body'],
+            'draft': node['isDraft'],
+            'changed_files': node['changedFiles'],
+            'labels': node['labels']['nodes'],
+            'head': {'sha': node['headRefOid'], 'ref': node['headRefName']},
+            'base': {'sha': node['baseRefOid'], 'ref': node['baseRefName']},
+        }
+    
+    def _files(self, number: int, connection: Dict) -> Iterator[Dict]:
+        """A PR's changed files as files API entries, the next page queried only when reached"""
+        while True:
+            for node in connection['nodes']:
+                yield {
+                    'filename': node['path'],
+                    'status': node['changeType'].lower(),
+                    'additions': node['additions'],
+                    'deletions': node['deletions'],
+                    'changes': node['additions'] + node['deletions'],
+                }
+            if not connection['pageInfo']['hasNextPage']:
+                return
+            connection = self._query(PULL_FILES_QUERY, 'pull_files', number=number,
+                                     after=connection['pageInfo']['endCursor'])['pullRequest']['files']
+    
+    def open_pulls(self) -> List[Tuple[Dict, Iterator[Dict]]]:
+        """(pull, changed files) for each open PR, oldest first; drafts are skipped unless asked for"""
+        pulls = []
+        after = None
+        while self.limit is None or len(pulls) < self.limit:
+            page = self._query(OPEN_PULLS_QUERY, 'open_pulls', first=BATCH_PAGE_SIZE,
+                               after=after)['pullRequests']
+            for node in page['nodes']:
+                if node['isDraft'] and not self.include_drafts:
+                    self.drafts.append(node['number'])
+                    continue
+                pulls.append((self._pull(node), self._files(node['number'], node['files'])))
+            if not page['pageInfo']['hasNextPage']:
+                break
+            after = page['pageInfo']['endCursor']
+        return pulls[:self.limit]
+    
+    def _review(self, item: Tuple[Dict, Iterator[Dict]]) -> Optional[AutoReviewer]:
+        pr, files = item
+        reviewer = AutoReviewer(self.repo_name, pr['number'], policy=self.policy,
+                                cache=self.cache or False, client=self.client, pr=pr, files=files)
+        if not reviewer.analyze():
+            self.failed.append({'pr': pr, 'error': reviewer.summary})
+            return None
+        return reviewer
+    
+    def run(self) -> List[AutoReviewer]:
+        """Review the open PRs; returns the reviewers in PR order"""
+        pulls = self.open_pulls()
+        print(f"🗂️  {len(pulls)} open PRs to review ({len(self.drafts)} drafts skipped)")
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            self.reviewers = [r for r in pool.map(self._review, pulls) if r]
+        if self.cache:
+            self.cache.save()
+        return self.reviewers
+    
+    def report(self) -> str:
+        """One markdown verdict table for the whole sweep"""
+        verdicts = Counter(r.verdict for r in self.reviewers)
+        cached = sum(r.cached for r in self.reviewers)
+        lines = ["## 🤖 Auto-Reviewer sweep of open PRs", '',
+                 f"**Reviewed**: {len(self.reviewers)} ({cached} unchanged since their last review) · " +
+                 ' · '.join(f"**{verdict}**: {count}" for verdict, count in sorted(verdicts.items())) +
+                 f" · **GraphQL points**: {self.points}", '']
+        if self.reviewers:
+            lines += ['| PR | Head | Verdict | Auto-merge | Summary |', '|---|---|---|---|---|']
+        for reviewer in self.reviewers:
+            lines.append(f"| #{reviewer.pr_number} {reviewer.pr['title'].replace('|', '/')} | "
+                         f"`{reviewer.pr['head']['sha'][:7]}`{' (cached)' if reviewer.cached else ''} | "
+                         f"{reviewer.verdict} | {'yes' if reviewer.auto_merge else 'no'} | "
+                         f"{reviewer.summary.replace('|', '/')} |")
+        if self.drafts:
+            lines += ['', "Drafts skipped: " + ', '.join(f"#{n}" for n in self.drafts)]
+        if self.failed:
+            lines += ['', "⚠️ Could not review: " + ', '.join(
+                f"#{f['pr']['number']} ({f['error']})" for f in self.failed)]
+        return '\n'.join(lines) + '\n'
+    
+    def output_results(self, output_dir: Optional[str] = None):
+        """Print the table and hand it to Actions; with ``output_dir``, one JSON result per PR"""
+        text = self.report()
+        print(text)
+        if output_dir:
+            out = Path(output_dir)
+            out.mkdir(parents=True, exist_ok=True)
+            for reviewer in self.reviewers:
+                (out / f"pr-{reviewer.pr_number}.json").write_text(json.dumps(reviewer.results(), indent=2))
+        if 'GITHUB_STEP_SUMMARY' in os.environ:
+            with open(os.environ['GITHUB_STEP_SUMMARY'], 'a') as f:
+                f.write(text)
+        if 'GITHUB_OUTPUT' in os.environ:
+            verdicts = [{key: r.results()[key] for key in ('number', 'head_sha', 'verdict', 'auto_merge', 'cached')}
+                        for r in self.reviewers]
+            with open(os.environ['GITHUB_OUTPUT'], 'a') as f:
+                f.write(f"reviewed={len(self.reviewers)}\n")
+                f.write(f"failed={len(self.failed)}\n")
+                f.write(f"verdicts={json.dumps(verdicts, separators=(',', ':'))}\n")
+                f.write(multiline('report', text))
+
+
+def run_batch(args):
+    """--batch: review every open PR and report once"""
+    tel = telemetry.start('auto_reviewer_batch')
+    print("🤖 Auto-Reviewer sweep starting...")
+    print(f"  Repository: {args.repo}")
+    print()
+    
+    batch = ReviewBatch(args.repo, workers=args.workers, drafts=args.drafts,
+                        cache=not args.no_cache, limit=args.limit)
+    tel.phase('review')
+    try:
+        reviewers = batch.run()
+    except GitHubError as e:
+        print(f"❌ Could not list open PRs: {e}")
+        sys.exit(1)
+    
+    tel.phase('output')
+    for reviewer in reviewers:
+        tel.count('reviews', 1, 'Reviews by verdict', verdict=reviewer.verdict)
+    tel.count('batch_pulls', len(batch.failed), 'Open PRs in the sweep', outcome='failed')
+    tel.count('batch_pulls', len(batch.drafts), 'Open PRs in the sweep', outcome='draft')
+    tel.count('graphql_points', batch.points, 'GraphQL rate limit points used')
+    batch.output_results(args.output_dir)
+    
+    batch.client.print_summary()
+    print("✅ Auto-Reviewer sweep completed")
+
+
 def main():
     parser = argparse.ArgumentParser(description='Auto-Reviewer - Automated PR review')
     parser.add_argument('--repo', required=True, help='Repository name (owner/repo)')
-    parser.add_argument('--pr-number', required=True, type=int, help='Pull request number')
+    parser.add_argument('--pr-number', type=int, help='Pull request number')
+    parser.add_argument('--head-sha', help='Commit this review is for; skip if the PR has moved on')
+    parser.add_argument('--local', action='store_true',
+                        help='Read changed files from the git checkout instead of the files API')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Review from scratch instead of reusing the cached review of this PR')
+    batch = parser.add_argument_group('batch mode')
+    batch.add_argument('--batch', action='store_true',
+                       help='Review every open PR (verdicts are reported, not posted)')
+    batch.add_argument('--workers', type=int,
+                       default=int(os.environ.get('REVIEWER_WORKERS', BATCH_WORKERS)),
+                       help=f'PRs reviewed at the same time (default: {BATCH_WORKERS})')
+    batch.add_argument('--drafts', action='store_true', help='Review draft PRs too')
+    batch.add_argument('--limit', type=int, help='Review at most this many PRs (oldest first)')
+    batch.add_argument('--output-dir', help='Write each PR\'s result to <dir>/pr-<number>.json')
     
     args = parser.parse_args()
+    if args.batch:
+        run_batch(args)
+        return
+    if not args.pr_number:
+        parser.error('--pr-number is required (or use --batch)')
+    tel = telemetry.start('auto_reviewer')
     
     print("🤖 Auto-Reviewer Starting...")
     print(f"  Repository: {args.repo}")
     print(f"  PR Number: {args.pr_number}")
     print()
     
-    reviewer = AutoReviewer(args.repo, args.pr_number)
+    tel.phase('fetch')
+    reviewer = AutoReviewer(args.repo, args.pr_number, local=args.local, cache=not args.no_cache)
+    
+    if args.head_sha and reviewer.superseded(args.head_sha):
+        print(reviewer.summary)
+        tel.count('reviews', 1, 'Reviews by verdict', verdict=reviewer.verdict)
+        reviewer.output_results()
+        reviewer.client.print_summary()
+        return
     
     # Analyze the PR
+    tel.phase('analyze')
     if not reviewer.analyze():
         print("❌ Analysis failed")
         sys.exit(1)
     
     # Output results
+    tel.phase('output')
+    tel.count('reviews', 1, 'Reviews by verdict', verdict=reviewer.verdict)
     reviewer.output_results()
     
+    reviewer.client.print_summary()
     print("\n✅ Auto-Reviewer completed")
 
 
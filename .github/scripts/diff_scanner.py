@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Diff Scanner - Critical patterns in the added and removed lines of a PR
+
+The reviewer's CRITICAL_PATTERNS (``emergency_stop``, ``GPIO``, ``UV``...)
+used to be checked against the PR title and body only, so a PR that edited
+``emergency_stop`` logic without saying so looked harmless. DiffScanner runs
+the changed lines of every patch through one Aho-Corasick automaton, so all
+patterns are found in a single pass over each line, and records each hit
+with its file, line number and side (added/removed) as review evidence.
+
+Matching respects word boundaries: a hit must not be glued to other letters
+or digits (``_``, ``.`` and the like separate words, and a number may follow,
+as in ``GPIO17``). All-caps patterns such as ``UV`` are case-sensitive, so
+``uvicorn`` or ``fluvial`` never match; the others ignore case.
+
+Lines are consumed one at a time and only the first ``max_hits`` hits are
+kept (plus per-pattern counts), so memory stays bounded on huge patches.
+"""
+
+import re
+from collections import Counter, deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Hits kept as evidence; the rest are only counted
+MAX_HITS = 50
+
+# Characters of a matched line kept in its evidence
+EVIDENCE_CHARS = 160
+
+HUNK = re.compile(r'^@@ -(\d+)(?:,\d+)? \+(\d+)(?:,\d+)? @@')
+
+
+class PatternAutomaton:
+    """Aho-Corasick automaton over lower-cased patterns"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = list(dict.fromkeys(patterns))
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[int]] = [[]]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern.lower():
+                following = self.goto[state].get(char)
+                if following is None:
+                    following = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[state][char] = following
+                state = following
+            self.out[state].append(index)
+
+        # Failure links, breadth first: the longest proper suffix that is also a prefix
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in self.goto[state].items():
+                queue.append(following)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[following] = target if target != following else 0
+                self.out[following] = self.out[following] + self.out[self.fail[following]]
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int]]:
+        """``(pattern index, start)`` of every occurrence in ``text`` (ignoring case)."""
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters lower-case to two; keep positions aligned with ``text``
+            lowered = ''.join(char.lower()[:1] for char in text)
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for position, char in enumerate(lowered):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in out[state]:
+                yield index, position - len(self.patterns[index]) + 1
+
+
+class DiffScanner:
+    """Find critical patterns in patch lines, keeping bounded evidence"""
+
+    def __init__(self, patterns: Iterable[str], max_hits: int = MAX_HITS):
+        self.automaton = PatternAutomaton(patterns)
+        self.case_sensitive = [p.isupper() for p in self.automaton.patterns]
+        self.max_hits = max_hits
+        self.hits: List[Dict] = []
+        self.counts: Counter = Counter()
+        self.lines_scanned = 0
+        # Position in the file being scanned
+        self._file: Optional[str] = None
+        self._old = self._new = 0
+
+    def matches(self, text: str) -> List[str]:
+        """Patterns found in ``text`` as whole words (each reported once)."""
+        found = []
+        for index, start in self.automaton.finditer(text):
+            pattern = self.automaton.patterns[index]
+            end = start + len(pattern)
+            if self.case_sensitive[index] and text[start:end] != pattern:
+                continue
+            if start > 0 and text[start - 1].isalnum():
+                continue
+            if end < len(text) and text[end].isalpha():
+                continue
+            if pattern not in found:
+                found.append(pattern)
+        return found
+
+    def scan_line(self, filename: str, line: str):
+        """Scan one hunk line; ``@@`` headers set the line numbers that follow."""
+        if filename != self._file:
+            self._file, self._old, self._new = filename, 0, 0
+        if line.startswith('@@'):
+            hunk = HUNK.match(line)
+            if hunk:
+                self._old, self._new = int(hunk.group(1)), int(hunk.group(2))
+            return
+        if line.startswith('+'):
+            side, number = 'added', self._new
+            self._new += 1
+        elif line.startswith('-'):
+            side, number = 'removed', self._old
+            self._old += 1
+        elif line.startswith('\\'):
+            # "\ No newline at end of file"
+            return
+        else:
+            self._old += 1
+            self._new += 1
+            return
+        self.lines_scanned += 1
+        for pattern in self.matches(line[1:]):
+            self.counts[pattern] += 1
+            if len(self.hits) < self.max_hits:
+                self.hits.append({
+                    'file': filename,
+                    'line': number,
+                    'side': side,
+                    'pattern': pattern,
+                    'text': line[1:].strip()[:EVIDENCE_CHARS].replace('`', "'"),
+                })
+
+    def scan_patch(self, filename: str, patch: Optional[str]):
+        """Scan one file's patch as the files API returns it."""
+        for line in (patch or '').splitlines():
+            self.scan_line(filename, line)
+
+    def scan_lines(self, items: Iterable[Tuple[str, str]]):
+        """Scan a stream of ``(filename, hunk line)`` pairs."""
+        for filename, line in items:
+            self.scan_line(filename, line)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def evidence(self) -> List[str]:
+        """One line per kept hit, for review comments."""
+        return evidence(self.hits, self.total)
+
+
+def evidence(hits: List[Dict], total: int) -> List[str]:
+    """One line per hit (``total`` counts the ones not kept too)."""
+    lines = [f"`{h['pattern']}` {h['side']} at `{h['file']}:{h['line']}`: `{h['text']}`"
+             for h in hits]
+    if total > len(hits):
+        lines.append(f"... and {total - len(hits)} more")
+    return lines
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Failure Archive - Searchable history of failing-step log excerpts
+
+GitHub expires run logs; the doctor keeps an excerpt of every failing step
+(matched lines with context, plus the tail) so past failures stay
+searchable. Excerpts are appended as independent gzip members to segment
+files, and a SQLite inverted index maps each token to the excerpts that
+contain it, so a query reads the index and decompresses only the excerpts
+it returns:
+
+    python .github/scripts/failure_archive.py query "ModuleNotFoundError yaml"
+    python .github/scripts/failure_archive.py compact --keep-days 180
+"""
+
+import argparse
+import gzip
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from agent_cache import cache_path
+
+ARCHIVE_DIR = 'failure-archive'
+
+# Start a new segment file once the current one reaches this size
+SEGMENT_BYTES = 16 * 1024 * 1024
+
+# Compact a segment when less than this share of it is still referenced
+COMPACT_LIVE_RATIO = 0.5
+
+DEFAULT_KEEP_DAYS = 180
+
+# Tail lines of each failing step kept in its excerpt
+EXCERPT_TAIL_LINES = 100
+
+# Words of 2+ characters; identifiers such as ModuleNotFoundError stay whole
+TOKEN = re.compile(r'[a-z0-9_]{2,64}')
+
+# Actions line timestamps; not worth indexing
+LINE_TIMESTAMP = re.compile(r'^\ufeff?\d{4}-\d\d-\d\dT[\d:.]+Z ', re.M)
+
+
+def tokens(text: str) -> set:
+    return set(TOKEN.findall(LINE_TIMESTAMP.sub('', text).lower()))
+
+
+class FailureArchive:
+    """Append-only gzip segments plus an inverted token index"""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.dir = Path(directory or cache_path(ARCHIVE_DIR))
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.dir / 'index.sqlite'), check_same_thread=False)
+        self._segment: Optional[Path] = None
+        self._db.executescript('''
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS excerpts (
+                id INTEGER PRIMARY KEY,
+                run_id INTEGER,
+                workflow TEXT,
+                head_sha TEXT,
+                job TEXT,
+                step TEXT,
+                issue_type TEXT,
+                signature TEXT,
+                created REAL,
+                segment TEXT,
+                offset INTEGER,
+                length INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS excerpts_created ON excerpts (created);
+            CREATE INDEX IF NOT EXISTS excerpts_run ON excerpts (run_id);
+            CREATE TABLE IF NOT EXISTS tokens (
+                id INTEGER PRIMARY KEY,
+                token TEXT UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                token INTEGER,
+                excerpt INTEGER,
+                PRIMARY KEY (token, excerpt)
+            ) WITHOUT ROWID;
+        ''')
+        self._db.commit()
+
+    # -- Writing --------------------------------------------------------
+
+    def _current_segment(self) -> Path:
+        if self._segment is None or not self._segment.exists():
+            segments = sorted(self.dir.glob('segment-*.gz'))
+            self._segment = segments[-1] if segments else self.dir / 'segment-000001.gz'
+        if self._segment.exists() and self._segment.stat().st_size >= SEGMENT_BYTES:
+            number = int(self._segment.stem.split('-')[1]) + 1
+            self._segment = self.dir / f'segment-{number:06d}.gz'
+        return self._segment
+
+    def add(self, text: str, run_id: int, job: str, step: str, workflow: str = '',
+            head_sha: str = '', issue_type: str = '', signature: str = '') -> int:
+        """Append one excerpt and index its tokens; returns its id."""
+        blob = gzip.compress(text.encode(), compresslevel=6)
+        with self._lock:
+            if self._db.execute('SELECT 1 FROM excerpts WHERE run_id = ? AND job = ? AND step = ?',
+                                (run_id, job, step)).fetchone():
+                return 0
+            segment = self._current_segment()
+            with open(segment, 'ab') as f:
+                offset = f.tell()
+                f.write(blob)
+            cursor = self._db.execute(
+                'INSERT INTO excerpts (run_id, workflow, head_sha, job, step, issue_type, signature, '
+                'created, segment, offset, length) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (run_id, workflow, head_sha, job, step, issue_type, signature, time.time(),
+                 segment.name, offset, len(blob)))
+            excerpt = cursor.lastrowid
+            words = [(word,) for word in tokens(text)]
+            self._db.executemany('INSERT OR IGNORE INTO tokens (token) VALUES (?)', words)
+            self._db.executemany(
+                'INSERT OR IGNORE INTO postings SELECT id, ? FROM tokens WHERE token = ?',
+                ((excerpt, word) for (word,) in words))
+            self._db.commit()
+        return excerpt
+
+    # -- Reading --------------------------------------------------------
+
+    def read(self, row: Dict) -> str:
+        """Decompress one excerpt."""
+        with open(self.dir / row['segment'], 'rb') as f:
+            f.seek(row['offset'])
+            return gzip.decompress(f.read(row['length'])).decode('utf-8', errors='replace')
+
+    def query(self, text: str, limit: int = 20, since: float = 0.0) -> List[Dict]:
+        """Excerpts containing every token of ``text``, newest first."""
+        wanted = sorted(tokens(text))
+        if not wanted:
+            return []
+        marks = ','.join('?' * len(wanted))
+        rows = self._db.execute(f'''
+            SELECT e.id, e.run_id, e.workflow, e.head_sha, e.job, e.step, e.issue_type,
+                   e.signature, e.created, e.segment, e.offset, e.length
+            FROM excerpts e JOIN (
+                SELECT p.excerpt FROM postings p JOIN tokens t ON t.id = p.token
+                WHERE t.token IN ({marks})
+                GROUP BY p.excerpt HAVING COUNT(*) = ?
+            ) hits ON hits.excerpt = e.id
+            WHERE e.created >= ?
+            ORDER BY e.created DESC
+            LIMIT ?
+        ''', (*wanted, len(wanted), since, limit)).fetchall()
+        keys = ['id', 'run_id', 'workflow', 'head_sha', 'job', 'step', 'issue_type',
+                'signature', 'created', 'segment', 'offset', 'length']
+        return [dict(zip(keys, row)) for row in rows]
+
+    def snippet(self, row: Dict, text: str, limit: int = 3) -> List[str]:
+        """Lines of an excerpt that contain any query token."""
+        wanted = tokens(text)
+        lines = [line for line in self.read(row).splitlines() if tokens(line) & wanted]
+        # A matched line usually reappears in the tail
+        return list(dict.fromkeys(lines))[:limit]
+
+    # -- Maintenance ----------------------------------------------------
+
+    def stats(self) -> Dict:
+        count, oldest, newest = self._db.execute(
+            'SELECT COUNT(*), MIN(created), MAX(created) FROM excerpts').fetchone()
+        disk = sum(p.stat().st_size for p in self.dir.glob('segment-*.gz'))
+        return {
+            'excerpts': count,
+            'runs': self._db.execute('SELECT COUNT(DISTINCT run_id) FROM excerpts').fetchone()[0],
+            'tokens': self._db.execute('SELECT COUNT(DISTINCT token) FROM postings').fetchone()[0],
+            'oldest': oldest,
+            'newest': newest,
+            'segment_bytes': disk,
+            'index_bytes': (self.dir / 'index.sqlite').stat().st_size,
+        }
+
+    def compact(self, keep_days: float = DEFAULT_KEEP_DAYS) -> Dict:
+        """Drop excerpts older than ``keep_days`` and rewrite mostly-dead segments."""
+        cutoff = time.time() - keep_days * 86400
+        with self._lock:
+            expired = self._db.execute('DELETE FROM excerpts WHERE created < ?', (cutoff,)).rowcount
+            if expired:
+                # One pass over the postings rather than a lookup per expired excerpt
+                self._db.execute('DELETE FROM postings WHERE excerpt NOT IN (SELECT id FROM excerpts)')
+                # Words only the expired excerpts used would otherwise stay in the index forever
+                self._db.execute('DELETE FROM tokens WHERE id NOT IN (SELECT token FROM postings)')
+            self._db.commit()
+
+            live = dict(self._db.execute(
+                'SELECT segment, SUM(length) FROM excerpts GROUP BY segment').fetchall())
+            rewritten = 0
+            reclaimed = 0
+            segments = sorted(self.dir.glob('segment-*.gz'))
+            for path in segments:
+                size = path.stat().st_size
+                used = live.get(path.name, 0)
+                if used == 0:
+                    path.unlink()
+                    reclaimed += size
+                elif used < size * COMPACT_LIVE_RATIO and path != segments[-1]:
+                    reclaimed += size - self._rewrite(path)
+                    rewritten += 1
+
+            self._db.execute('VACUUM')
+        return {'expired': expired, 'rewritten': rewritten, 'bytes_reclaimed': reclaimed}
+
+    def _rewrite(self, path: Path) -> int:
+        """Copy a segment's live excerpts into a fresh file (lock held); returns its size."""
+        rows = self._db.execute('SELECT id, offset, length FROM excerpts WHERE segment = ? '
+                                'ORDER BY offset', (path.name,)).fetchall()
+        tmp = path.with_suffix('.tmp')
+        moved = []
+        with open(path, 'rb') as src, open(tmp, 'wb') as dst:
+            for excerpt, offset, length in rows:
+                src.seek(offset)
+                moved.append((dst.tell(), excerpt))
+                dst.write(src.read(length))
+            size = dst.tell()
+        os.replace(tmp, path)
+        self._db.executemany('UPDATE excerpts SET offset = ? WHERE id = ?', moved)
+        self._db.commit()
+        return size
+
+    def close(self):
+        self._db.close()
+
+
+def excerpt_text(tail: Iterable[str], matches: Iterable[Dict]) -> str:
+    """Render matched lines (with context) followed by the step's tail."""
+    parts = []
+    for match in matches:
+        parts.append('\n'.join(match['before'] + [match['text']] + match['after']))
+        parts.append('...')
+    parts.append('\n'.join(tail))
+    return '\n'.join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Failure archive - search past CI failure logs')
+    sub = parser.add_subparsers(dest='command', required=True)
+    query = sub.add_parser('query', help='Find past failures containing all the given words')
+    query.add_argument('text')
+    query.add_argument('--limit', type=int, default=20)
+    query.add_argument('--days', type=float, help='Only look this far back')
+    query.add_argument('--show', action='store_true', help='Print matching lines of each excerpt')
+    compact = sub.add_parser('compact', help='Apply retention and compact segments')
+    compact.add_argument('--keep-days', type=float, default=DEFAULT_KEEP_DAYS)
+    sub.add_parser('stats', help='Archive size and date range')
+    args = parser.parse_args()
+
+    archive = FailureArchive()
+    if args.command == 'query':
+        started = time.perf_counter()
+        since = time.time() - args.days * 86400 if args.days else 0.0
+        rows = archive.query(args.text, limit=args.limit, since=since)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"🔎 {len(rows)} matching excerpts ({elapsed:.1f} ms)")
+        for row in rows:
+            when = time.strftime('%Y-%m-%d %H:%M', time.gmtime(row['created']))
+            print(f"  {when}  run {row['run_id']}  {row['workflow']} / {row['job']} / {row['step']}"
+                  f"  [{row['issue_type'] or 'unknown'}]  {row['head_sha'][:7]}")
+            if args.show:
+                for line in archive.snippet(row, args.text):
+                    print(f"      {line[:160]}")
+    elif args.command == 'compact':
+        result = archive.compact(args.keep_days)
+        print(f"🧹 Expired {result['expired']} excerpts, rewrote {result['rewritten']} segments, "
+              f"reclaimed {result['bytes_reclaimed']} bytes")
+    else:
+        stats = archive.stats()
+        for key, value in stats.items():
+            if key in ('oldest', 'newest') and value:
+                value = time.strftime('%Y-%m-%d', time.gmtime(value))
+            print(f"  {key}: {value}")
+
+
+if __name__ == '__main__':
+    main()
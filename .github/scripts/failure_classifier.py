@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Failure Classifier - One-pass, ranked matching of failure patterns
+
+Compiles a whole pattern table (category -> regexes) once, and screens each
+log line with a single combined search: one alternation of the literal
+keyword every pattern requires (e.g. ``modulenotfounderror``), run
+case-sensitively on the lower-cased line, plus one alternation of any
+patterns that have no such keyword. Only the rare lines that pass are tried
+against the individual case-insensitive regexes, so every pattern that hits
+is recorded (an alternation alone reports one alternative per position).
+Categories are then ranked by weighted evidence instead of "first pattern in
+dict order wins".
+
+Pattern tables look like ``WorkflowDoctor.FAILURE_PATTERNS``; a pattern is a
+regex string or ``{'pattern': ..., 'weight': ..., 'keyword': ...}``, and a
+category may carry its own ``weight`` (0 keeps its lines as evidence without
+ever winning). Tables can be extended from a JSON or YAML file with the same
+shape, e.g.::
+
+    oom:
+      weight: 2
+      auto_fixable: false
+      patterns:
+        - Killed signal terminated program
+        - {pattern: 'exit code 137', weight: 3}
+
+A category the table already has is overridden key by key: the file's
+``patterns`` replace the built-in ones, other keys stay unless the file sets
+them.
+"""
+
+import hashlib
+import json
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Evidence (summed weight) at which a lone category is reported with full confidence
+CONFIDENT_SCORE = 3.0
+
+# Evidence snippets returned by classify()
+TOP_EVIDENCE = 5
+
+# Shortest literal worth using as a prefilter keyword
+MIN_KEYWORD = 3
+
+
+def required_literal(pattern: str) -> Optional[str]:
+    """The longest literal every match of ``pattern`` must contain (lower-cased).
+
+    Returns None for patterns too complex to analyse safely (alternation,
+    groups, classes, optional parts); those are tried on every line.
+    """
+    pieces = []
+    current = ''
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == '\\':
+            escaped = pattern[i + 1:i + 2]
+            if escaped and not escaped.isalnum():
+                current += escaped
+            else:
+                # \s, \d, \b, ... end a literal run
+                pieces.append(current)
+                current = ''
+            i += 2
+            continue
+        if c in '|()[]{}?':
+            return None
+        if c in '.^$':
+            pieces.append(current)
+            current = ''
+        elif c in '*+':
+            # The quantified character is optional (*) or of unknown count (+)
+            pieces.append(current[:-1] if c == '*' else current)
+            current = ''
+        else:
+            current += c
+        i += 1
+    pieces.append(current)
+    best = max(pieces, key=len)
+    return best.lower() if len(best) >= MIN_KEYWORD else None
+
+
+def load_table(path: str) -> Dict[str, Dict]:
+    """Read a pattern table from a JSON or YAML file."""
+    with open(path) as f:
+        if path.endswith(('.yml', '.yaml')):
+            import yaml
+            table = yaml.safe_load(f)
+        else:
+            table = json.load(f)
+    if not isinstance(table, dict):
+        raise ValueError(f"{path}: expected a mapping of categories")
+    return table
+
+
+def merge_tables(base: Dict[str, Dict], extra: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Overlay ``extra`` on ``base`` key by key: a category in ``extra`` overrides only
+    the keys it sets (a ``patterns`` list replaces the built-in list, while e.g.
+    ``fix_function`` is kept unless given)."""
+    merged = {name: dict(config) for name, config in base.items()}
+    for name, config in extra.items():
+        merged[name] = {**merged.get(name, {}), **(config or {})}
+    return merged
+
+
+def table_key(table: Dict[str, Dict]) -> str:
+    """Fingerprint of a pattern table; classifications are only reused under the same one."""
+    return hashlib.sha256(json.dumps(table, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class FailureClassifier:
+    """Scores failure categories from log lines using a compiled pattern table"""
+
+    def __init__(self, table: Dict[str, Dict]):
+        self.table = table
+        self.patterns: List[Tuple[str, str, float]] = []  # (category, regex, weight)
+        self.compiled = []
+        self.pattern_keywords: List[Optional[str]] = []
+        unkeyed = []
+
+        for category, config in table.items():
+            category_weight = float(config.get('weight', 1.0))
+            for entry in config.get('patterns') or []:
+                if isinstance(entry, str):
+                    entry = {'pattern': entry}
+                regex = entry['pattern']
+                self.patterns.append((category, regex, category_weight * float(entry.get('weight', 1.0))))
+                self.compiled.append(re.compile(regex, re.IGNORECASE))
+
+                keyword = entry.get('keyword') or required_literal(regex)
+                self.pattern_keywords.append(keyword.lower() if keyword else None)
+                if not keyword:
+                    unkeyed.append(f'(?:{regex})')
+
+        keywords = sorted({k for k in self.pattern_keywords if k}, key=len, reverse=True)
+        self.keywords = re.compile('|'.join(re.escape(k) for k in keywords) or r'(?!)')
+        self.unkeyed = re.compile('|'.join(unkeyed), re.IGNORECASE) if unkeyed else None
+
+    @classmethod
+    def from_file(cls, path: str, base: Optional[Dict[str, Dict]] = None) -> 'FailureClassifier':
+        return cls(merge_tables(base or {}, load_table(path)))
+
+    def match_line(self, line: str) -> List[Tuple[str, int]]:
+        """All ``(category, pattern index)`` hits in one line (empty if none)."""
+        lower = line.lower()
+        if not self.keywords.search(lower) and not (self.unkeyed and self.unkeyed.search(line)):
+            return []
+        return [(self.patterns[index][0], index)
+                for index, regex in enumerate(self.compiled)
+                if (self.pattern_keywords[index] or '') in lower and regex.search(line)]
+
+    def classify(self, matches: Iterable[Dict], top: int = TOP_EVIDENCE) -> Dict:
+        """Rank categories over matched lines (dicts with a ``labels`` hit list).
+
+        Repeats of the same pattern add logarithmically, so one noisy line
+        repeated a thousand times does not drown out a single precise error.
+        Confidence is the top category's share of all evidence, discounted
+        while its score is below CONFIDENT_SCORE.
+        """
+        matches = [m for m in matches if m.get('labels')]
+        per_pattern = Counter(index for m in matches for _, index in m['labels'])
+
+        scores: Dict[str, float] = {}
+        for index, count in per_pattern.items():
+            category, _, weight = self.patterns[index]
+            scores[category] = scores.get(category, 0.0) + weight * (1 + math.log2(count))
+
+        ranked = sorted(((score, name) for name, score in scores.items() if score > 0), reverse=True)
+        if not ranked:
+            return {'category': None, 'confidence': 0.0, 'scores': scores,
+                    'evidence': matches[-top:]}
+
+        best_score, best = ranked[0]
+        total = sum(score for score, _ in ranked)
+        confidence = best_score / total * min(1.0, best_score / CONFIDENT_SCORE)
+
+        def strength(item):
+            position, match = item
+            weight = max(self.patterns[i][2] for c, i in match['labels'] if c == best)
+            return weight, position
+
+        evidence = sorted(((n, m) for n, m in enumerate(matches)
+                           if any(c == best for c, _ in m['labels'])), key=strength, reverse=True)
+        return {
+            'category': best,
+            'confidence': round(confidence, 3),
+            'scores': {name: round(score, 3) for score, name in ranked},
+            'evidence': [m for _, m in evidence[:top]],
+        }
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Failure Signatures - Remembered diagnoses for repeat CI failures
+
+A signature is a hash of the tail of every failing step with the parts that
+change from run to run masked out (timestamps, SHAs, absolute paths,
+numbers). The store maps each signature to the diagnosis it received and
+to what happened when a fix was attempted, so a failure seen before is
+classified with one indexed lookup instead of a full pattern scan. A
+diagnosis is only reused under the pattern table that produced it (stored
+as a hash); after the table changes, the failure is classified again.
+
+Every sighting is also recorded per run, which gives the recurrence report:
+
+    python .github/scripts/failure_signatures.py report --days 30
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from agent_cache import cache_path
+
+STORE_FILE = 'failure-signatures.sqlite'
+
+# Masks applied in order; each turns a volatile token into a placeholder
+MASKS = [
+    (re.compile(r'^\ufeff?\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?Z ?'), ''),
+    (re.compile(r'\b\d{4}-\d\d-\d\d[T ]\d\d:\d\d:\d\d(?:\.\d+)?(?:Z|[+-]\d\d:?\d\d)?'), '<time>'),
+    (re.compile(r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b', re.I), '<uuid>'),
+    (re.compile(r'\b(?=[0-9a-f]*\d)[0-9a-f]{7,64}\b'), '<sha>'),
+    # Absolute paths (runner work dirs, temp dirs); relative paths such as test ids stay
+    (re.compile(r'(?:[A-Za-z]:\\|(?<![\w.])/)[^\s:\'",)]+'), '<path>'),
+    (re.compile(r'\d+(?:\.\d+)*'), '<n>'),
+]
+
+# Lines that say nothing about the failure itself
+NOISE = re.compile(r'^(?:##\[(?:group|endgroup)\]|\s*$)')
+
+# Distinct commits a signature must fail on before the report calls it recurring
+RECURRING_SHAS = 3
+
+
+def normalize_line(line: str) -> str:
+    """Mask the run-specific parts of a log line."""
+    line = line.rstrip('\r\n')
+    for pattern, placeholder in MASKS:
+        line = pattern.sub(placeholder, line)
+    return line.strip()
+
+
+def signature(tails: Iterable[Tuple[Dict, List[str]]]) -> Tuple[str, List[str]]:
+    """Signature of a run from its failing steps' tails; returns ``(hash, normalized lines)``."""
+    normalized = []
+    for source, lines in sorted(tails, key=lambda item: (item[0]['job'], item[0]['step'])):
+        normalized.append(f"# {normalize_line(source['job'])} / {normalize_line(source['step'])}")
+        for line in lines:
+            masked = normalize_line(line)
+            if not NOISE.match(masked):
+                normalized.append(masked)
+    digest = hashlib.sha256('\n'.join(normalized).encode()).hexdigest()[:32]
+    return digest, normalized
+
+
+class SignatureStore:
+    """SQLite map of failure signature -> diagnosis, fix outcome and sightings"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or str(cache_path(STORE_FILE))
+        # One connection shared by the doctor's worker threads
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS signatures (
+                signature TEXT PRIMARY KEY,
+                issue_type TEXT,
+                confidence REAL,
+                diagnosis TEXT,
+                recommendations TEXT,
+                evidence TEXT,
+                sample TEXT,
+                first_seen REAL,
+                last_seen REAL,
+                fix_attempts INTEGER DEFAULT 0,
+                fix_successes INTEGER DEFAULT 0,
+                last_fix TEXT,
+                patterns TEXT
+            );
+            CREATE TABLE IF NOT EXISTS sightings (
+                signature TEXT,
+                run_id INTEGER,
+                workflow TEXT,
+                head_sha TEXT,
+                seen_at REAL,
+                PRIMARY KEY (signature, run_id)
+            );
+            CREATE INDEX IF NOT EXISTS sightings_seen ON sightings (seen_at);
+        ''')
+        columns = {row[1] for row in self._db.execute('PRAGMA table_info(signatures)')}
+        if 'patterns' not in columns:
+            # Stores from before the column: their diagnoses match no table and are redone
+            self._db.execute('ALTER TABLE signatures ADD COLUMN patterns TEXT')
+        self._db.commit()
+
+    def lookup(self, digest: str, patterns: str = '') -> Optional[Dict]:
+        """The diagnosis stored for a signature under the pattern table ``patterns``, or None."""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT issue_type, confidence, diagnosis, recommendations, evidence, '
+                'fix_attempts, fix_successes, last_fix FROM signatures '
+                'WHERE signature = ? AND patterns = ?', (digest, patterns)).fetchone()
+        if not row or not row[0]:
+            return None
+        return {
+            'issue_type': row[0],
+            'confidence': row[1],
+            'diagnosis': row[2],
+            'recommendations': json.loads(row[3] or '[]'),
+            'evidence': json.loads(row[4] or '[]'),
+            'fix_attempts': row[5],
+            'fix_successes': row[6],
+            'last_fix': row[7],
+        }
+
+    def record(self, digest: str, sample: List[str], issue_type: Optional[str] = None,
+               confidence: float = 0.0, diagnosis: str = '', recommendations: Iterable[str] = (),
+               evidence: Iterable[Dict] = (), patterns: str = ''):
+        """Store (or refresh) the diagnosis for a signature, made with pattern table ``patterns``."""
+        now = time.time()
+        with self._lock:
+            self._db.execute('''
+                INSERT INTO signatures (signature, issue_type, confidence, diagnosis, recommendations,
+                                        evidence, sample, first_seen, last_seen, patterns)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (signature) DO UPDATE SET
+                    issue_type = excluded.issue_type, confidence = excluded.confidence,
+                    diagnosis = excluded.diagnosis, recommendations = excluded.recommendations,
+                    evidence = excluded.evidence, last_seen = excluded.last_seen,
+                    patterns = excluded.patterns
+            ''', (digest, issue_type, confidence, diagnosis, json.dumps(list(recommendations)),
+                  json.dumps(list(evidence)), '\n'.join(sample), now, now, patterns))
+            self._db.commit()
+
+    def sighting(self, digest: str, run_id: int, workflow: str = '', head_sha: str = ''):
+        """Record that ``run_id`` failed with this signature."""
+        now = time.time()
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO sightings VALUES (?, ?, ?, ?, ?)',
+                             (digest, int(run_id), workflow, head_sha, now))
+            self._db.execute('UPDATE signatures SET last_seen = ? WHERE signature = ?', (now, digest))
+            self._db.commit()
+
+    def record_fix(self, digest: str, succeeded: bool, note: str = ''):
+        """Remember the outcome of an auto-fix for this signature."""
+        with self._lock:
+            self._db.execute('''
+                UPDATE signatures SET fix_attempts = fix_attempts + 1,
+                    fix_successes = fix_successes + ?, last_fix = ?
+                WHERE signature = ?
+            ''', (1 if succeeded else 0, note or ('applied' if succeeded else 'failed'), digest))
+            self._db.commit()
+
+    def find(self, prefix: str) -> Optional[Dict]:
+        """The stored entry whose signature starts with ``prefix``."""
+        row = self._db.execute('SELECT signature, issue_type, sample FROM signatures '
+                               'WHERE signature LIKE ?', (prefix + '%',)).fetchone()
+        if not row:
+            return None
+        return {'signature': row[0], 'issue_type': row[1] or 'unknown', 'sample': row[2]}
+
+    def stats(self, since: float = 0.0) -> List[Dict]:
+        """Per-signature sighting counts since ``since``, most frequent first."""
+        rows = self._db.execute('''
+            SELECT s.signature, g.issue_type, COUNT(*), COUNT(DISTINCT s.head_sha),
+                   COUNT(DISTINCT s.workflow), MIN(s.seen_at), MAX(s.seen_at),
+                   g.fix_attempts, g.fix_successes, g.sample
+            FROM sightings s LEFT JOIN signatures g ON g.signature = s.signature
+            WHERE s.seen_at >= ?
+            GROUP BY s.signature
+            ORDER BY COUNT(*) DESC, MAX(s.seen_at) DESC
+        ''', (since,)).fetchall()
+        return [{
+            'signature': row[0],
+            'issue_type': row[1] or 'unknown',
+            'occurrences': row[2],
+            'commits': row[3],
+            'workflows': row[4],
+            'first_seen': row[5],
+            'last_seen': row[6],
+            'fix_attempts': row[7] or 0,
+            'fix_successes': row[8] or 0,
+            'recurring': row[3] >= RECURRING_SHAS,
+            'headline': _headline(row[9] or ''),
+        } for row in rows]
+
+    def close(self):
+        self._db.close()
+
+
+def _headline(sample: str) -> str:
+    """The most telling line of a stored sample (an error line if there is one)."""
+    lines = [line for line in sample.split('\n') if line and not line.startswith('# ')]
+    for line in reversed(lines):
+        if re.search(r'error|failed|exception', line, re.I) and not line.startswith('##[error]Process'):
+            return line[:120]
+    return (lines[-1] if lines else '')[:120]
+
+
+def report(store: SignatureStore, days: float, min_occurrences: int = 2) -> str:
+    """Markdown table of repeat failures, most frequent first."""
+    rows = [r for r in store.stats(since=time.time() - days * 86400)
+            if r['occurrences'] >= min_occurrences]
+    lines = [f"## 🔁 Repeat CI failures (last {days:g} days)", '']
+    if not rows:
+        return '\n'.join(lines + ['No failure seen more than once.']) + '\n'
+    lines += ['| Signature | Type | Runs | Commits | Fixes (ok/tried) | Last seen | Failure |',
+              '|---|---|---:|---:|---:|---|---|']
+    for r in rows:
+        flag = ' 🔁' if r['recurring'] else ''
+        last = time.strftime('%Y-%m-%d', time.gmtime(r['last_seen']))
+        lines.append(f"| `{r['signature'][:10]}`{flag} | {r['issue_type']} | {r['occurrences']} | "
+                     f"{r['commits']} | {r['fix_successes']}/{r['fix_attempts']} | {last} | "
+                     f"`{r['headline'].replace('|', '/')}` |")
+    lines += ['', f"🔁 = failed on {RECURRING_SHAS}+ different commits (likely flaky or unfixed)"]
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Failure signature store')
+    sub = parser.add_subparsers(dest='command', required=True)
+    rep = sub.add_parser('report', help='Print repeat failures as markdown')
+    rep.add_argument('--days', type=float, default=30)
+    rep.add_argument('--min-occurrences', type=int, default=2)
+    show = sub.add_parser('show', help='Print the stored entry for a signature')
+    show.add_argument('signature')
+    args = parser.parse_args()
+
+    store = SignatureStore()
+    if args.command == 'report':
+        print(report(store, args.days, args.min_occurrences))
+    else:
+        entry = store.find(args.signature)
+        if not entry:
+            print(f"❌ No signature {args.signature}")
+        else:
+            print(f"{entry['signature']} ({entry['issue_type']})\n\n{entry['sample']}")
+
+
+if __name__ == '__main__':
+    main()
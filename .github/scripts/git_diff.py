@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Git Diff - A PR's changed files and patches from the local checkout
+
+The files API returns 100 files per call and nothing past 3000. When the PR
+is checked out with history, the same information comes from git: the merge
+base of the base branch and the head, ``git diff --numstat`` for per-file
+line counts and ``git diff`` for the patches (or their lines, one at a time),
+with no API calls and no size limit. All are read as streams, so a caller
+that stops early stops git too, and all can be limited to some paths.
+
+    base = merge_base('origin/main', 'HEAD')
+    for file in numstat(base, 'HEAD'):
+        print(file['filename'], file['additions'], file['deletions'])
+"""
+
+import subprocess
+from itertools import groupby
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Rename detection, as the files API does
+DIFF_OPTIONS = ['--find-renames', '--no-color', '--no-ext-diff']
+
+
+class GitError(Exception):
+    """A git command failed or the revisions are not in this checkout"""
+
+
+def _git(*args: str) -> str:
+    try:
+        result = subprocess.run(['git', *args], capture_output=True, check=True)
+    except OSError as e:
+        raise GitError(f"git unavailable: {e}")
+    except subprocess.CalledProcessError as e:
+        raise GitError(f"git {args[0]} failed: {e.stderr.decode(errors='replace').strip()}")
+    return result.stdout.decode('utf-8', errors='replace').strip()
+
+
+def _stream(*args: str) -> Iterator[bytes]:
+    """Stdout of a git command in chunks; the process is stopped if the caller stops reading."""
+    try:
+        process = subprocess.Popen(['git', *args], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        raise GitError(f"git unavailable: {e}")
+    finished = False
+    try:
+        for chunk in iter(lambda: process.stdout.read(65536), b''):
+            yield chunk
+        finished = True
+    finally:
+        if not finished:
+            process.kill()
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        if process.wait() != 0 and finished:
+            raise GitError(f"git {args[0]} failed: {stderr.decode(errors='replace').strip()}")
+
+
+def resolve(*candidates: Optional[str]) -> str:
+    """The commit SHA of the first candidate revision this checkout has."""
+    for revision in candidates:
+        if not revision:
+            continue
+        try:
+            return _git('rev-parse', '--verify', '--quiet', f'{revision}^{{commit}}')
+        except GitError:
+            continue
+    raise GitError(f"none of {', '.join(c for c in candidates if c)} is in this checkout")
+
+
+def merge_base(base: str, head: str = 'HEAD') -> str:
+    return _git('merge-base', base, head)
+
+
+def changed_paths(base: str, head: str = 'HEAD') -> List[str]:
+    """Paths that differ between two commits (both sides of a rename)."""
+    output = _git('diff', '--name-only', '-z', '--no-renames', base, head, '--')
+    return [path for path in output.split('\0') if path]
+
+
+def numstat(base: str, head: str = 'HEAD', paths: Iterable[str] = ()) -> Iterator[Dict]:
+    """Changed files with line counts, shaped like entries of the files API."""
+    pending = b''
+    fields: List[str] = []
+    for chunk in _stream('diff', '--numstat', '-z', *DIFF_OPTIONS, base, head, '--', *paths):
+        pending += chunk
+        *items, pending = pending.split(b'\0')
+        for item in items:
+            fields.append(item.decode('utf-8', errors='replace'))
+            entry = _numstat_entry(fields)
+            if entry:
+                fields = []
+                yield entry
+
+
+def _numstat_entry(fields: List[str]) -> Optional[Dict]:
+    # "<added>\t<deleted>\t<path>" or, for a rename, "<added>\t<deleted>\t" "<old>" "<new>"
+    added, deleted, path = fields[0].split('\t', 2)
+    if not path and len(fields) < 3:
+        return None
+    binary = added == '-'
+    additions = 0 if binary else int(added)
+    deletions = 0 if binary else int(deleted)
+    entry = {
+        'filename': path or fields[2],
+        'status': 'renamed' if not path else 'modified',
+        'additions': additions,
+        'deletions': deletions,
+        'changes': additions + deletions,
+    }
+    if not path:
+        entry['previous_filename'] = fields[1]
+    if binary:
+        entry['binary'] = True
+    return entry
+
+
+# Escapes git uses in quoted names besides \ooo octal bytes
+C_ESCAPES = {'a': 7, 'b': 8, 't': 9, 'n': 10, 'v': 11, 'f': 12, 'r': 13, '"': 34, '\\': 92}
+
+
+def unquote(name: str) -> str:
+    """A path as git prints it in diff headers, C-quoted or not, as numstat -z gives it."""
+    if not (len(name) > 1 and name.startswith('"') and name.endswith('"')):
+        return name
+    raw = bytearray()
+    text = name[1:-1]
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char != '\\' or i + 1 == len(text):
+            raw += char.encode('utf-8')
+            i += 1
+        elif text[i + 1] in C_ESCAPES:
+            raw.append(C_ESCAPES[text[i + 1]])
+            i += 2
+        else:
+            # Non-ASCII and control bytes: \303\251 is the UTF-8 of "é"
+            raw.append(int(text[i + 1:i + 4], 8) & 0xFF)
+            i += 4
+    return raw.decode('utf-8', errors='replace')
+
+
+def _header_path(line: str, prefix: str) -> Optional[str]:
+    # Git ends names containing spaces with a tab and C-quotes unusual ones
+    name = unquote(line[4:].rstrip('\t'))
+    return name[len(prefix):] if name.startswith(prefix) else None
+
+
+def diff_lines(base: str, head: str = 'HEAD', paths: Iterable[str] = ()) -> Iterator[Tuple[str, str]]:
+    """``(filename, line)`` for every hunk line of the diff (``@@`` headers included), streamed."""
+    buffer = b''
+    current: Optional[str] = None
+    in_hunks = False
+    for chunk in _stream('diff', *DIFF_OPTIONS, base, head, '--', *paths):
+        buffer += chunk
+        *complete, buffer = buffer.split(b'\n')
+        for raw in complete:
+            line = raw.decode('utf-8', errors='replace')
+            if line.startswith('diff --git '):
+                current, in_hunks = None, False
+            elif line.startswith('+++ ') and not in_hunks:
+                # "+++ b/<path>" (or /dev/null for a deleted file, named by its "--- a/" line)
+                current = _header_path(line, 'b/') or current
+            elif line.startswith('--- ') and not in_hunks and current is None:
+                current = _header_path(line, 'a/')
+            elif current is not None and (in_hunks or line.startswith('@@')):
+                in_hunks = True
+                yield current, line
+    if buffer and current is not None and in_hunks:
+        yield current, buffer.decode('utf-8', errors='replace')
+
+
+def patches(base: str, head: str = 'HEAD') -> Iterator[Tuple[str, str]]:
+    """``(filename, patch)`` per changed file; the patch starts at its first ``@@`` hunk."""
+    for filename, lines in groupby(diff_lines(base, head), key=lambda item: item[0]):
+        yield filename, '\n'.join(line for _, line in lines)
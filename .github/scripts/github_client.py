@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+GitHub Client - Shared, pooled REST client for the agent scripts
+
+One keep-alive ``requests`` session per process, with timeouts, throttling
+and retries handled in one place (see rate_limit.py). ``requests`` is only
+imported when the first request is made, so scripts that exit early never
+pay for it. Only the REST calls the agent scripts actually use are exposed;
+responses are plain dicts straight from the API.
+
+The API root comes from ``GITHUB_API_URL`` (set by Actions, and pointing at
+GitHub Enterprise or a local stand-in when needed); GraphQL queries go to
+``GITHUB_GRAPHQL_URL``, or the matching endpoint next to it. GETs go through the
+on-disk ETag cache in http_cache.py unless ``AGENT_HTTP_CACHE=0``.
+"""
+
+import os
+import time
+from collections import Counter
+from typing import Dict, Iterator, List, Optional
+
+import telemetry
+from http_cache import DEFAULT_MAX_BYTES, HttpCache
+from rate_limit import RateLimiter
+
+DEFAULT_API_URL = 'https://api.github.com'
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5, 30)
+
+DEFAULT_RETRIES = 4
+DEFAULT_PER_PAGE = 100
+
+# Connection pool size; enough for the small worker pools the scripts use
+POOL_SIZE = 8
+
+# Read size when streaming downloads
+DOWNLOAD_CHUNK = 256 * 1024
+
+
+class GitHubError(Exception):
+    """A GitHub API request that failed for good"""
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict] = None):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+    @property
+    def unknown_outcome(self) -> bool:
+        """True when a write may have taken effect anyway (transport error or 5xx)"""
+        return self.status == 0 or self.status >= 500
+
+
+class GitHubClient:
+    """Minimal GitHub REST client shared by orchestrator, reviewer and doctor"""
+
+    def __init__(self, token: Optional[str] = None, base_url: Optional[str] = None,
+                 timeout=DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES,
+                 limiter: Optional[RateLimiter] = None, per_page: int = DEFAULT_PER_PAGE,
+                 cache: Optional[HttpCache] = None):
+        self.token = token if token is not None else os.environ.get('GITHUB_TOKEN', '')
+        self.base_url = (base_url or os.environ.get('GITHUB_API_URL') or DEFAULT_API_URL).rstrip('/')
+        self.timeout = timeout
+        self.retries = retries
+        self.limiter = limiter or RateLimiter()
+        self.per_page = per_page
+        self._session = None
+
+        if cache is None and os.environ.get('AGENT_HTTP_CACHE', '1') != '0':
+            try:
+                max_mb = float(os.environ.get('AGENT_HTTP_CACHE_MB', DEFAULT_MAX_BYTES / 1024 / 1024))
+                cache = HttpCache(max_bytes=int(max_mb * 1024 * 1024))
+            except Exception as e:
+                print(f"⚠️  HTTP cache disabled: {e}")
+        self.cache = cache
+
+        # Measurements for the end-of-run summary
+        self.created_at = time.monotonic()
+        self.requests_by_endpoint: Counter = Counter()
+        self.retry_count = 0
+        self.bytes_received = 0
+        self.request_time = 0.0
+        telemetry.get().add_client(self)
+
+    @property
+    def session(self):
+        """The shared keep-alive session, created on first use."""
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update({
+                'Accept': 'application/vnd.github+json',
+                'X-GitHub-Api-Version': '2022-11-28',
+                'User-Agent': 'autonomous-loop-agent',
+            })
+            if self.token:
+                session.headers['Authorization'] = f'Bearer {self.token}'
+            self._session = session
+        return self._session
+
+    def _url(self, path: str) -> str:
+        return path if path.startswith('http') else f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method: str, path: str, endpoint: Optional[str] = None,
+                write: Optional[bool] = None, idempotent: Optional[bool] = None, **kwargs):
+        """Send a request, throttled and retried; returns the response.
+
+        ``endpoint`` names the call in the request counters (defaults to the path).
+        ``write`` (default: any method but GET/HEAD) spaces requests out as writes.
+        Only ``idempotent`` requests (default: GET/HEAD/PUT/DELETE) are retried
+        after a transport error or 5xx; others raise GitHubError with
+        ``unknown_outcome`` set, since GitHub may have handled them.
+        """
+        import requests
+
+        if write is None:
+            write = method.upper() not in ('GET', 'HEAD')
+        if idempotent is None:
+            idempotent = method.upper() in ('GET', 'HEAD', 'PUT', 'DELETE')
+        kwargs.setdefault('timeout', self.timeout)
+        url = self._url(path)
+        attempt = 0
+
+        cache_key = None
+        if self.cache and method.upper() == 'GET' and not kwargs.get('stream'):
+            cache_key = requests.Request('GET', url, params=kwargs.get('params')).prepare().url
+            kwargs['headers'] = {**kwargs.get('headers', {}), **self.cache.validators(cache_key)}
+
+        while True:
+            self.limiter.acquire(write)
+            self.requests_by_endpoint[f"{method.upper()} {endpoint or path}"] += 1
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.request_time += time.monotonic() - started
+                if attempt >= self.retries or not idempotent:
+                    raise GitHubError(0, f"{method} {url} failed: {e}")
+                delay = min(2 ** attempt, self.limiter.max_backoff)
+            else:
+                self.request_time += time.monotonic() - started
+                if not kwargs.get('stream'):
+                    self.bytes_received += len(response.content)
+                self.limiter.observe(response.headers)
+                if response.status_code == 304 and cache_key:
+                    cached = self.cache.hit(cache_key)
+                    if cached:
+                        return _cached_response(url, *cached)
+                    # Entry evicted since the validators were read: ask again unconditionally
+                    kwargs['headers'] = {name: value for name, value in kwargs['headers'].items()
+                                         if not name.startswith('If-')}
+                    continue
+                if response.status_code < 400:
+                    if cache_key and response.status_code == 200:
+                        self.cache.store(cache_key, response.headers, response.content)
+                    return response
+
+                message = _error_message(response)
+                delay = self.limiter.retry_delay(response.status_code, response.headers,
+                                                 attempt, message, idempotent)
+                if delay is None or attempt >= self.retries:
+                    raise GitHubError(response.status_code, message, dict(response.headers))
+
+            attempt += 1
+            self.retry_count += 1
+            print(f"  ⏳ {method} {endpoint or path} failed, retrying in {delay:.0f}s "
+                  f"(attempt {attempt}/{self.retries})")
+            self.limiter.pause(delay)
+
+    def get(self, path: str, endpoint: Optional[str] = None, **params):
+        return self.request('GET', path, endpoint=endpoint, params=params or None).json()
+
+    def download(self, path: str, out, endpoint: Optional[str] = None,
+                 headers: Optional[Dict] = None, max_bytes: Optional[int] = None):
+        """Stream a response body into the file object ``out``; returns the response.
+
+        Redirects (log downloads go to blob storage) are followed. Raises
+        GitHubError if the body grows past ``max_bytes``.
+        """
+        response = self.request('GET', path, endpoint=endpoint, headers=headers or {}, stream=True)
+        size = 0
+        try:
+            for chunk in response.iter_content(DOWNLOAD_CHUNK):
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise GitHubError(413, f"{path}: response larger than {max_bytes} bytes")
+                out.write(chunk)
+        finally:
+            response.close()
+            self.bytes_received += size
+        return response
+
+    def paginate(self, path: str, endpoint: Optional[str] = None, key: Optional[str] = None,
+                 **params) -> Iterator[Dict]:
+        """Yield items page by page, following ``Link: rel="next"``.
+
+        ``key`` selects the list inside object responses (e.g. ``jobs``).
+        Pages are only fetched as the caller consumes items.
+        """
+        params.setdefault('per_page', self.per_page)
+        url: Optional[str] = path
+        while url:
+            response = self.request('GET', url, endpoint=endpoint or path,
+                                    params=params if url == path else None)
+            data = response.json()
+            yield from (data[key] if key else data)
+            url = response.links.get('next', {}).get('url')
+
+    def graphql(self, query: str, endpoint: str = 'graphql', **variables) -> Dict:
+        """Run a GraphQL query and return its ``data``; errors raise GitHubError."""
+        url = os.environ.get('GITHUB_GRAPHQL_URL')
+        if not url:
+            # GitHub Enterprise serves REST at /api/v3 and GraphQL at /api/graphql
+            root = self.base_url[:-len('/v3')] if self.base_url.endswith('/api/v3') else self.base_url
+            url = f'{root}/graphql'
+        # Queries only read, so they are paced and retried like GETs
+        response = self.request('POST', url, endpoint=f'graphql.{endpoint}', write=False,
+                                idempotent=True, json={'query': query, 'variables': variables})
+        result = response.json()
+        if result.get('errors'):
+            raise GitHubError(response.status_code, '; '.join(
+                error.get('message', str(error)) for error in result['errors']))
+        return result['data']
+
+    # -- Issues ---------------------------------------------------------
+
+    def list_issues(self, repo: str, state: str = 'open', **params) -> Iterator[Dict]:
+        return self.paginate(f'/repos/{repo}/issues', endpoint='issues.list',
+                             state=state, **params)
+
+    def create_issue(self, repo: str, title: str, body: str, labels: List[str]) -> Dict:
+        return self.request('POST', f'/repos/{repo}/issues', endpoint='issues.create',
+                            json={'title': title, 'body': body, 'labels': labels}).json()
+
+    def update_issue(self, repo: str, number: int, **fields) -> Dict:
+        return self.request('PATCH', f'/repos/{repo}/issues/{number}', endpoint='issues.update',
+                            json=fields).json()
+
+    def create_comment(self, repo: str, number: int, body: str) -> Dict:
+        return self.request('POST', f'/repos/{repo}/issues/{number}/comments',
+                            endpoint='issues.comment', json={'body': body}).json()
+
+    def add_labels(self, repo: str, number: int, labels: List[str]) -> List[Dict]:
+        return self.request('POST', f'/repos/{repo}/issues/{number}/labels',
+                            endpoint='issues.labels', json={'labels': labels}).json()
+
+    # -- Pull requests --------------------------------------------------
+
+    def get_pull(self, repo: str, number: int) -> Dict:
+        return self.get(f'/repos/{repo}/pulls/{number}', endpoint='pulls.get')
+
+    def list_pull_files(self, repo: str, number: int) -> Iterator[Dict]:
+        return self.paginate(f'/repos/{repo}/pulls/{number}/files', endpoint='pulls.files')
+
+    def compare(self, repo: str, base: str, head: str) -> Dict:
+        """Commits and changed files (at most 300) from ``base`` to ``head``."""
+        return self.get(f'/repos/{repo}/compare/{base}...{head}', endpoint='repos.compare')
+
+    # -- Actions --------------------------------------------------------
+
+    def list_workflow_runs(self, repo: str, workflow=None, **params) -> Iterator[Dict]:
+        """Runs newest first, of one workflow (id or file name) or all of them.
+
+        Filter with ``status``, ``created`` (e.g. ``>=2024-01-01``), ...
+        """
+        path = f'/repos/{repo}/actions/workflows/{workflow}/runs' if workflow else f'/repos/{repo}/actions/runs'
+        return self.paginate(path, endpoint='actions.runs', key='workflow_runs', **params)
+
+    def get_workflow_run(self, repo: str, run_id: int) -> Dict:
+        return self.get(f'/repos/{repo}/actions/runs/{run_id}', endpoint='actions.run')
+
+    def list_run_jobs(self, repo: str, run_id: int) -> Iterator[Dict]:
+        return self.paginate(f'/repos/{repo}/actions/runs/{run_id}/jobs',
+                             endpoint='actions.jobs', key='jobs')
+
+    # -- Reporting ------------------------------------------------------
+
+    @property
+    def request_count(self) -> int:
+        return sum(self.requests_by_endpoint.values())
+
+    def print_summary(self):
+        """Print request counts and timings for this run."""
+        print(f"📡 GitHub API: {self.request_count} requests "
+              f"({self.retry_count} retries, {self.bytes_received} bytes, "
+              f"{self.request_time:.2f}s in requests, "
+              f"{time.monotonic() - self.created_at:.2f}s since client start)")
+        for endpoint, count in sorted(self.requests_by_endpoint.items()):
+            print(f"    {endpoint}: {count}")
+        if self.cache:
+            print(self.cache.summary())
+
+
+def _cached_response(url: str, headers: Dict[str, str], body: bytes):
+    """Rebuild a 200 response from a cache entry."""
+    import requests
+    from requests.structures import CaseInsensitiveDict
+
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = body
+    response.encoding = 'utf-8'
+    return response
+
+
+def _error_message(response) -> str:
+    try:
+        return response.json().get('message', response.text)
+    except ValueError:
+        return response.text[:200]
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+HTTP Cache - Persistent conditional-request cache for GitHub GETs
+
+Stores the body and validators (``ETag`` / ``Last-Modified``) of successful
+GET responses in a SQLite file. The next identical GET is sent with
+``If-None-Match`` / ``If-Modified-Since``; a ``304 Not Modified`` answer
+(which GitHub does not count against the rate limit) is served from the
+stored body. The file is kept under a size budget by evicting the least
+recently used entries.
+"""
+
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+
+from agent_cache import cache_path
+
+CACHE_FILE = 'http-cache.sqlite'
+
+# Default size budget for stored bodies (compressed)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Response headers kept alongside the body
+STORED_HEADERS = ('content-type', 'link', 'etag', 'last-modified')
+
+
+class HttpCache:
+    """Size-bounded LRU store of GET responses keyed by URL"""
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path or str(cache_path(CACHE_FILE))
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute('''CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            headers TEXT,
+            body BLOB,
+            size INTEGER,
+            accessed REAL
+        )''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+        self._db.commit()
+        self.total_bytes = self._db.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+
+        # The budget may have shrunk since the file was written
+        self._evict()
+        self._db.commit()
+
+    def validators(self, key: str) -> Dict[str, str]:
+        """Conditional request headers for a cached entry (empty if none)."""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT etag, last_modified FROM responses WHERE key = ?', (key,)).fetchone()
+        if not row:
+            return {}
+        headers = {}
+        if row[0]:
+            headers['If-None-Match'] = row[0]
+        if row[1]:
+            headers['If-Modified-Since'] = row[1]
+        return headers
+
+    def hit(self, key: str) -> Optional[Tuple[Dict[str, str], bytes]]:
+        """Return ``(headers, body)`` for a 304 answer and refresh its LRU position."""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT headers, body FROM responses WHERE key = ?', (key,)).fetchone()
+            if not row:
+                return None
+            self._db.execute('UPDATE responses SET accessed = ? WHERE key = ?',
+                             (time.time(), key))
+            self._db.commit()
+        body = zlib.decompress(row[1])
+        self.hits += 1
+        self.bytes_saved += len(body)
+        headers = dict(line.split(': ', 1) for line in row[0].split('\n') if ': ' in line)
+        return headers, body
+
+    def store(self, key: str, headers, body: bytes):
+        """Remember a 200 response if it carries a validator."""
+        self.misses += 1
+        etag = headers.get('etag')
+        last_modified = headers.get('last-modified')
+        if not etag and not last_modified:
+            return
+
+        kept = '\n'.join(f"{name}: {headers[name]}" for name in STORED_HEADERS if headers.get(name))
+        blob = zlib.compress(body)
+        size = len(blob) + len(kept)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._db.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            if old:
+                self.total_bytes -= old[0]
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, etag, last_modified, kept, blob, size, time.time()))
+            self.total_bytes += size
+            self.stores += 1
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until under budget (lock held)."""
+        while self.total_bytes > self.max_bytes:
+            row = self._db.execute(
+                'SELECT key, size FROM responses ORDER BY accessed LIMIT 1').fetchone()
+            if not row:
+                self.total_bytes = 0
+                return
+            self._db.execute('DELETE FROM responses WHERE key = ?', (row[0],))
+            self.total_bytes -= row[1]
+            self.evictions += 1
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def summary(self) -> str:
+        lookups = self.hits + self.misses
+        ratio = self.hits / lookups if lookups else 0.0
+        return (f"💾 HTTP cache: {self.hits} hits (304), {self.misses} misses "
+                f"({ratio:.0%} hit ratio), {self.stores} stored, {self.evictions} evicted, "
+                f"{self.bytes_saved} bytes not re-downloaded, "
+                f"{self.total_bytes / 1024 / 1024:.1f} MiB on disk")
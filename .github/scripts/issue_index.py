@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Issue Index - Fingerprints of open orchestrator issues
+
+Built from one paginated listing of open issues per run. Each orchestrator
+task gets a stable fingerprint (category + normalized title) and a content
+digest; both are embedded in the issue body as an HTML comment so the next
+run can tell "already filed" from "filed but out of date" in O(1).
+"""
+
+import hashlib
+import json
+import re
+from typing import Dict, Optional
+
+# Hidden marker appended to every orchestrator issue body
+MARKER_TEMPLATE = '<!-- orchestrator-task fingerprint={fingerprint} digest={digest} -->'
+MARKER_RE = re.compile(r'<!-- orchestrator-task fingerprint=(\w+) digest=(\w+) -->')
+
+# "[SOFTWARE]" style category tag in titles, used for issues filed before markers existed
+CATEGORY_TAG_RE = re.compile(r'\[([A-Za-z-]+)\]')
+
+# Task fields that make up the issue content (deadline moves every run, so it is left out)
+DIGEST_FIELDS = ('title', 'description', 'impact', 'urgency', 'difficulty', 'risk',
+                 'assign_to', 'labels')
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase, drop emoji, tags and punctuation, collapse whitespace."""
+    title = CATEGORY_TAG_RE.sub(' ', title)
+    title = re.sub(r'[^a-z0-9]+', ' ', title.lower())
+    return ' '.join(title.split())
+
+
+def fingerprint(category: str, title: str) -> str:
+    """Stable identity of a task across runs."""
+    key = f"{category.lower()}|{normalize_title(title)}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+def task_fingerprint(task: Dict) -> str:
+    return fingerprint(task['category'], task['title'])
+
+
+def task_digest(task: Dict) -> str:
+    """Hash of the task content; a change means the issue needs updating."""
+    content = json.dumps({field: task.get(field) for field in DIGEST_FIELDS}, sort_keys=True)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
+
+
+def task_marker(task: Dict) -> str:
+    return MARKER_TEMPLATE.format(fingerprint=task_fingerprint(task), digest=task_digest(task))
+
+
+class IssueIndex:
+    """Open orchestrator issues keyed by task fingerprint"""
+
+    def __init__(self):
+        self.issues: Dict[str, Dict] = {}
+        self.digests: Dict[str, Optional[str]] = {}
+
+    def load(self, client, repo: str) -> int:
+        """Index open issues with one paginated listing; returns issues scanned."""
+        scanned = 0
+        for issue in client.list_issues(repo, state='open'):
+            scanned += 1
+            if issue.get('pull_request'):
+                continue
+            self.add(issue)
+        return scanned
+
+    def add(self, issue: Dict):
+        """Index one issue by its marker, or by its title tag for older issues."""
+        match = MARKER_RE.search(issue.get('body') or '')
+        if match:
+            key, digest = match.group(1), match.group(2)
+        else:
+            tag = CATEGORY_TAG_RE.search(issue.get('title') or '')
+            if not tag:
+                return
+            key, digest = fingerprint(tag.group(1), issue['title']), None
+
+        # Keep the oldest issue if duplicates already exist
+        existing = self.issues.get(key)
+        if existing is None or issue['number'] < existing['number']:
+            self.issues[key] = issue
+            self.digests[key] = digest
+
+    def lookup(self, task: Dict):
+        """Return ``(issue, up_to_date)`` for a task, or ``(None, False)``."""
+        key = task_fingerprint(task)
+        issue = self.issues.get(key)
+        if issue is None:
+            return None, False
+        return issue, self.digests.get(key) == task_digest(task)
+
+    def __len__(self):
+        return len(self.issues)
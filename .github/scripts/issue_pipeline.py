@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Issue Pipeline - Concurrent, rate-limit-aware issue filing
+
+Each task costs exactly one request: an already-open, up-to-date issue is
+skipped, a stale one is edited, and a new one is created with all of its
+labels in the same call. Independent tasks run on a small thread pool over
+one shared GitHubClient, whose RateLimiter makes throttling from GitHub
+slow every worker down instead of failing tasks one by one.
+
+The client does not retry a create that failed with a timeout or 5xx, since
+GitHub may have filed the issue anyway. The pipeline first looks for the
+task's fingerprint among the newest open issues, and only sends the create
+again if it is not there.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from github_client import GitHubError
+from issue_index import IssueIndex
+
+# Labels added to every new orchestrator issue
+ASSIGNMENT_LABELS = ['copilot-assigned', 'in-progress']
+
+DEFAULT_WORKERS = 4
+
+# Sends of one issue create when earlier ones ended with an unknown outcome
+CREATE_ATTEMPTS = 3
+
+# Newest open issues searched for an issue a failed create may have filed
+RECHECK_ISSUES = 30
+
+
+class IssuePipeline:
+    """File orchestrator tasks as issues on a bounded worker pool"""
+
+    def __init__(self, client, repo: str, index, workers: int = DEFAULT_WORKERS):
+        self.client = client
+        self.repo = repo
+        self.index = index
+        self.workers = max(1, workers)
+
+    def process(self, task: Dict, body: str) -> Tuple[str, Dict]:
+        """File one task; returns ``(action, entry)``."""
+        existing, up_to_date = self.index.lookup(task)
+        if existing is not None:
+            entry = {'number': existing['number'], 'title': task['title'],
+                     'url': existing['html_url']}
+            if up_to_date:
+                return 'skipped', entry
+            self.client.update_issue(self.repo, existing['number'], body=body)
+            return 'updated', entry
+
+        labels = list(dict.fromkeys(task['labels'] + ASSIGNMENT_LABELS))
+        issue = self.create(task, body, labels)
+        return 'created', {'number': issue['number'], 'title': task['title'],
+                           'url': issue['html_url']}
+
+    def create(self, task: Dict, body: str, labels: List[str]) -> Dict:
+        """Create the task's issue, checking before any resend that it was not filed already."""
+        attempt = 1
+        while True:
+            try:
+                return self.client.create_issue(self.repo, task['title'], body, labels)
+            except GitHubError as e:
+                if not e.unknown_outcome or attempt >= CREATE_ATTEMPTS:
+                    raise
+                print(f"  ⏳ Creating '{task['title']}' failed ({e}), checking whether it was filed")
+            issue = self.recheck(task)
+            if issue is not None:
+                return issue
+            attempt += 1
+
+    def recheck(self, task: Dict) -> Optional[Dict]:
+        """The newest open issue carrying the task's fingerprint, if any."""
+        recent = IssueIndex()
+        for number, issue in enumerate(self.client.list_issues(
+                self.repo, state='open', sort='created', direction='desc', per_page=RECHECK_ISSUES)):
+            if number >= RECHECK_ISSUES:
+                break
+            if not issue.get('pull_request'):
+                recent.add(issue)
+        issue, _ = recent.lookup(task)
+        return issue
+
+    def _safe_process(self, item: Tuple[Dict, str]) -> Tuple[str, Dict]:
+        task, body = item
+        try:
+            return self.process(task, body)
+        except Exception as e:
+            return 'failed', {'title': task['title'], 'error': str(e)}
+
+    def run(self, items: List[Tuple[Dict, str]]) -> Dict[str, List[Dict]]:
+        """File every ``(task, body)`` pair; results keep the task order."""
+        results = {'created': [], 'updated': [], 'skipped': [], 'failed': []}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for action, entry in pool.map(self._safe_process, items):
+                results[action].append(entry)
+        return results
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Log Reader - Streaming access to the logs of failed workflow jobs
+
+Finds the log lines that explain a failure without ever holding a whole log
+in memory:
+
+1. The run's log archive is downloaded into a spooled buffer (memory up to
+   SPOOL_BYTES, a temporary file beyond that) and only the members of
+   failing steps (``<job>/<n>_<step>.txt``) are read, line by line, straight
+   out of the zip.
+2. If the archive is unavailable or lacks a job's step files, the job's own
+   log is fetched tail-first with HTTP ``Range`` requests, keeping only the
+   lines timestamped inside the failing steps.
+
+Matching lines are returned with a few lines of context on either side.
+FailureLogs keeps the downloaded logs open so they can be read more than
+once (e.g. a cheap tail read before a full pattern scan).
+"""
+
+import io
+import re
+import tempfile
+import zipfile
+from collections import deque
+from contextlib import nullcontext
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from github_client import GitHubError
+
+# Archive bytes kept in memory before spilling to a temporary file
+SPOOL_BYTES = 16 * 1024 * 1024
+
+# Largest archive we are willing to download
+MAX_ARCHIVE_BYTES = 1024 * 1024 * 1024
+
+# Per-job fallback: bytes per Range request, and total bytes read per job
+TAIL_CHUNK_BYTES = 1024 * 1024
+MAX_TAIL_BYTES = 32 * 1024 * 1024
+
+# Lines of context kept around each match
+CONTEXT_LINES = 3
+
+# Lines per step returned by FailureLogs.tails()
+TAIL_LINES = 30
+
+# Matches kept per step (the earliest ones, with the last slot tracking the latest)
+MAX_MATCHES_PER_STEP = 50
+
+# Lines start with an ISO timestamp: 2024-01-01T12:00:00.1234567Z
+TIMESTAMP = re.compile(r'^\ufeff?(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(?:\.\d+)?Z ')
+
+
+def _norm(name: str) -> str:
+    """Compare job names the way the archive stores them (punctuation varies)."""
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+
+def _second(timestamp: Optional[str]) -> str:
+    return (timestamp or '')[:19]
+
+
+def failing_steps(job: Dict) -> List[Dict]:
+    return [step for step in job.get('steps') or [] if step.get('conclusion') == 'failure']
+
+
+def scan_lines(lines: Iterable[str], match: Callable[[str], Sequence], source: Dict,
+               context: int = CONTEXT_LINES, limit: int = MAX_MATCHES_PER_STEP) -> List[Dict]:
+    """Return matching lines with context; only ``context`` lines are buffered.
+
+    ``match`` returns the labels a line matched (empty when it did not); they
+    are kept on each result as ``labels``.
+    """
+    before: deque = deque(maxlen=context)
+    matches: List[Dict] = []
+    open_matches: List[Dict] = []
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+        for pending in open_matches:
+            pending['after'].append(line)
+        open_matches = [m for m in open_matches if len(m['after']) < context]
+
+        labels = match(line)
+        if labels:
+            found = dict(source, line=number, text=line, labels=list(labels),
+                         before=list(before), after=[])
+            if len(matches) >= limit:
+                # Keep the earliest matches and the most recent one (errors cluster at the end)
+                matches[-1] = found
+            else:
+                matches.append(found)
+            open_matches.append(found)
+        before.append(line)
+    return matches
+
+
+def _in_windows(line: str, windows: List) -> bool:
+    stamp = TIMESTAMP.match(line)
+    # Untimestamped lines are kept with their neighbours
+    return not windows or not stamp or any(lo <= stamp.group(1) <= hi for lo, hi in windows)
+
+
+def _job_log_lines(client, repo: str, job: Dict) -> Iterable[str]:
+    """Lines of the job log that fall inside its failing steps, read from the end."""
+    windows = [(_second(s.get('started_at')), _second(s.get('completed_at')) or '9999')
+               for s in failing_steps(job)]
+    earliest = min((start for start, _ in windows), default='')
+    path = f"/repos/{repo}/actions/jobs/{job['id']}/logs"
+
+    kept: deque = deque()
+    carry = b''
+    end = None
+    fetched = 0
+    while fetched < MAX_TAIL_BYTES:
+        if end is None:
+            span = f'bytes=-{TAIL_CHUNK_BYTES}'
+        else:
+            span = f'bytes={max(0, end - TAIL_CHUNK_BYTES)}-{end - 1}'
+        spool = tempfile.SpooledTemporaryFile(max_size=TAIL_CHUNK_BYTES * 2)
+        response = client.download(path, spool, endpoint='actions.job_logs',
+                                   headers={'Range': span}, max_bytes=MAX_TAIL_BYTES)
+        fetched += spool.tell()
+        spool.seek(0)
+
+        if response.status_code != 206:
+            # No Range support: the whole log came back, stream it forwards
+            return _filtered(spool, windows)
+
+        content_range = response.headers.get('Content-Range', '')
+        start = int(content_range[6:].split('-', 1)[0]) if content_range.startswith('bytes ') else 0
+        data = spool.read() + carry
+        spool.close()
+        if start > 0:
+            # The first line is cut; finish it with the next (earlier) chunk
+            cut = data.find(b'\n') + 1
+            carry, data = data[:cut], data[cut:]
+
+        first_stamp = None
+        for line in reversed(data.decode('utf-8', errors='replace').splitlines()):
+            stamp = TIMESTAMP.match(line)
+            if stamp:
+                first_stamp = stamp.group(1)
+            if _in_windows(line, windows):
+                kept.appendleft(line)
+
+        if start <= 0 or (first_stamp is not None and first_stamp < earliest):
+            break
+        end = start
+    return kept
+
+
+def _filtered(spool, windows: List) -> Iterable[str]:
+    with spool:
+        for line in io.TextIOWrapper(spool, encoding='utf-8', errors='replace'):
+            if _in_windows(line, windows):
+                yield line
+
+
+class FailureLogs:
+    """The failing-step logs of one run, fetched once and readable repeatedly
+
+    Use as a context manager; the archive buffer is released on exit.
+    """
+
+    def __init__(self, client, repo: str, run_id: int, jobs: List[Dict]):
+        self.client = client
+        self.repo = repo
+        self.run_id = run_id
+        self.jobs = jobs
+        # (source, opener) pairs; opener() returns a context manager over lines
+        self.sources: List = []
+        self._spool = None
+        self._archive = None
+
+    def __enter__(self) -> 'FailureLogs':
+        covered = set()
+        try:
+            covered = self._open_archive()
+        except (GitHubError, zipfile.BadZipFile, OSError) as e:
+            print(f"  ⚠️  Log archive unavailable ({e}); reading job logs instead")
+
+        for job in self.jobs:
+            if job['id'] in covered:
+                continue
+            try:
+                lines = list(_job_log_lines(self.client, self.repo, job))
+            except GitHubError as e:
+                print(f"  ⚠️  No logs for job {job['name']}: {e}")
+                continue
+            steps = ', '.join(step['name'] for step in failing_steps(job)) or 'job'
+            self.sources.append(({'job': job['name'], 'step': steps},
+                                 lambda lines=lines: nullcontext(lines)))
+        return self
+
+    def __exit__(self, *exc):
+        if self._archive:
+            self._archive.close()
+        if self._spool:
+            self._spool.close()
+
+    def _open_archive(self) -> set:
+        """Index the failing-step members of the run log archive; returns the job ids covered."""
+        self._spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+        self.client.download(f'/repos/{self.repo}/actions/runs/{self.run_id}/logs', self._spool,
+                             endpoint='actions.run_logs', max_bytes=MAX_ARCHIVE_BYTES)
+        print(f"  📦 Log archive: {self._spool.tell() / 1024 / 1024:.1f} MiB")
+        self._spool.seek(0)
+        self._archive = zipfile.ZipFile(self._spool)
+
+        members = {}
+        for info in self._archive.infolist():
+            folder, _, filename = info.filename.rpartition('/')
+            number = filename.split('_', 1)[0]
+            if folder and number.isdigit():
+                members[(_norm(folder), int(number))] = info
+
+        covered = set()
+        for job in self.jobs:
+            for step in failing_steps(job):
+                info = members.get((_norm(job['name']), step['number']))
+                if info is None:
+                    continue
+                covered.add(job['id'])
+                self.sources.append(({'job': job['name'], 'step': step['name']},
+                                     lambda info=info: self._read_member(info)))
+        return covered
+
+    def _read_member(self, info):
+        return io.TextIOWrapper(self._archive.open(info), encoding='utf-8', errors='replace')
+
+    def tails(self, count: int = TAIL_LINES) -> List:
+        """``(source, last lines)`` for every failing step, without pattern matching."""
+        result = []
+        for source, opener in self.sources:
+            with opener() as lines:
+                result.append((source, [line.rstrip('\r\n') for line in deque(lines, maxlen=count)]))
+        return result
+
+    def matches(self, match: Callable[[str], Sequence], context: int = CONTEXT_LINES) -> List[Dict]:
+        """Matching lines (with context) from every failing step."""
+        found = []
+        for source, opener in self.sources:
+            with opener() as lines:
+                found.extend(scan_lines(lines, match, source, context))
+        return found
+
+
+def collect_failure_lines(client, repo: str, run_id: int, jobs: List[Dict],
+                          match: Callable[[str], Sequence], context: int = CONTEXT_LINES) -> List[Dict]:
+    """Matching log lines (with context) from the failing steps of ``jobs``."""
+    with FailureLogs(client, repo, run_id, jobs) as logs:
+        return logs.matches(match, context)
@@ -6,20 +6,223 @@ Analyzes project, prioritizes work, creates issues, triggers agents
 
 import os
 import json
-from pathlib import Path
+import subprocess
+import time
 from datetime import datetime, timedelta
-from github import Github
+
+import telemetry
+from agent_cache import cache_path
+from github_client import GitHubClient
+from issue_index import IssueIndex, task_marker
+from issue_pipeline import DEFAULT_WORKERS, IssuePipeline
+from rate_limit import DEFAULT_WRITE_INTERVAL, RateLimiter
+from scan_cache import ScanCache, file_keys
+from todo_scanner import BUDGET_EXCEEDED, MAX_FILE_BYTES, scan_files, to_findings
+from tree_walker import DEFAULT_EXCLUDES, TreeWalker, parse_ignore_lines, path_matches
+
+# Modes that look at part of the tree under a wall-clock budget
+SCOPED_MODES = ('quick-check', 'emergency-review')
+
+# Default budget (seconds) for scoped modes (ORCHESTRATOR_TIME_BUDGET overrides)
+DEFAULT_TIME_BUDGET = 60
+
+# Paths scanned by emergency-review (gitignore syntax)
+SAFETY_CRITICAL_PATHS = [
+    'docs/SAFETY.md',
+    'software/uv_control/',
+    '*safety*',
+    '*emergency*',
+    '*interlock*',
+]
+
+# Last-run state, used by quick-check to find what changed
+STATE_FILE = 'orchestrator-state.json'
+
+
+def extra_excludes():
+    """Extra gitignore-style excludes from ORCHESTRATOR_EXCLUDE (comma-separated)"""
+    raw = os.environ.get('ORCHESTRATOR_EXCLUDE', '')
+    return [p.strip() for p in raw.split(',') if p.strip()]
+
+
+def scan_with_cache(paths, full=True, deadline=None):
+    """Serve unchanged files from the scan cache and scan the rest"""
+    cache = ScanCache(config=f'todo:{MAX_FILE_BYTES}')
+    cache.load()
+    if cache.load_error:
+        print(f"⚠️  Scan cache ignored: {cache.load_error} - running full scan")
+
+    keys = file_keys(paths)
+    results = {}
+    to_scan = []
+    for path in paths:
+        cached = cache.get(path, keys[path])
+        if cached is None:
+            to_scan.append(path)
+        else:
+            results[path] = dict(cached, file=path)
+
+    for result in scan_files(to_scan, deadline=deadline):
+        path = result['file']
+        results[path] = result
+        if result['skipped'] != BUDGET_EXCEEDED:
+            cache.put(path, keys[path], {k: v for k, v in result.items() if k != 'file'})
+
+    tel = telemetry.get()
+    tel.count('scan_cache_hits', cache.hits, 'Files served from the scan cache')
+    tel.count('scan_cache_misses', cache.misses, 'Files that had to be scanned')
+    tel.count('files_scanned', len(to_scan) - sum(1 for path in to_scan if results[path]['skipped']),
+              'Files read by the TODO scanner')
+    tel.count('bytes_scanned', sum(results[path]['bytes'] for path in to_scan),
+              'Bytes read by the TODO scanner')
+
+    print(f"✓ Scan cache: {cache.hits} hits, {cache.misses} misses "
+          f"({cache.hit_ratio:.0%} hit ratio)")
+    try:
+        cache.save(keep=paths if full else None)
+    except OSError as e:
+        print(f"⚠️  Could not save scan cache: {e}")
+
+    return [results[path] for path in paths]
+
+
+def time_budget() -> float:
+    """Seconds allowed for a scoped run (ORCHESTRATOR_TIME_BUDGET, else the default)"""
+    value = os.environ.get('ORCHESTRATOR_TIME_BUDGET')
+    if value is None:
+        return DEFAULT_TIME_BUDGET
+    try:
+        budget = float(value)
+    except ValueError:
+        budget = 0
+    if not 0 < budget < float('inf'):
+        print(f"⚠️  Ignoring ORCHESTRATOR_TIME_BUDGET={value!r} (expected seconds > 0), "
+              f"using {DEFAULT_TIME_BUDGET}s")
+        return DEFAULT_TIME_BUDGET
+    return budget
+
+
+def load_state():
+    """Load the state recorded by the previous orchestrator run"""
+    try:
+        with open(cache_path(STATE_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state):
+    """Record state for the next orchestrator run"""
+    try:
+        with open(cache_path(STATE_FILE), 'w') as f:
+            json.dump(state, f, indent=2)
+    except OSError as e:
+        print(f"⚠️  Could not save orchestrator state: {e}")
+
+
+def git_output(*args):
+    """Run a git command and return its stdout, or None on failure"""
+    try:
+        result = subprocess.run(['git', *args], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout
+
+
+def changed_since(sha):
+    """Paths changed between ``sha`` and HEAD, or None if the diff is impossible"""
+    if not sha or git_output('cat-file', '-e', f'{sha}^{{commit}}') is None:
+        return None
+    output = git_output('diff', '--name-only', '-z', sha, 'HEAD')
+    if output is None:
+        return None
+    return [path for path in output.split('\0') if path]
+
+
+def safety_paths():
+    """Gitignore-style patterns for emergency-review (ORCHESTRATOR_SAFETY_PATHS overrides)"""
+    raw = os.environ.get('ORCHESTRATOR_SAFETY_PATHS', '')
+    custom = [p.strip() for p in raw.split(',') if p.strip()]
+    return custom or SAFETY_CRITICAL_PATHS
+
+
+def build_issue_body(task, total):
+    """Render the issue body for a task, including its fingerprint marker"""
+    agents_list = '\n'.join(f"- @{agent}" for agent in task['assign_to'])
+    priority = ('🔴 CRITICAL' if 'priority:critical' in task['labels']
+                else '🟡 HIGH' if 'priority:high' in task['labels'] else '🟢 MEDIUM')
+
+    return f"""**🎯 Created by: Orchestrator Agent**
+**Analysis Date**: {datetime.now().strftime('%Y-%m-%d')}
+**Priority**: {task['priority']} of {total}
+**Estimated Effort**: {task['difficulty'] * 2} hours
+
+---
+
+## 📋 Task Description
+{task['description']}
+
+## 🎯 Success Criteria
+- [ ] Implementation complete and tested
+- [ ] Safety validation passed (if applicable)
+- [ ] Documentation updated
+- [ ] Code reviewed and merged
+
+## 📊 Priority Scores
+- **Impact**: {task['impact']}/10 - How much this moves project forward
+- **Urgency**: {task['urgency']}/10 - Time sensitivity
+- **Difficulty**: {task['difficulty']}/10 - Implementation complexity
+- **Risk**: {task['risk']}/10 - Safety/technical risk
+
+## 👥 Assigned Agents
+{agents_list}
+
+## ⏰ Deadline
+**Target completion**: {task['deadline']}
+
+## 🔗 Related Work
+This task was identified during automated orchestrator analysis. Review the orchestrator's strategic report in the Actions tab for full context.
+
+---
+
+**Orchestrator Run ID**: {os.environ.get('GITHUB_RUN_ID', 'unknown')}
+**Next Orchestrator Review**: Next Monday 8am UTC
+
+---
+
+🤖 **Auto-Assigned by Orchestrator**
+
+@copilot I've been assigned to this issue. Let me analyze it and create a fix.
+
+**Issue Type**: {', '.join(task['labels'])}
+**Priority**: {priority}
+
+I'll:
+1. Analyze the problem
+2. Research the best solution
+3. Create a pull request with the fix
+4. Request review from the auto-reviewer
+
+_Estimated time: 2-5 minutes_
+
+{task_marker(task)}
+"""
+
 
 def main():
+    mode = os.environ.get('ORCHESTRATOR_MODE', 'scheduled')
+    tel = telemetry.start('orchestrator')
+
     print("━" * 60)
     print("🎯 ORCHESTRATOR ACTIVATED")
     print("━" * 60)
-    print(f"Mode: {os.environ.get('ORCHESTRATOR_MODE', 'scheduled')}")
+    print(f"Mode: {mode}")
     print(f"Focus: {os.environ.get('FOCUS_AREA', 'all')}")
     print(f"Time: {datetime.now().isoformat()}")
     print("━" * 60)
 
     # Phase 1: Analyze Codebase
+    tel.phase('analysis')
     print("\n📊 PHASE 1: CODEBASE ANALYSIS")
     print("-" * 60)
 
@@ -29,33 +232,79 @@ def main():
         "missing_tests": []
     }
 
-    # Scan Python files
-    for py_file in Path('.').rglob('*.py'):
-        if '.git' in str(py_file) or '__pycache__' in str(py_file):
-            continue
-        
-        try:
-            content = py_file.read_text()
-            for i, line in enumerate(content.split('\n'), 1):
-                if 'TODO' in line or 'FIXME' in line:
-                    findings['todos'].append({
-                        'file': str(py_file),
-                        'line': i,
-                        'text': line.strip()
-                    })
-        except Exception as e:
-            print(f"⚠️  Error reading {py_file}: {e}")
-
-    # Check for tests
-    test_files = list(Path('.').rglob('test_*.py')) + list(Path('.').rglob('*_test.py'))
-    if len(test_files) == 0:
+    state = load_state()
+    head_sha = (git_output('rev-parse', 'HEAD') or '').strip()
+
+    # Scoped modes run against a hard wall-clock budget
+    deadline = None
+    if mode in SCOPED_MODES:
+        budget = time_budget()
+        deadline = time.monotonic() + budget
+        print(f"⏱️  Time budget: {budget:.0f}s")
+
+    walker = TreeWalker('.', excludes=DEFAULT_EXCLUDES + extra_excludes())
+    walker.add_detector('python', lambda path, name: name.endswith('.py'))
+    walker.add_detector('tests', lambda path, name: name.endswith('.py') and (
+        name.startswith('test_') or name.endswith('_test.py')))
+
+    changed = changed_since(state.get('last_sha')) if mode == 'quick-check' else None
+    if changed is not None:
+        # Only the files changed since the last recorded run
+        print(f"✓ Quick check: {len(changed)} files changed since {state['last_sha'][:7]}")
+        tree = walker.collect(changed)
+    else:
+        if mode == 'quick-check':
+            print("⚠️  No usable baseline commit recorded - scanning the whole tree within budget")
+
+        # Walk the tree once and let every detector pick its files
+        if mode == 'emergency-review':
+            rules = parse_ignore_lines(safety_paths())
+            walker.add_detector('safety', lambda path, name: path_matches(rules, path))
+        with tel.span('walk'):
+            tree = walker.walk()
+
+        stats = walker.stats
+        tel.count('files_walked', stats.files_visited, 'Files seen by the tree walker')
+        tel.count('entries_pruned', stats.entries_skipped, 'Ignored files and directories')
+        print(f"✓ Walked {stats.files_visited} files in {stats.dirs_visited} directories")
+        print(f"✓ Skipped {stats.entries_skipped} entries "
+              f"({stats.dirs_pruned} directories pruned, {stats.bytes_skipped} bytes of ignored files)")
+
+    # Scan Python files (cached by content, streamed, in parallel, stable order)
+    py_files = [path for path, _ in tree['python']]
+    if mode == 'emergency-review':
+        safety_files = {path for path, _ in tree['safety']}
+        py_files = [path for path in py_files if path in safety_files]
+        print(f"🚨 Emergency review: {len(py_files)} safety-critical Python files")
+
+    with tel.span('scan'):
+        scan_results = scan_with_cache(py_files, full=mode not in SCOPED_MODES, deadline=deadline)
+    findings['todos'] = to_findings(scan_results)
+
+    for result in scan_results:
+        if result['skipped']:
+            print(f"⚠️  Skipped {result['file']}: {result['skipped']}")
+
+    # Check for tests (a partial view of the tree cannot prove there are none)
+    test_files = [path for path, _ in tree['tests']]
+    if len(test_files) == 0 and mode not in SCOPED_MODES:
         findings['missing_tests'].append("No test files found")
 
     print(f"✓ TODOs found: {len(findings['todos'])}")
     print(f"✓ Test files: {len(test_files)}")
     print(f"⚠️  Safety concerns: {len(findings['safety_gaps'])}")
 
+    # Record where this run stopped, unless the budget cut the scan short or only
+    # the safety paths were scanned (the next quick-check would miss everything else)
+    if any(r['skipped'] == BUDGET_EXCEEDED for r in scan_results):
+        print("⚠️  Time budget exhausted - keeping the previous quick-check baseline")
+    elif mode == 'emergency-review':
+        print("ℹ️  Emergency review covers the safety paths only - keeping the previous quick-check baseline")
+    elif head_sha:
+        save_state({'last_sha': head_sha, 'mode': mode, 'time': datetime.now().isoformat()})
+
     # Phase 2: Generate Priority Tasks
+    tel.phase('planning')
     print("\n🎯 PHASE 2: PRIORITY PLANNING")
     print("-" * 60)
 
@@ -127,106 +376,52 @@ def main():
         print(f"  {task['priority']}. {task['title']}")
 
     # Phase 3: Create GitHub Issues
+    tel.phase('issues')
     print("\n🚀 PHASE 3: CREATING ISSUES")
     print("-" * 60)
 
-    g = Github(os.environ['GITHUB_TOKEN'])
-    repo = g.get_repo(os.environ['GITHUB_REPOSITORY'])
-
-    created_issues = []
-
-    # Create all filtered tasks (respects focus area)
-    for task in tasks:
-        try:
-            agents_list = '\n'.join(f"- @{agent}" for agent in task['assign_to'])
-            
-            body = f"""**🎯 Created by: Orchestrator Agent**
-**Analysis Date**: {datetime.now().strftime('%Y-%m-%d')}
-**Priority**: {task['priority']} of {len(tasks)}
-**Estimated Effort**: {task['difficulty'] * 2} hours
-
----
-
-## 📋 Task Description
-{task['description']}
+    client = GitHubClient(limiter=RateLimiter(
+        write_interval=float(os.environ.get('ORCHESTRATOR_WRITE_INTERVAL', DEFAULT_WRITE_INTERVAL))
+    ))
+    repo = os.environ['GITHUB_REPOSITORY']
 
-## 🎯 Success Criteria
-- [ ] Implementation complete and tested
-- [ ] Safety validation passed (if applicable)
-- [ ] Documentation updated
-- [ ] Code reviewed and merged
+    print("📇 Indexing open orchestrator issues...")
+    index = IssueIndex()
+    scanned = index.load(client, repo)
+    print(f"  Indexed {len(index)} orchestrator issues out of {scanned} open issues")
 
-## 📊 Priority Scores
-- **Impact**: {task['impact']}/10 - How much this moves project forward
-- **Urgency**: {task['urgency']}/10 - Time sensitivity
-- **Difficulty**: {task['difficulty']}/10 - Implementation complexity
-- **Risk**: {task['risk']}/10 - Safety/technical risk
+    pipeline = IssuePipeline(
+        client, repo, index,
+        workers=int(os.environ.get('ORCHESTRATOR_WORKERS', DEFAULT_WORKERS)),
+    )
 
-## 👥 Assigned Agents
-{agents_list}
-
-## ⏰ Deadline
-**Target completion**: {task['deadline']}
-
-## 🔗 Related Work
-This task was identified during automated orchestrator analysis. Review the orchestrator's strategic report in the Actions tab for full context.
-
----
-
-**Orchestrator Run ID**: {os.environ.get('GITHUB_RUN_ID', 'unknown')}
-**Next Orchestrator Review**: Next Monday 8am UTC
-"""
-            
-            issue = repo.create_issue(
-                title=task['title'],
-                body=body,
-                labels=task['labels']
-            )
-            
-            # Auto-assign Copilot immediately
-            try:
-                issue.create_comment(
-                    body="""🤖 **Auto-Assigned by Orchestrator**
-
-@copilot I've been assigned to this issue. Let me analyze it and create a fix.
-
-**Issue Type**: {}
-**Priority**: {}
-
-I'll:
-1. Analyze the problem
-2. Research the best solution
-3. Create a pull request with the fix
-4. Request review from the auto-reviewer
-
-_Estimated time: 2-5 minutes_""".format(
-                        ', '.join(task['labels']), 
-                        '🔴 CRITICAL' if 'priority:critical' in task['labels'] else '🟡 HIGH' if 'priority:high' in task['labels'] else '🟢 MEDIUM'
-                    )
-                )
-                issue.add_to_labels('copilot-assigned', 'in-progress')
-                print(f"  └─ ✅ Copilot auto-assigned")
-            except Exception as e:
-                print(f"  └─ ⚠️  Failed to auto-assign Copilot: {e}")
-            
-            created_issues.append({
-                'number': issue.number,
-                'title': task['title'],
-                'url': issue.html_url
-            })
-            
-            print(f"✅ Created Issue #{issue.number}: {task['title']}")
-            
-        except Exception as e:
-            print(f"❌ Failed to create issue: {e}")
+    # Create all filtered tasks (respects focus area)
+    results = pipeline.run([(task, build_issue_body(task, len(tasks))) for task in tasks])
+    created_issues = results['created']
+    updated_issues = results['updated']
+    skipped_issues = results['skipped']
+
+    for issue in created_issues:
+        print(f"✅ Created Issue #{issue['number']}: {issue['title']} (Copilot auto-assigned)")
+    for issue in updated_issues:
+        print(f"🔄 Updated Issue #{issue['number']}: {issue['title']}")
+    for issue in skipped_issues:
+        print(f"⏭️  Skipped (already open as #{issue['number']}): {issue['title']}")
+    for failure in results['failed']:
+        print(f"❌ Failed to create issue: {failure['title']}: {failure['error']}")
+    for outcome, items in results.items():
+        tel.count('issues', len(items), 'Orchestrator issues by outcome', outcome=outcome)
+
+    print(f"  API retries: {client.retry_count}, throttled for {client.limiter.waited:.1f}s")
 
     # Phase 4: Generate Report
+    tel.phase('report')
     print("\n📊 PHASE 4: STRATEGIC REPORT")
     print("-" * 60)
 
     report = f"""# 🎯 Orchestrator Strategic Report
 **Date**: {datetime.now().strftime('%Y-%m-%d %H:%M UTC')}
-**Mode**: {os.environ.get('ORCHESTRATOR_MODE', 'scheduled')}
+**Mode**: {mode}
 **Run ID**: {os.environ.get('GITHUB_RUN_ID', 'unknown')}
 
 ---
@@ -260,6 +455,16 @@ The Orchestrator has analyzed the entire project and identified **{len(tasks)} p
     else:
         report += "No issues created this run.\n\n"
 
+    report += f"**Created**: {len(created_issues)} | **Updated**: {len(updated_issues)} | **Skipped**: {len(skipped_issues)}\n\n"
+
+    if updated_issues or skipped_issues:
+        report += "### Already Open\n\n"
+        for issue in updated_issues:
+            report += f"- 🔄 Updated #{issue['number']} - {issue['title']}\n"
+        for issue in skipped_issues:
+            report += f"- ⏭️ Unchanged #{issue['number']} - {issue['title']}\n"
+        report += "\n"
+
     report += """
 ---
 
@@ -311,7 +516,10 @@ The Orchestrator has analyzed the entire project and identified **{len(tasks)} p
     print("━" * 60)
     print(f"✅ {len(tasks)} tasks prioritized")
     print(f"✅ {len(created_issues)} issues created")
+    print(f"🔄 {len(updated_issues)} issues updated")
+    print(f"⏭️  {len(skipped_issues)} issues skipped (already open)")
     print(f"📊 Report saved to orchestrator_report.md")
+    client.print_summary()
     print("━" * 60)
 
 if __name__ == '__main__':
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Path Policy - CODEOWNERS-style rules for which changed files need a human
+
+The reviewer classifies every changed file with a policy file, one rule per
+line, where the last matching rule wins (as in CODEOWNERS):
+
+    # .github/review-policy
+    *                     critical
+    *.md                  safe
+    /.github/workflows/   critical
+    requirements.txt      critical
+
+Patterns follow CODEOWNERS: a leading ``/`` (or any ``/`` inside the
+pattern) anchors it to the repository root, a trailing ``/`` matches
+everything below a directory, ``*`` and ``?`` match within one path segment
+and ``**`` any number of segments. A pattern without a slash matches a file
+or directory name at any depth.
+
+Rules are compiled once. Anchored patterns go into a trie over path segments
+(literal segments are dict lookups), and names that match at any depth are
+keyed by name or extension, so classifying a path costs its depth rather
+than the number of rules. Subtrees that cannot beat the best rule found so
+far are skipped.
+
+    python .github/scripts/path_policy.py .github/review-policy docs/a.md setup.py
+"""
+
+import argparse
+import re
+import sys
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+POLICY_FILE = '.github/review-policy'
+
+WILDCARD = re.compile(r'[*?\[]')
+
+
+class _Node:
+    """One trie position: children by literal segment, by glob, and after ``**``"""
+
+    __slots__ = ('literal', 'globs', 'deep', 'rules', 'best')
+
+    def __init__(self):
+        self.literal: Dict[str, '_Node'] = {}
+        self.globs: List[Tuple[str, '_Node']] = []
+        self.deep: Optional['_Node'] = None
+        # (rule index, also matches paths below this one)
+        self.rules: List[Tuple[int, bool]] = []
+        # Highest rule index in this subtree, for pruning
+        self.best = -1
+
+
+class PathPolicy:
+    """Compiled path rules; ``match`` returns the label of the last rule matching a path"""
+
+    def __init__(self, rules: List[Tuple[str, str]]):
+        self.rules = rules
+        self.root = _Node()
+        # Rules that match a name at any depth
+        self.names: Dict[str, List[Tuple[int, bool]]] = {}
+        self.suffixes: Dict[str, List[int]] = {}
+        self.name_globs: List[Tuple[str, int, bool]] = []
+        for index, (pattern, _) in enumerate(rules):
+            self._compile(pattern, index)
+        self._rank(self.root)
+
+    @classmethod
+    def parse(cls, text: str, source: str = POLICY_FILE) -> 'PathPolicy':
+        rules = []
+        for number, line in enumerate(text.splitlines(), 1):
+            line = line.split(' #', 1)[0].strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split()
+            if len(parts) != 2:
+                raise ValueError(f"{source}:{number}: expected '<pattern> <label>', got {line!r}")
+            rules.append((parts[0], parts[1]))
+        return cls(rules)
+
+    @classmethod
+    def load(cls, path: str = POLICY_FILE) -> 'PathPolicy':
+        return cls.parse(Path(path).read_text(), str(path))
+
+    # -- Compiling ------------------------------------------------------
+
+    def _compile(self, pattern: str, index: int):
+        directory = pattern.endswith('/')
+        body = pattern.strip('/')
+        segments = [s for s in body.split('/') if s] if body else []
+        if not segments:
+            # ``/`` or ``**`` alone: everything
+            segments = ['**']
+
+        if not pattern.startswith('/') and len(segments) == 1 and segments[0] != '**':
+            name = segments[0]
+            if not WILDCARD.search(name):
+                self.names.setdefault(name, []).append((index, directory))
+            elif name[:2] == '*.' and not WILDCARD.search(name[1:]) and not directory:
+                self.suffixes.setdefault(name[1:], []).append(index)
+            else:
+                self.name_globs.append((name, index, directory))
+            return
+
+        node = self.root
+        for segment in segments:
+            if segment == '**':
+                node.deep = node.deep or _Node()
+                node = node.deep
+            elif WILDCARD.search(segment):
+                child = next((c for g, c in node.globs if g == segment), None)
+                if child is None:
+                    child = _Node()
+                    node.globs.append((segment, child))
+                node = child
+            else:
+                node = node.literal.setdefault(segment, _Node())
+        # A literal last segment may be a directory; a glob one names files
+        below = directory or segments[-1] == '**' or not WILDCARD.search(segments[-1])
+        node.rules.append((index, below))
+
+    def _rank(self, node: _Node) -> int:
+        best = max((index for index, _ in node.rules), default=-1)
+        for child in list(node.literal.values()) + [c for _, c in node.globs]:
+            best = max(best, self._rank(child))
+        if node.deep:
+            best = max(best, self._rank(node.deep))
+        node.best = best
+        return best
+
+    # -- Matching -------------------------------------------------------
+
+    def rule_index(self, path: str) -> int:
+        """Index of the last rule matching ``path`` (-1 when none does)."""
+        segments = [s for s in path.strip('/').split('/') if s]
+        if not segments:
+            return -1
+        best = self._match_names(segments)
+
+        stack = [(self.root, 0)]
+        while stack:
+            node, i = stack.pop()
+            if node.best <= best:
+                continue
+            for index, below in node.rules:
+                if index > best and (i == len(segments) or (below and i > 0)):
+                    best = index
+            if node.deep is not None and node.deep.best > best:
+                # ``**`` takes zero or more segments
+                stack.extend((node.deep, j) for j in range(i, len(segments) + 1))
+            if i == len(segments):
+                continue
+            child = node.literal.get(segments[i])
+            if child is not None:
+                stack.append((child, i + 1))
+            for glob, child in node.globs:
+                if child.best > best and fnmatchcase(segments[i], glob):
+                    stack.append((child, i + 1))
+        return best
+
+    def _match_names(self, segments: List[str]) -> int:
+        best = -1
+        last = len(segments) - 1
+        for position, segment in enumerate(segments):
+            for index, directory in self.names.get(segment, ()):
+                if not directory or position < last:
+                    best = max(best, index)
+        name = segments[-1]
+        start = name.find('.')
+        while start != -1:
+            for index in self.suffixes.get(name[start:], ()):
+                best = max(best, index)
+            start = name.find('.', start + 1)
+        for glob, index, directory in self.name_globs:
+            if index > best and any(fnmatchcase(segment, glob)
+                                    for segment in (segments[:-1] if directory else segments[-1:])):
+                best = index
+        return best
+
+    def match(self, path: str) -> Optional[str]:
+        """Label of the last rule matching ``path``, or None."""
+        index = self.rule_index(path)
+        return self.rules[index][1] if index >= 0 else None
+
+    def explain(self, path: str) -> str:
+        index = self.rule_index(path)
+        if index < 0:
+            return f"{path}: no rule"
+        pattern, label = self.rules[index]
+        return f"{path}: {label} (rule {index + 1}: {pattern})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Path policy - show which rule classifies a path')
+    parser.add_argument('policy', help='Policy file (e.g. .github/review-policy)')
+    parser.add_argument('paths', nargs='*', help='Paths to classify (default: read stdin)')
+    args = parser.parse_args()
+
+    policy = PathPolicy.load(args.policy)
+    for path in args.paths or (line.strip() for line in sys.stdin if line.strip()):
+        print(policy.explain(path))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Rate Limit - Shared GitHub API throttle for concurrent workers
+
+Follows GitHub's REST guidance: honour ``Retry-After``, wait for
+``X-RateLimit-Reset`` once ``X-RateLimit-Remaining`` runs out, back off
+exponentially (starting at one minute) on secondary rate limits that come
+without headers, and leave at least a second between mutating requests.
+Requests that are not idempotent (POST, PATCH) are only retried when GitHub
+provably rejected them, never after a server error.
+A pause triggered by one worker holds back every worker sharing the limiter.
+"""
+
+import threading
+import time
+from typing import Mapping, Optional
+
+# Minimum seconds between POST/PATCH/PUT/DELETE requests
+DEFAULT_WRITE_INTERVAL = 1.0
+
+# Pause until reset once this few requests remain
+DEFAULT_RESERVE = 10
+
+# Longest single wait we are prepared to sleep through
+MAX_BACKOFF = 900
+
+
+def header(headers: Optional[Mapping], name: str) -> Optional[str]:
+    """Case-insensitive header lookup."""
+    if not headers:
+        return None
+    for key, value in headers.items():
+        if key.lower() == name:
+            return None if value is None else str(value)
+    return None
+
+
+class RateLimiter:
+    """Thread-safe request gate shared by all workers of one token"""
+
+    def __init__(self, write_interval: float = DEFAULT_WRITE_INTERVAL,
+                 reserve: int = DEFAULT_RESERVE, max_backoff: float = MAX_BACKOFF):
+        self.write_interval = write_interval
+        self.reserve = reserve
+        self.max_backoff = max_backoff
+        self.remaining: Optional[int] = None
+        self.waited = 0.0
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self._next_write = 0.0
+
+    def acquire(self, write: bool = False):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.time()
+                wait = self._paused_until - now
+                if wait <= 0 and write:
+                    wait = self._next_write - now
+                if wait <= 0:
+                    if write:
+                        self._next_write = now + self.write_interval
+                    return
+                self.waited += wait
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hold back every worker for ``seconds``."""
+        seconds = min(max(seconds, 0.0), self.max_backoff)
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.time() + seconds)
+
+    def observe(self, headers: Optional[Mapping]):
+        """Track the primary limit from response headers."""
+        remaining = header(headers, 'x-ratelimit-remaining')
+        reset = header(headers, 'x-ratelimit-reset')
+        if remaining is None:
+            return
+        self.remaining = int(remaining)
+        if self.remaining <= self.reserve and reset:
+            self.pause(float(reset) - time.time() + 1)
+
+    def retry_delay(self, status: int, headers: Optional[Mapping], attempt: int,
+                    message: str = '', idempotent: bool = True) -> Optional[float]:
+        """Seconds to wait before retrying a failed request, or None if it is not retryable.
+
+        A server error may come after the request took effect, so only
+        ``idempotent`` requests are retried on 5xx.
+        """
+        retry_after = header(headers, 'retry-after')
+        if retry_after is not None and status in (403, 429) + ((502, 503) if idempotent else ()):
+            return min(float(retry_after), self.max_backoff)
+
+        if status in (403, 429):
+            remaining = header(headers, 'x-ratelimit-remaining')
+            reset = header(headers, 'x-ratelimit-reset')
+            if remaining == '0' and reset:
+                return min(max(float(reset) - time.time(), 0) + 1, self.max_backoff)
+            if status == 429 or (idempotent and 'rate limit' in message.lower()):
+                # Secondary limit without headers: at least a minute, doubling
+                return min(60 * 2 ** attempt, self.max_backoff)
+            return None
+
+        if status in (500, 502, 503, 504) and idempotent:
+            return min(2 ** attempt, self.max_backoff)
+        return None
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Review Cache - Reviewer verdicts and per-file results keyed by head SHA
+
+Every push to a PR used to mean a review from scratch. The reviewer now
+stores, per PR, the head SHA it reviewed, the verdict it reached and what it
+found in each changed file (policy label, changed lines, critical-pattern
+hits). A re-run on the same head SHA is answered from the cache; after a new
+push only the files touched since the cached head are analyzed again and
+merged with the cached results.
+
+Entries live in one gzip-compressed JSON file in the agent cache directory.
+They are only valid for the policy and limits they were made with: when
+those change (``config``), or the file is missing or corrupt, every PR is
+simply reviewed in full.
+"""
+
+import gzip
+import json
+import os
+import time
+from typing import Dict, Optional
+
+from agent_cache import cache_path
+
+CACHE_FILE = 'review-cache.json.gz'
+
+# Bump when the shape of cached entries changes
+CACHE_VERSION = 1
+
+# PRs kept, most recently reviewed first
+MAX_ENTRIES = 500
+
+
+class ReviewCache:
+    """Review entries per PR for one reviewer configuration"""
+
+    def __init__(self, config: str = '', path: Optional[str] = None):
+        self.path = path or str(cache_path(CACHE_FILE))
+        self.config = config
+        self.entries: Dict[str, Dict] = {}
+        self.load_error: Optional[str] = None
+
+    @staticmethod
+    def key(repo: str, number: int) -> str:
+        return f'{repo}#{number}'
+
+    def load(self):
+        """Load the cache file; any problem leaves an empty cache."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != CACHE_VERSION or data.get('config') != self.config:
+                self.load_error = 'incompatible cache version or review policy'
+                return
+            self.entries = data['entries']
+        except Exception as e:
+            self.entries = {}
+            self.load_error = f'corrupt cache ({e})'
+
+    def get(self, repo: str, number: int) -> Optional[Dict]:
+        return self.entries.get(self.key(repo, number))
+
+    def put(self, repo: str, number: int, entry: Dict):
+        entry['reviewed_at'] = time.time()
+        self.entries[self.key(repo, number)] = entry
+
+    def save(self):
+        """Write the cache back, keeping the most recently reviewed PRs."""
+        newest = sorted(self.entries.items(), key=lambda item: item[1].get('reviewed_at', 0),
+                        reverse=True)[:MAX_ENTRIES]
+        data = {
+            'version': CACHE_VERSION,
+            'config': self.config,
+            'entries': dict(newest),
+        }
+        tmp = self.path + '.tmp'
+        with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp, self.path)
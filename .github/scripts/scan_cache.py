@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Scan Cache - Persistent per-file findings keyed by content
+
+Each file is keyed by its git blob SHA (or size + mtime when git cannot
+vouch for the working copy). Findings for files whose key is unchanged are
+served from a gzip-compressed JSON file instead of being rescanned. A
+missing, corrupt or incompatible cache simply means a full scan.
+"""
+
+import gzip
+import json
+import os
+import subprocess
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from agent_cache import cache_path
+
+CACHE_FILE = 'scan-cache.json.gz'
+
+# Bump when the shape of cached findings changes
+CACHE_VERSION = 1
+
+
+def _git_lines(*args: str) -> Optional[List[str]]:
+    """Run a git command with -z output, or return None if git is unavailable."""
+    try:
+        result = subprocess.run(['git', *args, '-z'], capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return [item for item in result.stdout.decode('utf-8', errors='replace').split('\0') if item]
+
+
+def git_blob_shas() -> Dict[str, str]:
+    """Map tracked, unmodified paths to their blob SHA."""
+    staged = _git_lines('ls-files', '--stage')
+    if staged is None:
+        return {}
+
+    shas = {}
+    for item in staged:
+        # "<mode> <sha> <stage>\t<path>"
+        meta, _, path = item.partition('\t')
+        parts = meta.split()
+        if len(parts) == 3:
+            shas[path] = parts[1]
+
+    # Files modified in the working tree no longer match their index blob
+    for path in _git_lines('diff', '--name-only') or []:
+        shas.pop(path, None)
+    return shas
+
+
+def file_keys(paths: Iterable[str]) -> Dict[str, str]:
+    """Compute a content key for each path."""
+    blobs = git_blob_shas()
+    keys = {}
+    for path in paths:
+        sha = blobs.get(path)
+        if sha:
+            keys[path] = f'blob:{sha}'
+            continue
+        try:
+            st = os.stat(path)
+            keys[path] = f'stat:{st.st_size}:{st.st_mtime_ns}'
+        except OSError:
+            keys[path] = 'missing'
+    return keys
+
+
+class ScanCache:
+    """Findings cache for one scanner configuration"""
+
+    def __init__(self, config: str = '', path: Optional[str] = None):
+        self.path = path or str(cache_path(CACHE_FILE))
+        self.config = config
+        self.entries: Dict[str, Tuple[str, Dict]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.load_error: Optional[str] = None
+
+    def load(self):
+        """Load the cache file; any problem leaves an empty cache."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != CACHE_VERSION or data.get('config') != self.config:
+                self.load_error = 'incompatible cache version or scanner config'
+                return
+            self.entries = {path: (key, findings)
+                            for path, (key, findings) in data['entries'].items()}
+        except Exception as e:
+            self.entries = {}
+            self.load_error = f'corrupt cache ({e})'
+
+    def get(self, path: str, key: str) -> Optional[Dict]:
+        entry = self.entries.get(path)
+        if entry and entry[0] == key:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def put(self, path: str, key: str, findings: Dict):
+        self.entries[path] = (key, findings)
+
+    def save(self, keep: Optional[Iterable[str]] = None):
+        """Write the cache back.
+
+        With ``keep`` (a full scan), entries for paths not in it are dropped;
+        without it (a partial scan), every entry is kept.
+        """
+        keep = None if keep is None else set(keep)
+        data = {
+            'version': CACHE_VERSION,
+            'config': self.config,
+            'entries': {path: [key, findings]
+                        for path, (key, findings) in self.entries.items()
+                        if keep is None or path in keep},
+        }
+        tmp = self.path + '.tmp'
+        with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp, self.path)
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
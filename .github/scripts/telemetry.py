@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Telemetry - Per-run spans and counters for the agent scripts
+
+Records how long each phase took and what it cost (API calls per endpoint,
+retries, cache hits, files and bytes scanned), and exports it when the
+script exits:
+
+- ``<script>.json`` and ``<script>.prom`` (Prometheus textfile format) in
+  ``AGENT_METRICS_DIR`` (default ``.agent-cache/metrics``)
+- a short history, ``<script>-history.jsonl``, for run-over-run comparison
+- a table in ``$GITHUB_STEP_SUMMARY`` when running in Actions
+
+``AGENT_TELEMETRY=0`` turns the exports off; recording is always cheap.
+"""
+
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from agent_cache import cache_dir
+
+# Runs kept in the per-script history file
+HISTORY_LIMIT = 30
+
+METRIC_PREFIX = 'agent_'
+
+_current: Optional['Telemetry'] = None
+
+
+class Telemetry:
+    """Spans and labelled counters for one script run"""
+
+    def __init__(self, script: str):
+        self.script = script
+        self.started_at = time.time()
+        self._t0 = time.monotonic()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.spans: List[Dict] = []
+        self.counters: Dict[str, Dict[Tuple, float]] = {}
+        self.help: Dict[str, str] = {}
+        self.clients: List = []
+        self._phase = None
+        self.exported = False
+
+    # -- Recording ------------------------------------------------------
+
+    @contextmanager
+    def span(self, name: str):
+        """Time a block; nested spans are recorded as ``outer/inner``."""
+        stack = self._local.__dict__.setdefault('stack', [])
+        path = '/'.join(stack + [name])
+        stack.append(name)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            stack.pop()
+            self._record_span(path, started)
+
+    def phase(self, name: Optional[str]):
+        """End the current top-level phase (if any) and start ``name``."""
+        if self._phase:
+            self._record_span(*self._phase)
+        self._phase = (name, time.monotonic()) if name else None
+
+    def _record_span(self, path: str, started: float):
+        ended = time.monotonic()
+        with self._lock:
+            self.spans.append({
+                'name': path,
+                'start': round(started - self._t0, 6),
+                'seconds': round(ended - started, 6),
+            })
+
+    def count(self, name: str, value: float = 1, help: str = '', **labels):
+        """Add ``value`` to a counter."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+            if help:
+                self.help.setdefault(name, help)
+
+    def add_client(self, client):
+        """Read API and HTTP cache statistics from ``client`` at export time."""
+        self.clients.append(client)
+
+    # -- Export ---------------------------------------------------------
+
+    def _collect_clients(self):
+        for client in self.clients:
+            for endpoint, calls in client.requests_by_endpoint.items():
+                self.count('api_requests', calls, 'GitHub API requests', endpoint=endpoint)
+            self.count('api_retries', client.retry_count, 'GitHub API retries')
+            self.count('api_bytes_received', client.bytes_received, 'Response bytes received')
+            self.count('api_request_seconds', round(client.request_time, 6),
+                       'Time spent waiting on GitHub')
+            self.count('api_throttled_seconds', round(client.limiter.waited, 6),
+                       'Time spent in rate-limit pauses')
+            if client.cache:
+                self.count('http_cache_hits', client.cache.hits, 'Conditional GETs answered 304')
+                self.count('http_cache_misses', client.cache.misses, 'GETs that downloaded a body')
+                self.count('http_cache_bytes_saved', client.cache.bytes_saved,
+                           'Bytes served from the HTTP cache')
+        self.clients = []
+
+    def snapshot(self) -> Dict:
+        """Close open phases, fold in client statistics and return everything."""
+        self.phase(None)
+        self._collect_clients()
+        return {
+            'script': self.script,
+            'started_at': self.started_at,
+            'wall_seconds': round(time.monotonic() - self._t0, 6),
+            'spans': list(self.spans),
+            'counters': {
+                name: [{'labels': dict(key), 'value': value} for key, value in series.items()]
+                for name, series in self.counters.items()
+            },
+            'help': dict(self.help),
+        }
+
+    def export(self, directory: Optional[str] = None):
+        """Write JSON, Prometheus textfile, history and step summary."""
+        if self.exported or os.environ.get('AGENT_TELEMETRY', '1') == '0':
+            return
+        self.exported = True
+        data = self.snapshot()
+        try:
+            out = Path(directory or os.environ.get('AGENT_METRICS_DIR') or cache_dir() / 'metrics')
+            out.mkdir(parents=True, exist_ok=True)
+            _write_atomic(out / f'{self.script}.json', json.dumps(data, indent=2))
+            _write_atomic(out / f'{self.script}.prom', to_prometheus(data))
+            previous = _append_history(out / f'{self.script}-history.jsonl', data)
+        except OSError as e:
+            print(f"⚠️  Could not write telemetry: {e}")
+            previous = None
+
+        summary_file = os.environ.get('GITHUB_STEP_SUMMARY')
+        if summary_file:
+            try:
+                with open(summary_file, 'a') as f:
+                    f.write(to_markdown(data, previous))
+            except OSError as e:
+                print(f"⚠️  Could not write step summary: {e}")
+
+
+def start(script: str) -> Telemetry:
+    """Begin recording for ``script`` and export automatically at exit."""
+    global _current
+    _current = Telemetry(script)
+    atexit.register(_current.export)
+    return _current
+
+
+def get() -> Telemetry:
+    """The current run's recorder (an unexported one if start() was not called)."""
+    global _current
+    if _current is None:
+        _current = Telemetry('agent')
+    return _current
+
+
+def _metric_name(name: str) -> str:
+    return METRIC_PREFIX + re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: Dict) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def to_prometheus(data: Dict) -> str:
+    """Render a snapshot in the Prometheus text exposition format."""
+    script = data['script']
+    lines = [
+        f'# HELP {METRIC_PREFIX}run_seconds Wall time of the last run',
+        f'# TYPE {METRIC_PREFIX}run_seconds gauge',
+        f'{METRIC_PREFIX}run_seconds{_labels({"script": script})} {data["wall_seconds"]}',
+        f'# HELP {METRIC_PREFIX}run_timestamp_seconds Start time of the last run',
+        f'# TYPE {METRIC_PREFIX}run_timestamp_seconds gauge',
+        f'{METRIC_PREFIX}run_timestamp_seconds{_labels({"script": script})} {data["started_at"]:.3f}',
+        f'# HELP {METRIC_PREFIX}span_seconds Duration of each phase in the last run',
+        f'# TYPE {METRIC_PREFIX}span_seconds gauge',
+    ]
+    totals: Dict[str, float] = {}
+    for span in data['spans']:
+        totals[span['name']] = totals.get(span['name'], 0) + span['seconds']
+    for name, seconds in totals.items():
+        lines.append(f'{METRIC_PREFIX}span_seconds{_labels({"script": script, "span": name})} '
+                     f'{seconds:.6f}')
+    for name, series in sorted(data['counters'].items()):
+        metric = _metric_name(name)
+        help_text = data.get('help', {}).get(name) or name.replace('_', ' ')
+        lines.append(f'# HELP {metric} {help_text} in the last run')
+        lines.append(f'# TYPE {metric} gauge')
+        for sample in series:
+            lines.append(f'{metric}{_labels({"script": script, **sample["labels"]})} {sample["value"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def to_markdown(data: Dict, previous: Optional[Dict] = None) -> str:
+    """Render a snapshot as a step summary section."""
+    wall = data['wall_seconds']
+    trend = ''
+    if previous:
+        delta = wall - previous['wall_seconds']
+        trend = f" ({'+' if delta >= 0 else ''}{delta:.2f}s vs previous run)"
+    lines = [f"### ⏱️ {data['script']} telemetry", '', f"**Wall time**: {wall:.2f}s{trend}", '']
+
+    if data['spans']:
+        lines += ['| Phase | Seconds |', '|---|---:|']
+        lines += [f"| {span['name']} | {span['seconds']:.2f} |" for span in data['spans']]
+        lines.append('')
+
+    totals = []
+    for name, series in sorted(data['counters'].items()):
+        total = sum(sample['value'] for sample in series)
+        totals.append(f"| {name} | {total:g} |")
+    if totals:
+        lines += ['| Counter | Total |', '|---|---:|'] + totals + ['']
+    return '\n'.join(lines) + '\n'
+
+
+def _write_atomic(path: Path, text: str):
+    """Write via a temporary file so textfile collectors never see half a file."""
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+def _append_history(path: Path, data: Dict) -> Optional[Dict]:
+    """Append a run summary, trim to HISTORY_LIMIT and return the previous run."""
+    entries = []
+    try:
+        with open(path) as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+    except (OSError, ValueError):
+        entries = []
+    previous = entries[-1] if entries else None
+
+    spans: Dict[str, float] = {}
+    for span in data['spans']:
+        spans[span['name']] = round(spans.get(span['name'], 0) + span['seconds'], 6)
+    entries.append({
+        'started_at': data['started_at'],
+        'wall_seconds': data['wall_seconds'],
+        'spans': spans,
+        'counters': {name: sum(s['value'] for s in series) for name, series in data['counters'].items()},
+    })
+    _write_atomic(path, ''.join(json.dumps(e) + '\n' for e in entries[-HISTORY_LIMIT:]))
+    return previous
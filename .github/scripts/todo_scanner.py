@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+TODO Scanner - Parallel, streaming TODO/FIXME detection
+
+Reads files in binary chunks (never the whole file at once), skips binary and
+oversized files, and fans the work out over a process pool. Results come back
+in the same order as the input paths so reports stay stable between runs.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
+from typing import Dict, Iterable, List, Optional
+
+# Markers that produce a finding
+MARKERS = (b'TODO', b'FIXME')
+
+# Bytes read per chunk
+CHUNK_SIZE = 64 * 1024
+
+# Files larger than this are skipped (generated code, data dumps, ...)
+MAX_FILE_BYTES = 2 * 1024 * 1024
+
+# ``skipped`` reason for files left unscanned when the deadline passes
+BUDGET_EXCEEDED = 'time budget exceeded'
+
+# Below this many files a process pool costs more than it saves
+MIN_PARALLEL_FILES = 64
+
+
+def _has_marker(data: bytes) -> bool:
+    return any(marker in data for marker in MARKERS)
+
+
+def scan_file(path: str, max_bytes: int = MAX_FILE_BYTES) -> Dict:
+    """Scan one file for TODO/FIXME lines.
+
+    Returns a dict with the file path, the matching ``(line, text)`` pairs,
+    the number of bytes read and a ``skipped`` reason (or None).
+    """
+    result = {'file': path, 'todos': [], 'bytes': 0, 'skipped': None}
+
+    try:
+        size = os.path.getsize(path)
+        if size > max_bytes:
+            result['skipped'] = f'too large ({size} bytes)'
+            return result
+
+        line_no = 1
+        pending = b''
+        first_chunk = True
+
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                result['bytes'] += len(chunk)
+
+                if first_chunk:
+                    first_chunk = False
+                    if b'\0' in chunk:
+                        result['skipped'] = 'binary'
+                        result['bytes'] = len(chunk)
+                        return result
+
+                data = pending + chunk
+                cut = data.rfind(b'\n')
+                if cut == -1:
+                    pending = data
+                    continue
+                pending = data[cut + 1:]
+                complete = data[:cut]
+
+                # Fast path: most chunks contain no markers at all
+                if not _has_marker(complete):
+                    line_no += complete.count(b'\n') + 1
+                    continue
+
+                for raw in complete.split(b'\n'):
+                    if _has_marker(raw):
+                        result['todos'].append(
+                            (line_no, raw.decode('utf-8', errors='replace').strip())
+                        )
+                    line_no += 1
+
+        if pending and _has_marker(pending):
+            result['todos'].append(
+                (line_no, pending.decode('utf-8', errors='replace').strip())
+            )
+
+    except OSError as e:
+        result['skipped'] = f'unreadable ({e})'
+
+    return result
+
+
+def _scan_file_args(args) -> Dict:
+    return scan_file(*args)
+
+
+def _skipped(path: str, reason: str) -> Dict:
+    return {'file': path, 'todos': [], 'bytes': 0, 'skipped': reason}
+
+
+def scan_files(paths: Iterable[str], workers: Optional[int] = None,
+               max_bytes: int = MAX_FILE_BYTES,
+               deadline: Optional[float] = None) -> List[Dict]:
+    """Scan many files, in parallel when worthwhile.
+
+    Results are returned in the order of ``paths``. When ``deadline`` (a
+    ``time.monotonic()`` value) passes, files not yet scanned come back
+    with ``skipped`` set instead of holding up the run.
+    """
+    paths = list(paths)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 or len(paths) < MIN_PARALLEL_FILES:
+        results = []
+        for path in paths:
+            if deadline is not None and time.monotonic() >= deadline:
+                results.append(_skipped(path, BUDGET_EXCEEDED))
+            else:
+                results.append(scan_file(path, max_bytes))
+        return results
+
+    if deadline is None:
+        chunksize = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_scan_file_args,
+                                 ((path, max_bytes) for path in paths),
+                                 chunksize=chunksize))
+
+    results: Dict[str, Dict] = {}
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = {pool.submit(scan_file, path, max_bytes): path for path in paths}
+        try:
+            for future in as_completed(futures, timeout=max(0.0, deadline - time.monotonic())):
+                results[futures[future]] = future.result()
+        except FuturesTimeout:
+            pass
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return [results.get(path) or _skipped(path, BUDGET_EXCEEDED) for path in paths]
+
+
+def to_findings(results: Iterable[Dict]) -> List[Dict]:
+    """Flatten scan results into orchestrator ``findings['todos']`` records."""
+    todos = []
+    for result in results:
+        for line, text in result['todos']:
+            todos.append({'file': result['file'], 'line': line, 'text': text})
+    return todos
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Tree Walker - Single pruned, .gitignore-aware repository walk
+
+Visits every path at most once, prunes ignored directories before descending
+into them, and hands each kept file to the detectors that asked for it.
+Honours nested ``.gitignore`` files, ``.git/info/exclude`` and an extra
+exclude list, and keeps count of what was skipped.
+"""
+
+import os
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Always pruned, on top of .gitignore (gitignore syntax)
+DEFAULT_EXCLUDES = [
+    '.git/',
+    '__pycache__/',
+    'node_modules/',
+    'venv/',
+    '.venv/',
+    '.tox/',
+    '.nox/',
+    'build/',
+    'dist/',
+    'site-packages/',
+    '*.egg-info/',
+    '.mypy_cache/',
+    '.pytest_cache/',
+    '.agent-cache/',
+]
+
+
+def _translate(pattern: str) -> str:
+    """Translate a gitignore glob (without anchoring) into a regex body."""
+    out = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern.startswith('**/', i):
+                out.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern.startswith('**', i):
+                out.append('.*')
+                i += 2
+                continue
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end
+        elif c == '\\' and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 1
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+class IgnoreRule:
+    """One compiled gitignore line, relative to the directory it came from"""
+
+    def __init__(self, pattern: str, base: str = ''):
+        self.base = base
+        self.negate = pattern.startswith('!')
+        if self.negate:
+            pattern = pattern[1:]
+        self.dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+
+        anchored = '/' in pattern
+        pattern = pattern.lstrip('/')
+        prefix = '^' if anchored else '^(?:.*/)?'
+        self.regex = re.compile(prefix + _translate(pattern) + '$')
+
+    def matches(self, rel_path: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        if self.base:
+            if not rel_path.startswith(self.base + '/'):
+                return False
+            rel_path = rel_path[len(self.base) + 1:]
+        return bool(self.regex.match(rel_path))
+
+
+def parse_ignore_lines(lines: Iterable[str], base: str = '') -> List[IgnoreRule]:
+    """Parse gitignore-format lines into rules."""
+    rules = []
+    for line in lines:
+        line = line.rstrip('\n').rstrip('\r')
+        if not line.endswith('\\ '):
+            line = line.rstrip(' ')
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('\\#') or line.startswith('\\!'):
+            line = line[1:]
+        rules.append(IgnoreRule(line, base))
+    return rules
+
+
+def _read_ignore_file(path: str, base: str) -> List[IgnoreRule]:
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            return parse_ignore_lines(f, base)
+    except OSError:
+        return []
+
+
+def is_ignored(rules: List[IgnoreRule], rel_path: str, is_dir: bool) -> bool:
+    """Apply rules in order; the last matching rule wins."""
+    ignored = False
+    for rule in rules:
+        if rule.negate == ignored and rule.matches(rel_path, is_dir):
+            ignored = not rule.negate
+    return ignored
+
+
+def path_matches(rules: List[IgnoreRule], rel_path: str) -> bool:
+    """Whether a file path, or any directory above it, is matched by the rules."""
+    parts = rel_path.split('/')
+    if any(is_ignored(rules, '/'.join(parts[:i]), True) for i in range(1, len(parts))):
+        return True
+    return is_ignored(rules, rel_path, False)
+
+
+class WalkStats:
+    """Counters for one walk"""
+
+    def __init__(self):
+        self.dirs_visited = 0
+        self.files_visited = 0
+        self.bytes_visited = 0
+        self.dirs_pruned = 0
+        self.files_skipped = 0
+        self.bytes_skipped = 0
+
+    @property
+    def entries_skipped(self) -> int:
+        return self.dirs_pruned + self.files_skipped
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            'dirs_visited': self.dirs_visited,
+            'files_visited': self.files_visited,
+            'bytes_visited': self.bytes_visited,
+            'dirs_pruned': self.dirs_pruned,
+            'files_skipped': self.files_skipped,
+            'bytes_skipped': self.bytes_skipped,
+        }
+
+
+# A detector gets the relative path and file name and says whether it wants it
+Detector = Callable[[str, str], bool]
+
+
+class TreeWalker:
+    """Walk a repository once and feed every registered detector"""
+
+    def __init__(self, root: str = '.', excludes: Optional[List[str]] = None,
+                 use_gitignore: bool = True):
+        self.root = root
+        self.use_gitignore = use_gitignore
+        self.exclude_rules = parse_ignore_lines(
+            DEFAULT_EXCLUDES if excludes is None else excludes
+        )
+        self.detectors: Dict[str, Detector] = {}
+        self.stats = WalkStats()
+
+    def add_detector(self, name: str, wants: Detector):
+        """Register a detector; matching files are collected under ``name``."""
+        self.detectors[name] = wants
+
+    def _root_rules(self) -> List[IgnoreRule]:
+        if not self.use_gitignore:
+            return []
+        return _read_ignore_file(
+            os.path.join(self.root, '.git', 'info', 'exclude'), ''
+        )
+
+    def walk(self) -> Dict[str, List[Tuple[str, int]]]:
+        """Walk the tree and return ``{detector: [(path, size), ...]}``.
+
+        Paths are relative to the root and sorted, so output is stable.
+        """
+        collected: Dict[str, List[Tuple[str, int]]] = {name: [] for name in self.detectors}
+        stack = [('', self._root_rules())]
+
+        while stack:
+            rel_dir, inherited = stack.pop()
+            abs_dir = os.path.join(self.root, rel_dir) if rel_dir else self.root
+
+            rules = inherited
+            if self.use_gitignore:
+                local = _read_ignore_file(os.path.join(abs_dir, '.gitignore'), rel_dir)
+                if local:
+                    rules = inherited + local
+
+            try:
+                entries = sorted(os.scandir(abs_dir), key=lambda e: e.name)
+            except OSError:
+                continue
+            self.stats.dirs_visited += 1
+
+            subdirs = []
+            for entry in entries:
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+
+                skip = (is_ignored(self.exclude_rules, rel, is_dir)
+                        or is_ignored(rules, rel, is_dir))
+
+                if is_dir:
+                    if skip:
+                        self.stats.dirs_pruned += 1
+                    else:
+                        subdirs.append(rel)
+                    continue
+
+                try:
+                    size = entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    size = 0
+
+                if skip:
+                    self.stats.files_skipped += 1
+                    self.stats.bytes_skipped += size
+                    continue
+
+                self.stats.files_visited += 1
+                self.stats.bytes_visited += size
+                for name, wants in self.detectors.items():
+                    if wants(rel, entry.name):
+                        collected[name].append((rel, size))
+
+            for sub in reversed(subdirs):
+                stack.append((sub, rules))
+
+        for items in collected.values():
+            items.sort()
+        return collected
+
+    def collect(self, paths: Iterable[str]) -> Dict[str, List[Tuple[str, int]]]:
+        """Feed an explicit path list (e.g. a git diff) to the detectors.
+
+        Applies the exclude list but not .gitignore, since such lists come
+        from git and only hold tracked files. Missing paths are dropped.
+        """
+        collected: Dict[str, List[Tuple[str, int]]] = {name: [] for name in self.detectors}
+        for rel in sorted(set(paths)):
+            if path_matches(self.exclude_rules, rel):
+                self.stats.files_skipped += 1
+                continue
+            try:
+                size = os.stat(os.path.join(self.root, rel)).st_size
+            except OSError:
+                continue
+
+            self.stats.files_visited += 1
+            self.stats.bytes_visited += size
+            name = rel.rsplit('/', 1)[-1]
+            for detector, wants in self.detectors.items():
+                if wants(rel, name):
+                    collected[detector].append((rel, size))
+        return collected
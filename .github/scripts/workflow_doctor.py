@@ -4,27 +4,48 @@ Workflow Doctor - Automated Workflow Failure Diagnosis and Repair
 
 This script analyzes GitHub Actions workflow failures and attempts to automatically
 fix common issues like missing permissions, syntax errors, and configuration problems.
+
+With --batch it sweeps every failed run in a time window instead, diagnosing
+runs concurrently over one client and reporting each distinct failure once.
+With --lint it checks the workflow files for CI-time anti-patterns instead
+(see workflow_lint.py), applying the safe fixes with --fix.
 """
 
 import os
 import sys
-import json
 import re
-import yaml
 import argparse
+import sqlite3
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
 from typing import Dict, List, Tuple, Optional
-from github import Github
 from pathlib import Path
 
+import telemetry
+import workflow_index
+import workflow_lint
+from actions_output import multiline
+from failure_classifier import FailureClassifier, merge_tables, load_table, table_key
+from github_client import GitHubClient, GitHubError
+from failure_archive import EXCERPT_TAIL_LINES, FailureArchive, excerpt_text
+from failure_signatures import SignatureStore, signature
+from log_reader import TAIL_LINES, TIMESTAMP, FailureLogs
+from workflow_patch import WorkflowPatch
+
 
 class WorkflowDoctor:
     """Diagnose and fix GitHub Actions workflow failures"""
     
-    # Common failure patterns and their fixes
+    # Common failure patterns and their fixes. Weights rank the categories when
+    # several match; a pattern may be {'pattern': ..., 'weight': ...}.
+    # More can be added from a file (--patterns / DOCTOR_PATTERNS_FILE).
     FAILURE_PATTERNS = {
         'permissions': {
             'patterns': [
-                r'Resource not accessible by integration',
+                {'pattern': r'Resource not accessible by integration', 'weight': 3},
                 r'403.*permissions',
                 r'x-accepted-github-permissions.*issues=write',
                 r'x-accepted-github-permissions.*pull_requests=write',
@@ -34,7 +55,7 @@ class WorkflowDoctor:
         },
         'syntax': {
             'patterns': [
-                r'Invalid workflow file',
+                {'pattern': r'Invalid workflow file', 'weight': 3},
                 r'yaml.*syntax error',
                 r'unexpected token',
                 r'mapping values are not allowed',
@@ -52,7 +73,7 @@ class WorkflowDoctor:
         },
         'dependency': {
             'patterns': [
-                r'ModuleNotFoundError',
+                {'pattern': r'ModuleNotFoundError', 'weight': 2},
                 r'No module named',
                 r'cannot import name',
                 r'pip.*failed',
@@ -62,21 +83,56 @@ class WorkflowDoctor:
         },
         'timeout': {
             'patterns': [
-                r'The job running on .* exceeded the maximum execution time',
-                r'timeout',
-                r'cancelled',
+                {'pattern': r'The job running on .* exceeded the maximum execution time', 'weight': 3},
+                # Generic words: only decisive when nothing more specific matched
+                {'pattern': r'timeout', 'weight': 0.3},
+                {'pattern': r'cancelled', 'weight': 0.3},
             ],
             'auto_fixable': True,
             'fix_function': 'fix_timeout_issue'
+        },
+        'error': {
+            # Actions error annotations: kept as evidence, never a diagnosis
+            'patterns': [r'##\[error\]'],
+            'weight': 0,
+            'auto_fixable': False,
+            'fix_function': None
         }
     }
     
-    def __init__(self, repo_name: str, run_id: str, workflow_name: str):
+    # Granted by the permissions fix (never lowering what the workflow already has)
+    REQUIRED_PERMISSIONS = {
+        'contents': 'read',
+        'issues': 'write',
+        'pull-requests': 'write',
+        'actions': 'read'
+    }
+    
+    def __init__(self, repo_name: str, run_id: str, workflow_name: str,
+                 patterns_file: Optional[str] = None, rescan: bool = False,
+                 client: Optional[GitHubClient] = None, signatures: Optional[SignatureStore] = None,
+                 run: Optional[Dict] = None):
         self.repo_name = repo_name
         self.run_id = run_id
         self.workflow_name = workflow_name
-        self.github = Github(os.environ['GITHUB_TOKEN'])
-        self.repo = self.github.get_repo(repo_name)
+        self.client = client or GitHubClient()
+        
+        self.patterns = self.FAILURE_PATTERNS
+        if patterns_file:
+            self.patterns = merge_tables(self.FAILURE_PATTERNS, load_table(patterns_file))
+            print(f"  Loaded failure patterns from {patterns_file}")
+        self.classifier = FailureClassifier(self.patterns)
+        # Remembered diagnoses made with another pattern table are classified again
+        self.patterns_key = table_key(self.patterns)
+        
+        # Known failures are answered from the signature store unless rescan is set
+        self.signatures = signatures or SignatureStore()
+        self.rescan = rescan
+        self.signature = None
+        self.sample = []
+        self.tails = []
+        self.known = None
+        self.run = run
         
         # Results
         self.issue_type = None
@@ -84,55 +140,94 @@ class WorkflowDoctor:
         self.recommendations = []
         self.auto_fix_available = False
         self.pr_body = ""
+        self.evidence = []
+        self.confidence = 0.0
+        self.scores = {}
     
     def diagnose(self) -> bool:
         """Analyze the failed workflow run"""
         print(f"🔍 Diagnosing workflow run #{self.run_id}")
         
         try:
-            # Get workflow run details
-            run = self.repo.get_workflow_run(int(self.run_id))
+            # Get workflow run details (batch mode already has them from the run listing)
+            run = self.run = self.run or self.client.get_workflow_run(self.repo_name, int(self.run_id))
             
             # Get failed jobs
-            jobs = run.jobs()
-            failed_jobs = [job for job in jobs if job.conclusion == 'failure']
+            jobs = self.client.list_run_jobs(self.repo_name, int(self.run_id))
+            failed_jobs = [job for job in jobs if job['conclusion'] == 'failure']
             
             if not failed_jobs:
+                # A run without jobs is what GitHub records for a workflow file it cannot parse
+                workflow = self.workflow()
+                if workflow and workflow.get('error'):
+                    self.issue_type = 'syntax'
+                    self.confidence = 1.0
+                    self.evidence = [{'job': workflow['path'], 'step': 'parse', 'line': 0,
+                                      'text': workflow['error'].splitlines()[0],
+                                      'before': [], 'after': workflow['error'].splitlines()[1:]}]
+                    print(f"✅ Detected issue type: syntax ({workflow['path']} does not parse)")
+                    return True
                 print("No failed jobs found")
                 return False
             
             # Analyze logs from failed jobs
             all_logs = []
             for job in failed_jobs:
-                print(f"  Analyzing job: {job.name}")
-                for step in job.steps:
-                    if step.conclusion == 'failure':
+                print(f"  Analyzing job: {job['name']}")
+                for step in job.get('steps') or []:
+                    if step['conclusion'] == 'failure':
                         # Get step logs (GitHub API doesn't expose this directly, so we infer from name)
                         all_logs.append({
-                            'job': job.name,
-                            'step': step.name,
-                            'conclusion': step.conclusion
+                            'job': job['name'],
+                            'step': step['name'],
+                            'conclusion': step['conclusion']
                         })
             
-            # Try to get raw logs via API
-            try:
-                # Note: This is a simplified version. In production, you'd need to download and parse logs
-                log_url = run.logs_url
-                print(f"  Log URL: {log_url}")
-            except:
-                pass
+            with FailureLogs(self.client, self.repo_name, run['id'], failed_jobs) as logs:
+                # A failure seen before is recognised from the tails of its failing steps
+                if logs.sources:
+                    self.tails = logs.tails(EXCERPT_TAIL_LINES)
+                    self.signature, self.sample = signature(
+                        (source, lines[-TAIL_LINES:]) for source, lines in self.tails)
+                    if not self.rescan:
+                        self.known = self.signatures.lookup(self.signature, self.patterns_key)
+                if self.known and self.known['issue_type'] in self.patterns:
+                    print(f"⚡ Known failure signature {self.signature[:10]} - skipping the pattern scan")
+                    if self.known['fix_attempts']:
+                        print(f"  Previous auto-fixes: {self.known['fix_successes']}/"
+                              f"{self.known['fix_attempts']} applied (last: {self.known['last_fix']})")
+                    result = {
+                        'category': self.known['issue_type'],
+                        'confidence': self.known['confidence'],
+                        'scores': {},
+                        'evidence': self.known['evidence'],
+                    }
+                else:
+                    # Stream the failing steps' logs and keep the lines that explain the failure
+                    matches = logs.matches(self.classifier.match_line)
+                    print(f"  Log lines matched: {len(matches)}")
+                    result = self.classifier.classify(matches)
             
-            # Pattern matching on available data
-            log_text = json.dumps(all_logs)
+            if not result['category']:
+                # Nothing in the logs: fall back to the job and step names
+                names = [dict(entry, line=0, text=f"{entry['job']} / {entry['step']}", before=[], after=[])
+                         for entry in all_logs]
+                for entry in names:
+                    entry['labels'] = self.classifier.match_line(entry['text'])
+                named = self.classifier.classify(names)
+                if named['category']:
+                    result = dict(named, evidence=result['evidence'] or named['evidence'])
             
-            # Check each failure pattern
-            for issue_type, config in self.FAILURE_PATTERNS.items():
-                for pattern in config['patterns']:
-                    if re.search(pattern, log_text, re.IGNORECASE):
-                        self.issue_type = issue_type
-                        self.auto_fix_available = config['auto_fixable']
-                        print(f"✅ Detected issue type: {issue_type}")
-                        return True
+            self.evidence = result['evidence']
+            self.scores = result['scores']
+            self.confidence = result['confidence']
+            if result['category']:
+                self.issue_type = result['category']
+                self.auto_fix_available = bool(self.patterns[self.issue_type].get('auto_fixable'))
+                ranking = ', '.join(f"{name} {score:g}" for name, score in self.scores.items())
+                print(f"✅ Detected issue type: {self.issue_type} "
+                      f"(confidence {self.confidence:.0%}; {'scores: ' + ranking if ranking else 'remembered'})")
+                return True
             
             # If no pattern matched, provide generic diagnosis
             self.issue_type = "unknown"
@@ -169,14 +264,7 @@ The workflow failed because it lacks the necessary permissions to interact with
 The workflow failed with a 403 permission error because GitHub Actions now requires explicit permission grants.
 
 ### Solution
-Added the following `permissions:` block to the workflow file:
-
-```yaml
-permissions:
-  contents: read
-  issues: write
-  pull-requests: write
-```
+Granted the missing permissions in the workflow's top-level `permissions:` block. Existing grants are never lowered, and the rest of the file (comments and formatting included) is untouched; see the diff below.
 
 ### Testing
 - [x] Validated YAML syntax
@@ -207,6 +295,22 @@ The workflow failed because required Python packages are not installed.
                 "Check for typos in package names"
             ]
         
+        elif self.issue_type == 'syntax':
+            workflow = self.workflow()
+            self.diagnosis = f"""
+**Issue Type**: Invalid Workflow File
+
+The workflow file could not be parsed, so GitHub could not start any of its jobs.
+
+**Root Cause**: `{workflow['path'] if workflow else 'The workflow file'}` is not valid YAML or not a valid workflow.
+            """
+            
+            self.recommendations = [
+                "Fix the YAML error at the line and column reported below",
+                "Validate workflow files locally with `actionlint` before pushing",
+                "Check indentation and quote values containing `:` or `#`"
+            ]
+        
         elif self.issue_type == 'timeout':
             self.diagnosis = """
 **Issue Type**: Workflow Timeout
@@ -239,48 +343,107 @@ The workflow failed but the specific issue could not be automatically identified
                 "Test workflow changes in a separate branch",
                 "Consult GitHub Actions documentation"
             ]
+        
+        if self.evidence:
+            self.diagnosis += self.evidence_markdown()
+            if self.pr_body:
+                self.pr_body += self.evidence_markdown()
+    
+    def remember(self, fix_applied: Optional[bool] = None, archive: Optional[FailureArchive] = None):
+        """Store this run's signature, diagnosis and fix outcome for next time"""
+        if not self.signature:
+            return
+        if not self.known:
+            self.signatures.record(
+                self.signature, self.sample,
+                issue_type=self.issue_type if self.issue_type != 'unknown' else None,
+                confidence=self.confidence, diagnosis=self.diagnosis,
+                recommendations=self.recommendations, evidence=self.evidence,
+                patterns=self.patterns_key)
+        run = self.run or {}
+        self.signatures.sighting(self.signature, int(self.run_id),
+                                 workflow=run.get('name') or self.workflow_name,
+                                 head_sha=run.get('head_sha', ''))
+        if fix_applied is not None:
+            self.signatures.record_fix(self.signature, fix_applied)
+        
+        # Keep an excerpt of each failing step searchable after GitHub expires the logs
+        try:
+            owned = archive is None
+            archive = archive or FailureArchive()
+            for source, tail in self.tails:
+                evidence = [m for m in self.evidence
+                            if m.get('job') == source['job'] and m.get('step') == source['step']]
+                archive.add(excerpt_text(tail, evidence), int(self.run_id), source['job'], source['step'],
+                            workflow=run.get('name') or self.workflow_name,
+                            head_sha=run.get('head_sha', ''), issue_type=self.issue_type or '',
+                            signature=self.signature)
+            if owned:
+                archive.close()
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️  Could not archive log excerpts: {e}")
+    
+    def evidence_markdown(self, limit: int = 5) -> str:
+        """Matched log lines with their context, for the diagnosis and PR body"""
+        text = f"\n**Confidence**: {self.confidence:.0%}\n\n**Log evidence**:\n"
+        for match in self.evidence[:limit]:
+            snippet = '\n'.join(match['before'] + [match['text']] + match['after'])
+            text += f"\n`{match['job']}` / `{match['step']}`, line {match['line']}:\n```\n{snippet}\n```\n"
+        return text
+    
+    def workflow(self) -> Optional[Dict]:
+        """The failed run's entry in the workflow index (by run path, else by name)"""
+        try:
+            return workflow_index.load().find(self.workflow_name, (self.run or {}).get('path'))
+        except ImportError:
+            print("⚠️  PyYAML is not installed; cannot read workflow files")
+            return None
+    
+    def find_workflow_file(self) -> Optional[Path]:
+        """The failed run's workflow file"""
+        workflow = self.workflow()
+        return Path(workflow['path']) if workflow else None
     
     def fix_permissions_issue(self):
         """Auto-fix: Add missing permissions to workflow file"""
         print("🔧 Applying auto-fix for permissions issue...")
         
-        # Find the workflow file
-        workflow_path = None
-        for yaml_file in Path('.github/workflows').glob('*.yml'):
-            with open(yaml_file) as f:
-                content = f.read()
-                if self.workflow_name in content:
-                    workflow_path = yaml_file
-                    break
-        
+        workflow_path = self.find_workflow_file()
         if not workflow_path:
             print("❌ Could not find workflow file")
             return False
         
         print(f"  Found workflow file: {workflow_path}")
         
-        # Load YAML
-        with open(workflow_path) as f:
-            workflow = yaml.safe_load(f)
-        
-        # Check if permissions already exist
-        if 'permissions' in workflow:
-            print("  Permissions block already exists, updating...")
-        else:
+        # Read from the index, edit as lines so the diff stays a few lines long
+        patch = WorkflowPatch.load(workflow_path)
+        current = self.workflow()['permissions']
+        if current == 'write-all':
+            print("  Workflow already grants write-all; nothing to add")
+            return False
+        expanded = {}
+        if current == 'read-all':
+            # A mapping replaces the shorthand, so every scope it covered has to be listed
+            current = expanded = {scope: 'read' for scope in READ_ALL_SCOPES}
+            print("  Expanding read-all into an explicit permissions block...")
+        elif not isinstance(current, dict):
+            current = {}
             print("  Adding new permissions block...")
+        else:
+            print("  Permissions block already exists, updating...")
         
-        # Add/update permissions
-        workflow['permissions'] = {
-            'contents': 'read',
-            'issues': 'write',
-            'pull-requests': 'write',
-            'actions': 'read'
-        }
-        
-        # Write back to file
-        with open(workflow_path, 'w') as f:
-            yaml.dump(workflow, f, default_flow_style=False, sort_keys=False)
+        grants = {scope: level for scope, level in self.REQUIRED_PERMISSIONS.items()
+                  if PERMISSION_LEVELS.get(current.get(scope), 0) < PERMISSION_LEVELS[level]}
+        if not grants:
+            print("  Every required permission is already granted")
+            return False
+        patch.set_mapping('permissions', {**expanded, **grants})
+        patch.save()
+        workflow_index.refresh(workflow_path)
         
+        print(f"  Changed {patch.changed_lines()} lines: " +
+              ', '.join(f"{scope}: {level}" for scope, level in grants.items()))
+        self.pr_body += f"\n### Changes\n```diff\n{patch.diff()}```\n"
         print("✅ Permissions fix applied")
         return True
     
@@ -296,15 +459,96 @@ The workflow failed but the specific issue could not be automatically identified
         print("⚠️ Dependency fixes require manual intervention")
         return False
     
+    def job_durations(self) -> Dict[str, List[float]]:
+        """Job durations (seconds) from the workflow's recent successful runs"""
+        workflow = (self.run or {}).get('workflow_id')
+        runs = list(islice(self.client.list_workflow_runs(
+            self.repo_name, workflow=workflow, status='success',
+            per_page=TIMEOUT_SAMPLE_RUNS), TIMEOUT_SAMPLE_RUNS))
+        
+        def jobs(run):
+            return list(self.client.list_run_jobs(self.repo_name, run['id']))
+        
+        durations: Dict[str, List[float]] = {}
+        with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as pool:
+            for run_jobs in pool.map(jobs, runs):
+                for job in run_jobs:
+                    seconds = _seconds(job)
+                    if job.get('conclusion') == 'success' and seconds is not None:
+                        durations.setdefault(job['name'], []).append(seconds)
+        print(f"  Timed {sum(map(len, durations.values()))} jobs from {len(runs)} successful runs")
+        return durations
+    
     def fix_timeout_issue(self):
-        """Auto-fix: Add timeout-minutes to jobs"""
+        """Auto-fix: Add timeout-minutes to jobs, sized from their run history"""
         print("🔧 Applying auto-fix for timeout issue...")
         
-        # Find and update workflow file to add timeout-minutes
-        # This is a placeholder for actual implementation
+        workflow_path = self.find_workflow_file()
+        if not workflow_path:
+            print("❌ Could not find workflow file")
+            return False
+        print(f"  Found workflow file: {workflow_path}")
         
-        print("⚠️ Timeout fixes require manual intervention")
-        return False
+        # Matrix legs are timed separately; a job gets the limit of its slowest leg
+        index = workflow_index.load()
+        workflow = self.workflow()
+        per_job: Dict[str, Dict] = {}
+        for name, stats in timing_stats(self.job_durations()).items():
+            job_id = index.job_for(workflow, name)
+            if job_id and stats['runs'] >= TIMEOUT_MIN_SAMPLES and (
+                    job_id not in per_job or stats['timeout'] > per_job[job_id]['timeout']):
+                per_job[job_id] = stats
+        if not per_job:
+            print(f"⚠️ Not enough successful runs to size timeouts (need {TIMEOUT_MIN_SAMPLES} per job)")
+            return False
+        
+        # Insert missing limits and raise low ones; higher limits were chosen by someone
+        patch = WorkflowPatch.load(workflow_path)
+        changes: Dict[str, Tuple] = {}
+        for job, config in workflow['jobs'].items():
+            if job not in per_job or config['uses']:
+                continue  # reusable workflow calls take no timeout
+            new = per_job[job]['timeout']
+            old = config['timeout_minutes']
+            if old is not None and (not isinstance(old, int) or old >= new):
+                continue  # an expression, or a limit someone already made generous
+            patch.set_value('timeout-minutes', new, job=job)
+            changes[job] = (old, new)
+        if not changes:
+            print("  Every job already has a sufficient timeout-minutes")
+            return False
+        patch.save()
+        workflow_index.refresh(workflow_path)
+        for job, (old, new) in changes.items():
+            print(f"  {job}: timeout-minutes {old or 'default (360)'} -> {new}")
+        
+        rows = '\n'.join(
+            f"| `{job}` | {s['runs']} | {s['p50']:.1f} | {s['p95']:.1f} | {s['p99']:.1f} | "
+            f"{s['max']:.1f} | {changes[job][0] or '360 (default)' if job in changes else 'unchanged'} | "
+            f"{changes[job][1] if job in changes else '-'} |"
+            for job, s in per_job.items())
+        self.pr_body = f"""## 🤖 Automated Fix: Job Timeouts
+
+### Problem
+A job hit its time limit. Jobs without `timeout-minutes` may run for the default 360 minutes when they hang.
+
+### Solution
+Set `timeout-minutes` in `{workflow_path}` from the durations of recent successful runs: p99 × {TIMEOUT_HEADROOM:g}, rounded up, at least {MIN_TIMEOUT_MINUTES} minutes. Existing limits are only raised, never lowered.
+
+### Timing statistics (minutes)
+
+| Job | Runs | p50 | p95 | p99 | Max | Old timeout | New timeout |
+|---|---:|---:|---:|---:|---:|---:|---:|
+{rows}
+
+---
+_Auto-generated by Workflow Doctor 🏥_
+"""
+        if self.evidence:
+            self.pr_body += self.evidence_markdown()
+        self.pr_body += f"\n### Changes\n```diff\n{patch.diff()}```\n"
+        print("✅ Timeout fix applied")
+        return True
     
     def apply_fix(self) -> bool:
         """Apply automatic fix if available"""
@@ -312,13 +556,13 @@ The workflow failed but the specific issue could not be automatically identified
             print("⚠️ No auto-fix available for this issue")
             return False
         
-        config = self.FAILURE_PATTERNS[self.issue_type]
+        config = self.patterns[self.issue_type]
         fix_function_name = config.get('fix_function')
         
-        if not fix_function_name:
+        fix_function = getattr(self, fix_function_name, None) if fix_function_name else None
+        if not fix_function:
             return False
         
-        fix_function = getattr(self, fix_function_name)
         return fix_function()
     
     def output_results(self):
@@ -339,19 +583,322 @@ The workflow failed but the specific issue could not be automatically identified
         if 'GITHUB_OUTPUT' in os.environ:
             with open(os.environ['GITHUB_OUTPUT'], 'a') as f:
                 f.write(f"issue_type={self.issue_type}\n")
+                f.write(f"confidence={self.confidence}\n")
                 f.write(f"auto_fix_available={str(self.auto_fix_available).lower()}\n")
-                f.write(f"diagnosis={diagnosis_clean}\n")
+                f.write(multiline('diagnosis', self.diagnosis))
                 f.write(f"recommendations={recommendations_str}\n")
-                f.write(f"pr_body<<EOF\n{self.pr_body}\nEOF\n")
+                f.write(multiline('pr_body', self.pr_body))
+
+
+# Timeout fix: successful runs sampled, jobs needing this many timings, and the
+# headroom given on top of the p99 duration
+TIMEOUT_SAMPLE_RUNS = 30
+TIMEOUT_MIN_SAMPLES = 5
+TIMEOUT_HEADROOM = 1.5
+MIN_TIMEOUT_MINUTES = 5
+MAX_TIMEOUT_MINUTES = 360
+
+PERMISSION_LEVELS = {'none': 0, 'read': 1, 'write': 2}
+
+# Scopes ``permissions: read-all`` grants read access to, written out when the
+# fix has to replace it with a mapping (id-token has no read level)
+READ_ALL_SCOPES = ['actions', 'attestations', 'checks', 'contents', 'deployments', 'discussions',
+                   'issues', 'packages', 'pages', 'pull-requests', 'repository-projects',
+                   'security-events', 'statuses']
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _seconds(job: Dict) -> Optional[float]:
+    try:
+        started = datetime.fromisoformat(job['started_at'].replace('Z', '+00:00'))
+        completed = datetime.fromisoformat(job['completed_at'].replace('Z', '+00:00'))
+    except (KeyError, TypeError, AttributeError, ValueError):
+        return None
+    return (completed - started).total_seconds()
+
+
+def timing_stats(durations: Dict[str, List[float]]) -> Dict[str, Dict]:
+    """Per-job p50/p95/p99/max in minutes and the timeout they suggest"""
+    stats = {}
+    for name, values in durations.items():
+        minutes = [v / 60 for v in values]
+        p99 = percentile(minutes, 99)
+        stats[name] = {
+            'runs': len(minutes),
+            'p50': percentile(minutes, 50),
+            'p95': percentile(minutes, 95),
+            'p99': p99,
+            'max': max(minutes),
+            'timeout': min(MAX_TIMEOUT_MINUTES,
+                           max(MIN_TIMEOUT_MINUTES, math.ceil(p99 * TIMEOUT_HEADROOM))),
+        }
+    return stats
+
+
+# Batch mode: concurrent diagnoses (bounded by the client's connection pool)
+BATCH_WORKERS = 4
+
+
+def parse_since(value: str) -> str:
+    """``24h`` / ``7d`` / an ISO date -> the ISO timestamp the runs API filters on"""
+    match = re.fullmatch(r'(\d+)([hd])', value.strip())
+    if not match:
+        return value.strip()
+    seconds = int(match.group(1)) * (3600 if match.group(2) == 'h' else 86400)
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() - seconds))
+
+
+class DoctorBatch:
+    """Diagnose every failed run in a time window on a bounded worker pool
+    
+    Re-runs of the same workflow on the same commit are diagnosed once (the
+    newest attempt), and runs that fail with the same signature are reported
+    together. Each diagnosis is remembered as soon as it finishes, so later
+    runs in the sweep with the same failure skip the pattern scan.
+    """
+    
+    def __init__(self, repo_name: str, workflows: Optional[List[str]] = None,
+                 workers: int = BATCH_WORKERS, patterns_file: Optional[str] = None,
+                 rescan: bool = False):
+        self.repo_name = repo_name
+        self.workflows = set(workflows or [])
+        self.workers = max(1, workers)
+        self.patterns_file = patterns_file
+        self.rescan = rescan
+        self.client = GitHubClient()
+        self.signatures = SignatureStore()
+        self.archive = FailureArchive()
+        
+        # Results
+        self.runs: List[Dict] = []
+        self.reruns: List[Dict] = []
+        self.doctors: List[WorkflowDoctor] = []
+        self.failed: List[Dict] = []
+    
+    def failed_runs(self, since: str) -> List[Dict]:
+        """Failed runs created since ``since``, newest first, one per workflow and commit"""
+        latest = {}
+        for run in self.client.list_workflow_runs(self.repo_name, status='failure',
+                                                  created=f'>={since}'):
+            if self.workflows and run.get('name') not in self.workflows:
+                continue
+            self.runs.append(run)
+            key = (run.get('workflow_id') or run.get('name'), run.get('head_sha'))
+            if key in latest:
+                self.reruns.append(run)
+            else:
+                latest[key] = run
+        return list(latest.values())
+    
+    def _diagnose(self, run: Dict) -> Optional[WorkflowDoctor]:
+        doctor = WorkflowDoctor(self.repo_name, str(run['id']), run.get('name', ''),
+                                patterns_file=self.patterns_file, rescan=self.rescan,
+                                client=self.client, signatures=self.signatures, run=run)
+        try:
+            if not doctor.diagnose():
+                self.failed.append({'run': run, 'error': 'no diagnosis'})
+                return None
+            doctor.generate_recommendations()
+            doctor.remember(archive=self.archive)
+        except (GitHubError, OSError, sqlite3.Error) as e:
+            self.failed.append({'run': run, 'error': str(e)})
+            return None
+        return doctor
+    
+    def run(self, since: str) -> List[WorkflowDoctor]:
+        """Diagnose the window; returns the doctors in run order (newest first)"""
+        unique = self.failed_runs(since)
+        print(f"🗂️  {len(self.runs)} failed runs since {since}: {len(unique)} to diagnose, "
+              f"{len(self.reruns)} re-runs of an already listed commit")
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            self.doctors = [d for d in pool.map(self._diagnose, unique) if d]
+        return self.doctors
+    
+    def groups(self) -> List[Dict]:
+        """Diagnosed runs grouped by failure signature, most frequent first"""
+        groups: Dict[str, Dict] = {}
+        for doctor in self.doctors:
+            key = doctor.signature or f"run-{doctor.run_id}"
+            group = groups.setdefault(key, {'signature': doctor.signature, 'doctor': doctor,
+                                            'runs': [], 'commits': set(), 'workflows': set()})
+            group['runs'].append(doctor.run)
+            group['commits'].add(doctor.run.get('head_sha', ''))
+            group['workflows'].add(doctor.run.get('name') or doctor.workflow_name)
+        for run in self.reruns:
+            for group in groups.values():
+                if run.get('head_sha') in group['commits'] and run.get('name') in group['workflows']:
+                    group['runs'].append(run)
+                    break
+        return sorted(groups.values(), key=lambda g: len(g['runs']), reverse=True)
+    
+    def report(self, since: str) -> str:
+        """One markdown report for the whole sweep"""
+        groups = self.groups()
+        lines = [f"## 🏥 Workflow Doctor sweep since {since}", '',
+                 f"**Failed runs**: {len(self.runs)} ({len(self.reruns)} re-runs) · "
+                 f"**Diagnosed**: {len(self.doctors)} · **Distinct failures**: {len(groups)}", '']
+        if groups:
+            lines += ['| Failure | Type | Confidence | Runs | Commits | Workflows | Auto-fix | Latest run |',
+                      '|---|---|---:|---:|---:|---|---|---|']
+        for group in groups:
+            doctor = group['doctor']
+            latest = group['runs'][0]
+            label = f"`{group['signature'][:10]}`" if group['signature'] else '-'
+            lines.append(
+                f"| {label} | {doctor.issue_type} | {doctor.confidence:.0%} | {len(group['runs'])} | "
+                f"{len(group['commits'])} | {', '.join(sorted(group['workflows']))} | "
+                f"{'yes' if doctor.auto_fix_available else 'no'} | "
+                f"[#{latest['id']}]({latest.get('html_url', '')}) |")
+        for group in groups:
+            doctor = group['doctor']
+            if doctor.evidence:
+                match = doctor.evidence[0]
+                lines += ['', f"**{doctor.issue_type}** (`{match['job']}` / `{match['step']}`): "
+                              f"`{TIMESTAMP.sub('', match['text']).strip()[:200]}`"]
+                if doctor.recommendations:
+                    lines.append(f"- {doctor.recommendations[0]}")
+        if self.failed:
+            lines += ['', "⚠️ Could not diagnose: " + ', '.join(
+                f"#{f['run']['id']} ({f['error']})" for f in self.failed)]
+        return '\n'.join(lines) + '\n'
+    
+    def output_results(self, since: str):
+        """Print the report and hand it to Actions (step summary and outputs)"""
+        text = self.report(since)
+        print(text)
+        if 'GITHUB_STEP_SUMMARY' in os.environ:
+            with open(os.environ['GITHUB_STEP_SUMMARY'], 'a') as f:
+                f.write(text)
+        if 'GITHUB_OUTPUT' in os.environ:
+            with open(os.environ['GITHUB_OUTPUT'], 'a') as f:
+                f.write(f"failed_runs={len(self.runs)}\n")
+                f.write(f"diagnosed_runs={len(self.doctors)}\n")
+                f.write(f"distinct_failures={len(self.groups())}\n")
+                f.write(multiline('report', text))
+
+
+def run_batch(args):
+    """--batch: sweep every failed run in the window and report once"""
+    tel = telemetry.start('workflow_doctor_batch')
+    since = parse_since(args.since)
+    print("🏥 Workflow Doctor sweep starting...")
+    print(f"  Repository: {args.repo}")
+    print(f"  Window: since {since}")
+    print(f"  Workflows: {', '.join(args.workflow) if args.workflow else 'all'}")
+    print()
+    
+    batch = DoctorBatch(args.repo, workflows=args.workflow, workers=args.workers,
+                        patterns_file=args.patterns, rescan=args.rescan)
+    tel.phase('diagnose')
+    try:
+        doctors = batch.run(since)
+    except GitHubError as e:
+        print(f"❌ Could not list workflow runs: {e}")
+        sys.exit(1)
+    
+    tel.phase('output')
+    tel.count('batch_runs', len(doctors), 'Failed runs in the sweep', outcome='diagnosed')
+    tel.count('batch_runs', len(batch.reruns), 'Failed runs in the sweep', outcome='rerun')
+    tel.count('batch_runs', len(batch.failed), 'Failed runs in the sweep', outcome='failed')
+    for doctor in doctors:
+        tel.count('diagnoses', 1, 'Diagnoses by failure type', issue_type=doctor.issue_type or 'unknown')
+        tel.count('signature_hits', 1 if doctor.known else 0, 'Diagnoses answered from the signature store')
+    batch.output_results(since)
+    
+    batch.archive.close()
+    batch.client.print_summary()
+    print("✅ Workflow Doctor sweep completed")
+
+
+def run_lint(args):
+    """--lint: report CI-time anti-patterns in the workflows, fixing the safe ones"""
+    tel = telemetry.start('workflow_doctor_lint')
+    print("🧹 Workflow Doctor lint starting...")
+    print(f"  Repository: {args.repo}")
+    print()
+    
+    index = workflow_index.load()
+    findings = workflow_lint.lint(index)
+    print(f"🔍 {len(findings)} findings in {len(index.workflows)} workflows")
+    
+    tel.phase('estimate')
+    client = GitHubClient()
+    rates = {}
+    try:
+        rates = workflow_lint.estimate_savings(client, args.repo, index, findings,
+                                               workers=args.workers)
+    except GitHubError as e:
+        print(f"⚠️  Could not time recent runs, reporting without estimates: {e}")
+    
+    tel.phase('fix')
+    patches = workflow_lint.apply_fixes(findings) if args.fix else {}
+    for path, patch in patches.items():
+        patch.save()
+        workflow_index.refresh(path)
+        print(f"✏️  {path}: {patch.changed_lines()} lines changed")
+    
+    tel.phase('output')
+    for finding in findings:
+        tel.count('lint_findings', 1, 'Workflow lint findings', rule=finding['rule'])
+    text = workflow_lint.report(findings, rates)
+    print(text)
+    diffs = ''.join(patch.diff() for patch in patches.values())
+    pr_body = text + (f"\n**Changes**:\n```diff\n{diffs}```\n" if diffs else '')
+    if 'GITHUB_STEP_SUMMARY' in os.environ:
+        with open(os.environ['GITHUB_STEP_SUMMARY'], 'a') as f:
+            f.write(text)
+    if 'GITHUB_OUTPUT' in os.environ:
+        with open(os.environ['GITHUB_OUTPUT'], 'a') as f:
+            f.write("issue_type=ci-performance\n")
+            f.write(f"findings={len(findings)}\n")
+            f.write(f"auto_fix_available={str(bool(diffs)).lower()}\n")
+            f.write(multiline('pr_body', pr_body))
+    
+    client.print_summary()
+    print("✅ Workflow Doctor lint completed")
 
 
 def main():
     parser = argparse.ArgumentParser(description='Workflow Doctor - Auto-fix GitHub Actions failures')
     parser.add_argument('--repo', required=True, help='Repository name (owner/repo)')
-    parser.add_argument('--run-id', required=True, help='Workflow run ID')
-    parser.add_argument('--workflow-name', required=True, help='Workflow name')
+    parser.add_argument('--run-id', help='Workflow run ID')
+    parser.add_argument('--workflow-name', help='Workflow name')
+    parser.add_argument('--patterns', default=os.environ.get('DOCTOR_PATTERNS_FILE'),
+                        help='JSON/YAML file with extra or overriding failure patterns')
+    parser.add_argument('--rescan', action='store_true',
+                        help='Ignore remembered failure signatures and scan the logs again')
+    batch = parser.add_argument_group('batch mode')
+    batch.add_argument('--batch', action='store_true',
+                       help='Diagnose every failed run in a time window (no fixes applied)')
+    batch.add_argument('--since', default='24h',
+                       help='Window start: 24h, 7d or an ISO date (default: 24h)')
+    batch.add_argument('--workflow', action='append',
+                       help='Only this workflow (by name); repeatable (default: all)')
+    batch.add_argument('--workers', type=int,
+                       default=int(os.environ.get('DOCTOR_WORKERS', BATCH_WORKERS)),
+                       help=f'Runs diagnosed at the same time (default: {BATCH_WORKERS})')
+    
+    lint = parser.add_argument_group('lint mode')
+    lint.add_argument('--lint', action='store_true',
+                      help='Check the workflow files for CI-time anti-patterns')
+    lint.add_argument('--fix', action='store_true',
+                      help='With --lint, apply the fixes that are safe to automate')
     
     args = parser.parse_args()
+    if args.batch:
+        run_batch(args)
+        return
+    if args.lint:
+        run_lint(args)
+        return
+    if not args.run_id or not args.workflow_name:
+        parser.error('--run-id and --workflow-name are required (or use --batch / --lint)')
+    tel = telemetry.start('workflow_doctor')
     
     print("🏥 Workflow Doctor Starting...")
     print(f"  Repository: {args.repo}")
@@ -359,9 +906,11 @@ def main():
     print(f"  Workflow: {args.workflow_name}")
     print()
     
-    doctor = WorkflowDoctor(args.repo, args.run_id, args.workflow_name)
+    doctor = WorkflowDoctor(args.repo, args.run_id, args.workflow_name,
+                            patterns_file=args.patterns, rescan=args.rescan)
     
     # Diagnose the issue
+    tel.phase('diagnose')
     if not doctor.diagnose():
         print("❌ Diagnosis failed")
         sys.exit(1)
@@ -370,6 +919,8 @@ def main():
     doctor.generate_recommendations()
     
     # Try to apply fix
+    tel.phase('fix')
+    success = None
     if doctor.auto_fix_available:
         print()
         success = doctor.apply_fix()
@@ -377,8 +928,12 @@ def main():
             print("✅ Auto-fix applied successfully")
         else:
             print("⚠️ Auto-fix attempted but may require manual review")
+    doctor.remember(fix_applied=success)
     
     # Output results
+    tel.phase('output')
+    tel.count('diagnoses', 1, 'Diagnoses by failure type', issue_type=doctor.issue_type or 'unknown')
+    tel.count('signature_hits', 1 if doctor.known else 0, 'Diagnoses answered from the signature store')
     print()
     print("📋 Results:")
     print(f"  Issue Type: {doctor.issue_type}")
@@ -388,6 +943,7 @@ def main():
     
     doctor.output_results()
     
+    doctor.client.print_summary()
     print("✅ Workflow Doctor completed")
 
 
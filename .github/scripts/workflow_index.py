@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Workflow Index - Parsed summary of every workflow file, built once per run
+
+Maps each workflow in ``.github/workflows`` (``.yml`` and ``.yaml``) to its
+name, triggers, permissions, concurrency and jobs (with their steps), so the
+doctor can find "the workflow called X" by its ``name:`` or path instead of
+grepping file text, and can read jobs and permissions without parsing the
+file again for every fix.
+
+Files are parsed with the libyaml ``CSafeLoader`` when PyYAML was built with
+it. Summaries are cached on disk keyed by the SHA-256 of each file's
+content, so an unchanged workflow is never parsed twice. A file that fails
+to parse is still indexed, with its error, which the doctor reports as a
+syntax failure.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from agent_cache import cache_path
+
+CACHE_FILE = 'workflow-index.json'
+
+# Bump when the shape of a summary changes
+INDEX_VERSION = 2
+
+WORKFLOW_DIR = '.github/workflows'
+
+_index: Optional['WorkflowIndex'] = None
+
+
+def _loader():
+    import yaml
+    return getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def _triggers(on) -> List[str]:
+    if isinstance(on, str):
+        return [on]
+    if isinstance(on, list):
+        return [str(event) for event in on]
+    if isinstance(on, dict):
+        return [str(event) for event in on]
+    return []
+
+
+def _step(step) -> Dict:
+    if not isinstance(step, dict):
+        return {}
+    return {
+        'name': step.get('name'),
+        'id': step.get('id'),
+        'uses': step.get('uses'),
+        'run': step.get('run'),
+        'with': {str(k): v for k, v in (step.get('with') or {}).items()}
+        if isinstance(step.get('with'), dict) else {},
+    }
+
+
+def summarize(workflow, path: str) -> Dict:
+    """The indexed fields of one parsed workflow."""
+    if not isinstance(workflow, dict):
+        workflow = {}
+    # YAML 1.1 reads a bare ``on:`` key as the boolean True
+    on = workflow.get('on', workflow.get(True))
+    jobs = {}
+    for job_id, job in (workflow.get('jobs') or {}).items():
+        if not isinstance(job, dict):
+            continue
+        strategy = job.get('strategy') if isinstance(job.get('strategy'), dict) else {}
+        jobs[str(job_id)] = {
+            # The API reports jobs by display name ("<name> (<matrix values>)" for matrix legs)
+            'name': str(job.get('name') or job_id),
+            'runs_on': job.get('runs-on'),
+            'needs': job.get('needs') if isinstance(job.get('needs'), list)
+            else [job['needs']] if job.get('needs') else [],
+            'timeout_minutes': job.get('timeout-minutes'),
+            'permissions': job.get('permissions'),
+            'concurrency': job.get('concurrency'),
+            'uses': job.get('uses'),
+            'if': str(job['if']) if job.get('if') is not None else None,
+            'matrix': bool(strategy.get('matrix')),
+            'steps': [_step(step) for step in job.get('steps') or []],
+        }
+    return {
+        'path': path,
+        # GitHub names unnamed workflows after their path
+        'name': str(workflow.get('name') or path),
+        'triggers': _triggers(on),
+        'permissions': workflow.get('permissions'),
+        'concurrency': workflow.get('concurrency'),
+        'jobs': jobs,
+    }
+
+
+class WorkflowIndex:
+    """Workflow summaries keyed by path, with lookup by name"""
+
+    def __init__(self, root: str = WORKFLOW_DIR, cache_file: Optional[str] = None):
+        self.root = Path(root)
+        self.cache_file = cache_file or str(cache_path(CACHE_FILE))
+        self.workflows: Dict[str, Dict] = {}
+        self.parsed = 0
+        self.cached = 0
+
+    def build(self) -> 'WorkflowIndex':
+        """Index every workflow file, parsing only those whose content changed."""
+        cached = self._load_cache()
+        files = sorted(p for pattern in ('*.yml', '*.yaml') for p in self.root.glob(pattern))
+        for path in files:
+            data = path.read_bytes()
+            digest = hashlib.sha256(data).hexdigest()
+            entry = cached.get(path.as_posix())
+            if entry and entry.get('hash') == digest:
+                self.cached += 1
+            else:
+                entry = self._parse(data, path.as_posix())
+                entry['hash'] = digest
+                self.parsed += 1
+            self.workflows[path.as_posix()] = entry
+        if self.parsed or set(cached) != set(self.workflows):
+            self._save_cache()
+        return self
+
+    def _parse(self, data: bytes, path: str) -> Dict:
+        import yaml
+        try:
+            workflow = yaml.load(data.decode('utf-8', errors='replace'), Loader=_loader())
+        except yaml.YAMLError as e:
+            entry = summarize({}, path)
+            entry['error'] = str(e)
+            return entry
+        return summarize(workflow, path)
+
+    def _load_cache(self) -> Dict[str, Dict]:
+        try:
+            with open(self.cache_file) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('version') != INDEX_VERSION:
+            return {}
+        return data.get('workflows') or {}
+
+    def _save_cache(self):
+        tmp = self.cache_file + '.tmp'
+        try:
+            with open(tmp, 'w') as f:
+                # Workflows may hold YAML values JSON lacks (dates); store them as text
+                json.dump({'version': INDEX_VERSION, 'workflows': self.workflows}, f,
+                          separators=(',', ':'), default=str)
+            os.replace(tmp, self.cache_file)
+        except OSError as e:
+            print(f"⚠️  Could not save workflow index: {e}")
+
+    # -- Queries --------------------------------------------------------
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.workflows.values())
+
+    def get(self, path: str) -> Optional[Dict]:
+        """The workflow at ``path`` (as the runs API reports it)."""
+        return self.workflows.get(Path(path).as_posix())
+
+    def by_name(self, name: str) -> List[Dict]:
+        """Workflows whose ``name:`` is exactly ``name``."""
+        return [w for w in self.workflows.values() if w['name'] == name]
+
+    def find(self, name: Optional[str] = None, path: Optional[str] = None) -> Optional[Dict]:
+        """The workflow of a run: by path when known, else by unique name."""
+        if path and self.get(path):
+            return self.get(path)
+        matches = self.by_name(name) if name else []
+        if len(matches) > 1:
+            # Guessing would diagnose or patch the wrong file; only the run's path is reliable
+            print(f"⚠️  {len(matches)} workflows are named {name!r} ("
+                  + ', '.join(w['path'] for w in matches) + "); cannot tell which one ran")
+            return None
+        return matches[0] if matches else None
+
+    def job_for(self, workflow: Dict, api_name: str) -> Optional[str]:
+        """The job id behind a job name from the API (matrix legs included)."""
+        for job_id, job in workflow['jobs'].items():
+            if api_name == job['name'] or api_name.startswith(job['name'] + ' ('):
+                return job_id
+        return None
+
+
+def load(root: str = WORKFLOW_DIR) -> WorkflowIndex:
+    """The index for this run, built on first use."""
+    global _index
+    if _index is None or _index.root != Path(root):
+        _index = WorkflowIndex(root).build()
+    return _index
+
+
+def refresh(path) -> None:
+    """Drop a file from this run's index after it was rewritten."""
+    if _index is not None:
+        _index.workflows.pop(Path(path).as_posix(), None)
+        _index.build()
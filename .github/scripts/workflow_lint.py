@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Workflow Lint - CI-time anti-patterns in workflow files
+
+Static checks over the workflow index for steps that cost runner minutes on
+every run:
+
+- ``pip-cache``: ``setup-python`` without ``cache: pip`` in a job that
+  pip-installs packages
+- ``repeated-install``: the same install command in several jobs (or
+  steps) of one workflow
+- ``fetch-depth``: full-history checkouts (``fetch-depth: 0``) in jobs whose
+  steps never look at history
+- ``action-major``: actions pinned to an outdated major version
+- ``concurrency``: PR/push workflows without a ``concurrency:`` group that
+  cancels runs a newer push made stale
+
+``pip-cache``, drop-in ``action-major`` upgrades and ``concurrency`` groups
+are fixed with WorkflowPatch; the rest are advisories. Each finding names
+the steps whose time it would save, so ``estimate_savings`` can price it
+from the run timings of recent successful runs (``concurrency`` is priced
+from the time runs overlapped a newer run of the same PR or branch).
+"""
+
+import re
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from workflow_patch import WorkflowPatch
+
+# Current majors; ``True`` marks upgrades from any older major that need no other change
+LATEST_MAJORS = {
+    'actions/checkout': (4, True),
+    'actions/setup-python': (5, True),
+    'actions/setup-node': (4, True),
+    'actions/cache': (4, True),
+    'actions/github-script': (7, True),
+    # v4 artifacts are immutable and names must be unique per run
+    'actions/upload-artifact': (4, False),
+    'actions/download-artifact': (4, False),
+}
+
+# setup-python gained the ``cache`` input in v2.3; only add it to v3 and later
+MIN_CACHE_MAJOR = 3
+
+INSTALL = re.compile(r'^\s*((?:python3?\s+-m\s+)?pip3?\s+install\b.*|npm\s+(?:ci|install)\b.*'
+                     r'|yarn(?:\s+install)?\s*$|apt-get\s+install\b.*)$', re.M)
+PIP_INSTALL = re.compile(r'\bpip3?\s+install\b')
+REQUIREMENTS = re.compile(r'(?:-r|--requirement)\s+(\S+)')
+
+# Commands and actions that need more than the checked-out commit, including
+# this repo's scripts that diff against older commits (the reviewer's --local
+# merge base, the orchestrator's quick-check baseline)
+HISTORY = re.compile(r'\bgit\s+(?:log|describe|diff|merge-base|rev-list|blame|shortlog|tag)\b'
+                     r'|setuptools[-_]scm|semantic-release|git-cliff|changed-files|gitleaks'
+                     r'|\b(?:auto_reviewer|orchestrator)\.py\b', re.I)
+
+# Events whose runs are made stale by a newer run for the same PR or branch
+SUPERSEDED_EVENTS = ('pull_request', 'pull_request_target', 'push')
+
+CONCURRENCY_KEY = '${{ github.event.pull_request.number || github.ref }}'
+
+# Share of the measured step time each fix is expected to save (rough, conservative)
+SAVINGS = {
+    'pip-cache': 0.6,
+    'repeated-install': 0.5,
+    'fetch-depth': 0.7,
+    'action-major': 0.0,
+    'concurrency': 1.0,
+}
+
+# Successful runs timed per workflow when estimating savings, and runs of any
+# outcome scanned for overlaps
+LINT_SAMPLE_RUNS = 10
+OVERLAP_SAMPLE_RUNS = 100
+
+WEEK_SECONDS = 7 * 86400
+
+
+def step_label(step: Dict) -> str:
+    """The name the API reports for a step."""
+    if step.get('name'):
+        return str(step['name'])
+    if step.get('uses'):
+        return f"Run {step['uses']}"
+    first = (step.get('run') or '').strip().splitlines()
+    return f"Run {first[0]}" if first else ''
+
+
+def _action(uses: Optional[str]) -> Tuple[str, Optional[int]]:
+    """``('owner/repo', major)`` of a ``uses:`` reference (major None if not ``@vN``)."""
+    name, _, ref = (uses or '').partition('@')
+    match = re.match(r'v(\d+)(?:\.|$)', ref)
+    return name.lower(), int(match.group(1)) if match else None
+
+
+def _finding(rule: str, workflow: Dict, job: Optional[str], step: Optional[int], message: str,
+             timed: List[Tuple[str, str]], fix: Optional[Dict] = None) -> Dict:
+    return {
+        'rule': rule,
+        'path': workflow['path'],
+        'workflow': workflow['name'],
+        'job': job,
+        'step': step,
+        'message': message,
+        # (job id, step label) pairs whose run time the fix would cut
+        'timed': timed,
+        'fix': fix,
+        'minutes_per_week': None,
+    }
+
+
+def _concurrency(workflow: Dict) -> List[Dict]:
+    """Findings for PR/push workflows whose superseded runs keep running."""
+    events = [event for event in workflow['triggers'] if event in SUPERSEDED_EVENTS]
+    if not events:
+        return []
+    # Pushes to the default branch should each finish (deploys, coverage baselines)
+    cancel = True if 'push' not in events else (
+        "${{ github.ref != format('refs/heads/{0}', github.event.repository.default_branch) }}")
+    message = ('superseded runs keep running: add a `concurrency:` group per PR/ref '
+               'with `cancel-in-progress`')
+
+    current = workflow.get('concurrency')
+    if current:
+        if isinstance(current, dict) and 'cancel-in-progress' not in current:
+            return [_finding('concurrency', workflow, None, None, message, [],
+                             {'key': 'concurrency', 'mapping': {'cancel-in-progress': cancel}})]
+        if isinstance(current, str):
+            return [_finding('concurrency', workflow, None, None, message, [],
+                             {'key': 'concurrency',
+                              'mapping': {'group': current, 'cancel-in-progress': cancel}})]
+        return []
+
+    others = [event for event in workflow['triggers']
+              if event not in SUPERSEDED_EVENTS and event != 'workflow_dispatch']
+    if not others:
+        group = '${{ github.workflow }}-' + CONCURRENCY_KEY
+        return [_finding('concurrency', workflow, None, None, message, [],
+                         {'key': 'concurrency', 'mapping': {'group': group, 'cancel-in-progress': cancel}})]
+
+    # Mixed triggers: a workflow-wide group would also drop queued runs of the
+    # other events (issues, schedules), so group only the jobs that handle PRs/pushes
+    findings = []
+    for job_id, job in workflow['jobs'].items():
+        condition = job.get('if') or ''
+        if job.get('concurrency') or not any(event in condition for event in events):
+            continue
+        group = '${{ github.workflow }}-' + job_id + '-' + CONCURRENCY_KEY
+        findings.append(_finding('concurrency', workflow, job_id, None, message, [],
+                                 {'key': 'concurrency',
+                                  'mapping': {'group': group, 'cancel-in-progress': cancel}}))
+    return findings
+
+
+def lint_workflow(workflow: Dict) -> List[Dict]:
+    """Findings for one indexed workflow."""
+    if workflow.get('error'):
+        return []
+    findings = _concurrency(workflow)
+    installs: Dict[str, List[Tuple[str, int]]] = {}
+
+    for job_id, job in workflow['jobs'].items():
+        steps = job['steps']
+        runs = '\n'.join(step.get('run') or '' for step in steps)
+        pip_steps = [(job_id, step_label(s)) for s in steps if PIP_INSTALL.search(s.get('run') or '')]
+
+        for index, step in enumerate(steps):
+            name, major = _action(step.get('uses'))
+            options = step.get('with') or {}
+
+            if name == 'actions/setup-python' and pip_steps and not options.get('cache'):
+                fix = None
+                if major is None or major >= MIN_CACHE_MAJOR:
+                    fix = {'key': 'with', 'mapping': {'cache': 'pip', **_cache_path(workflow, runs)}}
+                findings.append(_finding(
+                    'pip-cache', workflow, job_id, index,
+                    'setup-python has no `cache: pip`, so every run downloads its packages again',
+                    pip_steps, fix))
+
+            if name == 'actions/checkout' and str(options.get('fetch-depth')) == '0' \
+                    and not HISTORY.search(runs) \
+                    and not any(HISTORY.search(s.get('uses') or '') for s in steps):
+                findings.append(_finding(
+                    'fetch-depth', workflow, job_id, index,
+                    '`fetch-depth: 0` clones the full history, but no step in this job uses it '
+                    '(ignore if a script reads git history)',
+                    [(job_id, step_label(step))]))
+
+            if name in LATEST_MAJORS and major is not None and major < LATEST_MAJORS[name][0]:
+                latest, drop_in = LATEST_MAJORS[name]
+                fix = None
+                if drop_in:
+                    fix = {'key': 'uses', 'value': f"{step['uses'].split('@')[0]}@v{latest}"}
+                findings.append(_finding(
+                    'action-major', workflow, job_id, index,
+                    f"`{step['uses']}` is behind the current major (v{latest})"
+                    + ('' if drop_in else '; the upgrade changes behaviour, review before bumping'),
+                    [], fix))
+
+            for command in INSTALL.findall(step.get('run') or ''):
+                installs.setdefault(' '.join(command.split()), []).append((job_id, index))
+
+    for command, places in installs.items():
+        if len(places) > 1:
+            job_id, index = places[-1]
+            findings.append(_finding(
+                'repeated-install', workflow, job_id, index,
+                f"`{command}` runs in {len(places)} places ("
+                + ', '.join(sorted({job for job, _ in places}))
+                + '); install once and share it (cache, artifact or a single job)',
+                [(job, step_label(workflow['jobs'][job]['steps'][i])) for job, i in places[1:]]))
+    return findings
+
+
+def _cache_path(workflow: Dict, runs: str) -> Dict:
+    """``cache-dependency-path`` for a job, when the default (requirements.txt) would be wrong."""
+    files = sorted(set(REQUIREMENTS.findall(runs)))
+    if files == ['requirements.txt']:
+        return {}
+    if files:
+        return {'cache-dependency-path': '\n'.join(files)}
+    # Packages named inline in the workflow: key the cache on the workflow file itself
+    return {'cache-dependency-path': workflow['path']}
+
+
+def lint(index) -> List[Dict]:
+    """Findings for every workflow in the index."""
+    return [finding for workflow in index for finding in lint_workflow(workflow)]
+
+
+def apply_fixes(findings: List[Dict]) -> Dict[str, WorkflowPatch]:
+    """Apply every fixable finding; returns the patched (unsaved) files by path."""
+    patches: Dict[str, WorkflowPatch] = {}
+    for finding in findings:
+        fix = finding['fix']
+        if not fix:
+            continue
+        patch = patches.get(finding['path']) or WorkflowPatch.load(finding['path'])
+        patches[finding['path']] = patch
+        if 'mapping' in fix:
+            patch.set_mapping(fix['key'], fix['mapping'], job=finding['job'], step=finding['step'])
+        else:
+            patch.set_value(fix['key'], fix['value'], job=finding['job'], step=finding['step'])
+        finding['fixed'] = True
+    return patches
+
+
+def _seconds(item: Dict) -> Optional[float]:
+    try:
+        started = datetime.fromisoformat(item['started_at'].replace('Z', '+00:00'))
+        completed = datetime.fromisoformat(item['completed_at'].replace('Z', '+00:00'))
+    except (KeyError, TypeError, AttributeError, ValueError):
+        return None
+    return (completed - started).total_seconds()
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+def overlap_seconds(runs: List[Dict]) -> Tuple[float, float]:
+    """``(seconds runs kept going after a newer run for the same ref started, span covered)``."""
+    lanes: Dict[Tuple, List[Tuple[float, float]]] = {}
+    for run in runs:
+        if run.get('event') not in SUPERSEDED_EVENTS:
+            continue
+        pulls = run.get('pull_requests') or []
+        key = (run['event'], pulls[0]['number'] if pulls else run.get('head_branch'))
+        start = _timestamp(run.get('run_started_at') or run.get('created_at'))
+        end = _timestamp(run.get('updated_at'))
+        if start is not None and end is not None:
+            lanes.setdefault(key, []).append((start, end))
+    wasted = 0.0
+    for lane in lanes.values():
+        lane.sort()
+        for (start, end), (newer, _) in zip(lane, lane[1:]):
+            wasted += max(0.0, end - max(start, newer))
+    starts = [start for lane in lanes.values() for start, _ in lane]
+    return wasted, (max(starts) - min(starts)) if len(starts) > 1 else 0.0
+
+
+def estimate_savings(client, repo: str, index, findings: List[Dict], workers: int = 4) -> Dict:
+    """Fill in ``minutes_per_week`` from recent successful runs; returns per-workflow run rates."""
+    rates = {}
+    for path in sorted({f['path'] for f in findings if f['rule'] == 'concurrency'}):
+        recent = list(islice(client.list_workflow_runs(repo, workflow=Path(path).name,
+                                                       per_page=OVERLAP_SAMPLE_RUNS),
+                             OVERLAP_SAMPLE_RUNS))
+        wasted, span = overlap_seconds(recent)
+        grouped = [f for f in findings if f['path'] == path and f['rule'] == 'concurrency']
+        for finding in grouped:
+            # Split over the jobs being grouped rather than counting the overlap for each
+            weekly = wasted * WEEK_SECONDS / span / 60 / len(grouped) if span else 0.0
+            finding['minutes_per_week'] = round(weekly * SAVINGS['concurrency'], 1)
+
+    for path in sorted({f['path'] for f in findings if f['timed']}):
+        workflow_file = Path(path).name
+        runs = list(islice(client.list_workflow_runs(repo, workflow=workflow_file, status='success',
+                                                     per_page=LINT_SAMPLE_RUNS), LINT_SAMPLE_RUNS))
+        weekly = 0
+        if runs:
+            # Rate over the week up to the latest run, so a quiet week does not zero it
+            latest = datetime.fromisoformat(runs[0]['created_at'].replace('Z', '+00:00'))
+            since = time.strftime('%Y-%m-%dT%H:%M:%SZ',
+                                  time.gmtime(latest.timestamp() - WEEK_SECONDS))
+            weekly = client.get(f'/repos/{repo}/actions/workflows/{workflow_file}/runs',
+                                endpoint='actions.runs', created=f'>={since}',
+                                per_page=1)['total_count']
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            run_jobs = list(pool.map(lambda run: list(client.list_run_jobs(repo, run['id'])), runs))
+
+        workflow = index.get(path)
+        timings: Dict[Tuple[str, str], List[float]] = {}
+        for jobs in run_jobs:
+            for job in jobs:
+                job_id = index.job_for(workflow, job['name'])
+                for step in job.get('steps') or []:
+                    seconds = _seconds(step)
+                    if job_id and seconds is not None:
+                        timings.setdefault((job_id, step['name']), []).append(seconds)
+        rates[path] = {'runs_per_week': weekly, 'sampled_runs': len(runs)}
+
+        for finding in findings:
+            if finding['path'] != path or not finding['timed'] or not runs:
+                continue
+            per_run = 0.0
+            for key in finding['timed']:
+                values = timings.get(key)
+                if values:
+                    # Median step time, times how often the step runs per workflow run (matrix legs)
+                    per_run += statistics.median(values) * len(values) / len(runs)
+            finding['minutes_per_week'] = round(per_run * SAVINGS[finding['rule']] * weekly / 60, 1)
+    return rates
+
+
+def report(findings: List[Dict], rates: Optional[Dict] = None) -> str:
+    """Markdown table of findings, biggest estimated saving first."""
+    lines = ['## 🧹 Workflow lint', '']
+    if not findings:
+        return '\n'.join(lines + ['No CI-time anti-patterns found.']) + '\n'
+    ordered = sorted(findings, key=lambda f: -(f['minutes_per_week'] or 0))
+    total = sum(f['minutes_per_week'] or 0 for f in findings)
+    fixed = sum(1 for f in findings if f.get('fixed'))
+    lines += [f"**Findings**: {len(findings)} ({fixed} auto-fixed) · "
+              f"**Estimated saving**: {total:g} runner minutes/week", '',
+              '| Rule | Workflow | Job | Finding | Min/week | Fix |',
+              '|---|---|---|---|---:|---|']
+    for f in ordered:
+        saving = '-' if f['minutes_per_week'] is None else f"{f['minutes_per_week']:g}"
+        fix = '✅ applied' if f.get('fixed') else ('auto' if f['fix'] else 'manual')
+        lines.append(f"| {f['rule']} | `{f['path']}` | {f['job'] or '-'} | "
+                     f"{f['message'].replace('|', '/')} | {saving} | {fix} |")
+    if rates:
+        lines += ['', 'Estimates use the median step time of recent successful runs and each '
+                      "workflow's runs in the 7 days up to its latest run: " +
+                  ', '.join(f"`{Path(p).name}` {r['runs_per_week']}/week" for p, r in rates.items())]
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Workflow Patch - Minimal, comment-preserving edits to workflow files
+
+Auto-fixes used to load a workflow with ``yaml.safe_load`` and write it back
+with ``yaml.dump``, which drops comments, reorders keys and rewrites quoting:
+a one-line fix became a diff of the whole file, too big for the reviewer's
+small-PR auto-approval. WorkflowPatch edits the file as lines instead. It
+locates a key by indentation (top level, inside one job, or inside one of
+its steps), then updates its value in place, adds missing entries to an
+existing block, or inserts a new block where a person would put it. Every
+other line is left byte-for-byte as it was.
+
+    patch = WorkflowPatch.load('.github/workflows/ci.yml')
+    patch.set_mapping('permissions', {'contents': 'read', 'issues': 'write'})
+    patch.set_value('timeout-minutes', 15, job='test')
+    patch.set_mapping('with', {'cache': 'pip'}, job='test', step=1)
+    patch.save()
+    print(patch.diff())
+
+It handles the block-style YAML that workflows are written in. Flow
+mappings (``permissions: {contents: read}``) are rewritten as blocks when
+they are edited.
+"""
+
+import difflib
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# ``key: value  # comment`` (the value and comment are optional), possibly
+# the first key of a sequence item (``- key: value``)
+KEY_LINE = re.compile(r'''^(?P<indent> *)(?P<dash>-\s+)?(?P<key>(?P<q>["']?)[\w.-]+(?P=q)):'''
+                      r'''(?:\s+(?P<value>[^#\s][^#]*?))?(?P<comment>\s+#.*)?\s*$''')
+
+# Plain scalars that YAML would read as something other than a string
+NON_STRING = re.compile(r'^(?:true|false|yes|no|on|off|null|~|[-+]?[\d.]+(?:e[-+]?\d+)?)$', re.I)
+
+DEFAULT_INDENT = 2
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip(' '))
+
+
+def _is_content(line: str) -> bool:
+    stripped = line.strip()
+    return bool(stripped) and not stripped.startswith('#')
+
+
+def _key_indent(line: str) -> int:
+    """Column of a line's key (after the dash of a sequence item)."""
+    match = KEY_LINE.match(line)
+    if match:
+        return len(match.group('indent')) + len(match.group('dash') or '')
+    return _indent(line)
+
+
+def render_scalar(value) -> str:
+    """A value as a YAML plain scalar, quoted only when it has to be."""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return str(value)
+    text = str(value)
+    if (not text or text != text.strip() or text[0] in '{}[]&*!|>\'"%@`,?:-#'
+            or ': ' in text or ' #' in text or NON_STRING.match(text)):
+        return json.dumps(text)
+    return text
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '\'"':
+        return value[1:-1]
+    return value
+
+
+class WorkflowPatch:
+    """Line-level edits to one workflow file; untouched lines stay byte-for-byte"""
+
+    def __init__(self, text: str, path: Optional[str] = None):
+        self.original = text
+        self.path = Path(path) if path else None
+        self.lines: List[str] = text.splitlines(keepends=True)
+        self.newline = '\r\n' if '\r\n' in text else '\n'
+        indents = [_indent(line) for line in self.lines if _is_content(line) and _indent(line)]
+        self.unit = min(indents) if indents else DEFAULT_INDENT
+
+    @classmethod
+    def load(cls, path) -> 'WorkflowPatch':
+        return cls(Path(path).read_text(), path)
+
+    def save(self, path=None):
+        """Write the patched text (only if anything changed)."""
+        target = Path(path) if path else self.path
+        if self.changed:
+            target.write_text(self.text)
+
+    @property
+    def text(self) -> str:
+        return ''.join(self.lines)
+
+    @property
+    def changed(self) -> bool:
+        return self.text != self.original
+
+    def diff(self, name: Optional[str] = None) -> str:
+        """Unified diff of the edits."""
+        name = name or str(self.path or 'workflow.yml')
+        return ''.join(difflib.unified_diff(self.original.splitlines(keepends=True), self.lines,
+                                            f'a/{name}', f'b/{name}'))
+
+    def changed_lines(self) -> int:
+        """Lines added plus lines removed."""
+        return sum(1 for line in self.diff().splitlines()
+                   if line[:1] in '+-' and not line.startswith(('+++', '---')))
+
+    # -- Locating -------------------------------------------------------
+
+    def _end(self, start: int) -> int:
+        """End (exclusive) of the block opened at ``start``, without trailing blanks/comments."""
+        indent = _key_indent(self.lines[start])
+        end = start + 1
+        last = start + 1
+        while end < len(self.lines):
+            line = self.lines[end]
+            if _is_content(line):
+                # A sequence may sit at its key's own indent (``steps:`` / ``- run: ...``)
+                if _indent(line) < indent or (_indent(line) == indent
+                                              and not line.lstrip(' ').startswith('-')):
+                    break
+                last = end + 1
+            end += 1
+        return last
+
+    def _entries(self, start: int, end: int) -> Tuple[Optional[int], Dict[str, Tuple[int, int]]]:
+        """``(child indent, key -> (line, end))`` for the mapping in lines[start:end]."""
+        indent = None
+        entries: Dict[str, Tuple[int, int]] = {}
+        for i in range(start, end):
+            line = self.lines[i]
+            if not _is_content(line):
+                continue
+            if indent is None:
+                indent = _key_indent(line)
+            if _key_indent(line) != indent:
+                continue
+            match = KEY_LINE.match(line)
+            if match:
+                entries[_unquote(match.group('key'))] = (i, self._end(i))
+        return indent, entries
+
+    def _scope(self, job: Optional[str] = None,
+               step: Optional[int] = None) -> Tuple[int, int, int, Dict[str, Tuple[int, int]]]:
+        """``(start, end, child indent, entries)`` of the file root, one job or one step."""
+        if step is not None:
+            start, end = self.steps(job)[step]
+            indent, entries = self._entries(start, end)
+            return start, end, indent, entries
+        if job is None:
+            indent, entries = self._entries(0, len(self.lines))
+            return 0, len(self.lines), indent or 0, entries
+        jobs = self._entries(0, len(self.lines))[1].get('jobs')
+        if not jobs:
+            raise KeyError('workflow has no jobs')
+        found = self._entries(jobs[0] + 1, jobs[1])[1].get(job)
+        if not found:
+            raise KeyError(f'no job {job!r}')
+        start, end = found[0] + 1, found[1]
+        indent, entries = self._entries(start, end)
+        return start, end, indent or _indent(self.lines[found[0]]) + self.unit, entries
+
+    def jobs(self) -> List[str]:
+        """Job ids in file order."""
+        jobs = self._entries(0, len(self.lines))[1].get('jobs')
+        if not jobs:
+            return []
+        return list(self._entries(jobs[0] + 1, jobs[1])[1])
+
+    def steps(self, job: str) -> List[Tuple[int, int]]:
+        """``(first line, end)`` of each of a job's steps."""
+        entries = self._scope(job)[3]
+        if 'steps' not in entries:
+            return []
+        line, end = entries['steps']
+        items: List[int] = []
+        item_indent = None
+        for i in range(line + 1, end):
+            text = self.lines[i]
+            if _is_content(text) and text.lstrip(' ').startswith('-') and (
+                    item_indent is None or _indent(text) == item_indent):
+                item_indent = _indent(text)
+                items.append(i)
+        bounds = []
+        for n, first in enumerate(items):
+            stop = items[n + 1] if n + 1 < len(items) else end
+            while stop > first + 1 and not _is_content(self.lines[stop - 1]):
+                stop -= 1
+            bounds.append((first, stop))
+        return bounds
+
+    def get(self, key: str, job: Optional[str] = None, step: Optional[int] = None) -> Optional[str]:
+        """The inline value of ``key`` ('' for a block), or None when absent."""
+        entries = self._scope(job, step)[3]
+        if key not in entries:
+            return None
+        match = KEY_LINE.match(self.lines[entries[key][0]])
+        return _unquote(match.group('value') or '')
+
+    # -- Editing --------------------------------------------------------
+
+    def _line(self, indent: int, key: str, value: Optional[str] = None, comment: str = '') -> str:
+        text = ' ' * indent + key + ':' + (f' {value}' if value is not None else '')
+        return text + (comment or '') + self.newline
+
+    def _relined(self, match, value: Optional[str]) -> str:
+        """An existing key line with a new value (indent, dash and comment kept)."""
+        prefix = match.group('indent') + (match.group('dash') or '')
+        return self._line(0, prefix + match.group('key'), value, match.group('comment'))
+
+    def _insert(self, at: int, new_lines: List[str]):
+        if at == len(self.lines) and self.lines and not self.lines[-1].endswith('\n'):
+            self.lines[-1] += self.newline
+        self.lines[at:at] = new_lines
+
+    def _insert_point(self, job: Optional[str], start: int, end: int,
+                      entries: Dict[str, Tuple[int, int]], step: Optional[int] = None) -> int:
+        if step is not None:
+            return end
+        if job is not None:
+            # After runs-on, where people look for job limits, else first in the job
+            runs_on = entries.get('runs-on')
+            return runs_on[1] if runs_on else start
+        jobs = entries.get('jobs')
+        if not jobs:
+            return len(self.lines)
+        # Before jobs:, keeping any comment that introduces it attached to it
+        at = jobs[0]
+        while at > 0 and self.lines[at - 1].strip().startswith('#'):
+            at -= 1
+        return at
+
+    def set_value(self, key: str, value, job: Optional[str] = None, step: Optional[int] = None):
+        """Set a scalar key, in place if present, else inserted."""
+        start, end, indent, entries = self._scope(job, step)
+        rendered = render_scalar(value)
+        if key in entries:
+            line, block_end = entries[key]
+            match = KEY_LINE.match(self.lines[line])
+            if (match.group('value') or '') == rendered and block_end == line + 1:
+                return
+            self.lines[line:block_end] = [self._relined(match, rendered)]
+            return
+        at = self._insert_point(job, start, end, entries, step)
+        new = [self._line(indent, key, rendered)]
+        if job is None:
+            new.append(self.newline)
+        self._insert(at, new)
+
+    def set_mapping(self, key: str, mapping: Dict, job: Optional[str] = None,
+                    step: Optional[int] = None):
+        """Set entries of a mapping key (``permissions``, ``concurrency``...).
+
+        Entries already present are updated in place, missing ones appended
+        to the block; entries not in ``mapping`` are kept.
+        """
+        start, end, indent, entries = self._scope(job, step)
+        child = indent + self.unit
+        if key in entries:
+            line, block_end = entries[key]
+            match = KEY_LINE.match(self.lines[line])
+            if match.group('value') is None:
+                self._merge_block(line, block_end, mapping)
+                return
+            # Inline value: a flow mapping is merged, a scalar (e.g. read-all) replaced
+            current = {}
+            if match.group('value').startswith('{'):
+                import yaml
+                current = yaml.safe_load(match.group('value')) or {}
+            merged = {**current, **mapping}
+            self.lines[line:block_end] = [self._relined(match, None)] + [
+                self._line(child, k, render_scalar(v)) for k, v in merged.items()]
+            return
+        at = self._insert_point(job, start, end, entries, step)
+        new = [self._line(indent, key)] + [self._line(child, k, render_scalar(v))
+                                           for k, v in mapping.items()]
+        if job is None:
+            new.append(self.newline)
+        self._insert(at, new)
+
+    def _merge_block(self, line: int, block_end: int, mapping: Dict):
+        child, existing = self._entries(line + 1, block_end)
+        child = child if child is not None else _indent(self.lines[line]) + self.unit
+        append_at = block_end
+        # Edit bottom-up so earlier line numbers stay valid
+        updates = sorted(((existing[k], k, v) for k, v in mapping.items() if k in existing),
+                         key=lambda item: -item[0][0])
+        missing = [self._line(child, k, render_scalar(v)) for k, v in mapping.items()
+                   if k not in existing]
+        self._insert(append_at, missing)
+        for (at, end), k, v in updates:
+            match = KEY_LINE.match(self.lines[at])
+            rendered = render_scalar(v)
+            if (match.group('value') or '') != rendered or end != at + 1:
+                self.lines[at:end] = [self._relined(match, rendered)]
@@ -0,0 +1,640 @@
+#!/usr/bin/env python3
+"""
+Fake GitHub - Local stand-in for the GitHub REST API
+
+Serves synthetic issues, pull requests (up to thousands of files, and a
+queue of open ones), workflow runs, jobs and log archives so the agent scripts can be exercised and
+measured without a real repository. Point a script at it with
+``GITHUB_API_URL=http://127.0.0.1:<port>``.
+
+Behaves like GitHub where the scripts care: ``Link`` pagination, ETags and
+``304 Not Modified``, rate limit headers, the 3000-file cap on PR file
+listings, log downloads that redirect to a blob URL, and the GraphQL
+queries the batch reviewer sends for open PRs and their files. ``Fixtures.push``
+adds a commit to a PR, which the compare endpoint then reports. Every request is
+counted; ``GET /_stats`` returns the counters and ``POST /_reset`` clears them.
+
+Usage:
+    python benchmarks/fake_github.py --scenario medium --port 8080
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import random
+import re
+import threading
+import zipfile
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+REPO = 'octo/fake-repo'
+
+# Fixture sizes per scenario
+SCENARIOS = {
+    'small': {'issues': 10, 'pr_files': 20, 'jobs': 3, 'log_lines': 2_000, 'runs': 5, 'pulls': 5},
+    'medium': {'issues': 300, 'pr_files': 600, 'jobs': 10, 'log_lines': 50_000, 'runs': 30, 'pulls': 50},
+    'large': {'issues': 3_000, 'pr_files': 3_500, 'jobs': 30, 'log_lines': 400_000, 'runs': 100,
+              'pulls': 200},
+}
+
+# PR numbers served by every scenario
+PR_SMALL = 1   # two docs files, tiny diff
+PR_LARGE = 2   # scenario-sized, mixed files
+# The scenario's other open PRs (a few files each) follow from here
+PR_QUEUE = 3
+
+# Run IDs served by every scenario; the scenario's other runs follow it
+RUN_FAILED = 1000
+
+# Runs are listed newest first, one every half hour back from here
+RUNS_END = datetime(2026, 1, 5, 8, 0, 0)
+
+# GitHub stops listing PR files here
+MAX_PR_FILES = 3000
+
+FILE_KINDS = ['docs/guide_{}.md', 'src/module_{}.py', 'tests/test_{}.py',
+              'config/settings_{}.yml', 'software/uv_control/part_{}.py']
+
+LOG_NOISE = [
+    'Collecting package-{n}',
+    'Downloading package-{n}-1.0.{n}-py3-none-any.whl (12 kB)',
+    'Requirement already satisfied: dep-{n} in /usr/lib/python3/site-packages',
+    'tests/test_{n}.py::test_case PASSED',
+    'Processing item {n} of many',
+]
+
+LOG_FAILURE = [
+    'Traceback (most recent call last):',
+    '  File "/home/runner/work/fake-repo/.github/scripts/orchestrator.py", line 12, in <module>',
+    "ModuleNotFoundError: No module named 'yaml'",
+    '##[error]Process completed with exit code 1.',
+]
+
+
+def _timestamp(second: int) -> str:
+    return f"2026-01-05T08:{(second // 60) % 60:02d}:{second % 60:02d}.0000000Z"
+
+
+class Fixtures:
+    """Deterministic synthetic repository data for one scenario"""
+
+    def __init__(self, scenario: str = 'small', seed: int = 42):
+        self.scenario = scenario
+        self.size = SCENARIOS[scenario]
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+        self.issues: Dict[int, Dict] = {}
+        for number in range(1, self.size['issues'] + 1):
+            self.issues[number] = self._issue(number, f"Existing issue {number}", 'Backlog item.')
+        self.next_issue = self.size['issues'] + 1
+        self.comments: Counter = Counter()
+        # (base sha, head sha) -> files changed between them, filled by ``push``
+        self.comparisons: Dict[tuple, List[Dict]] = {}
+
+        self.pulls = {
+            PR_SMALL: self._pull(PR_SMALL, 'Update docs', [
+                {'filename': 'docs/guide.md', 'status': 'modified', 'additions': 5,
+                 'deletions': 2, 'changes': 7, 'patch': '@@ -1,2 +1,5 @@\n-old\n+new text\n'},
+                {'filename': 'README.md', 'status': 'modified', 'additions': 1,
+                 'deletions': 0, 'changes': 1, 'patch': '@@ -1 +1,2 @@\n+More docs\n'},
+            ]),
+            PR_LARGE: self._pull(PR_LARGE, 'Large refactor', [
+                self._pr_file(i) for i in range(self.size['pr_files'])
+            ]),
+        }
+        for number in range(PR_QUEUE, PR_QUEUE + self.size['pulls'] - 2):
+            files = [self._pr_file(number * 10 + k) for k in range(self.rng.randint(1, 4))]
+            self.pulls[number] = self._pull(number, f'Queued change {number}', files)
+            # Every 4th is a docs-only change, every 7th a draft
+            if number % 4 == 0:
+                self.pulls[number] = self._pull(number, f'Docs update {number}', [
+                    dict(f, filename=f'docs/page_{number}_{k}.md', patch='@@ -1 +1 @@\n-a\n+b')
+                    for k, f in enumerate(files)])
+            self.pulls[number]['draft'] = number % 7 == 0
+
+        self.runs = {}
+        self.jobs = []
+        for k in range(self.size['runs']):
+            run_id = RUN_FAILED + k
+            # Every 5th run passed; the rest failed the same way
+            failed = run_id == RUN_FAILED or k % 5 != 4
+            self.runs[run_id] = self._run(run_id, 'failure' if failed else 'success')
+            self.jobs += self._jobs(run_id, failed)
+        self.jobs_by_id = {job['id']: job for job in self.jobs}
+        self._log_zips: Dict[str, bytes] = {}
+        self._job_logs: Dict[tuple, bytes] = {}
+
+    # -- Builders -------------------------------------------------------
+
+    def _issue(self, number: int, title: str, body: str, labels: Optional[List[str]] = None) -> Dict:
+        return {
+            'number': number,
+            'title': title,
+            'body': body,
+            'state': 'open',
+            'labels': [{'name': name} for name in labels or []],
+            'html_url': f'https://github.com/{REPO}/issues/{number}',
+        }
+
+    def _pull(self, number: int, title: str, files: List[Dict]) -> Dict:
+        return {
+            'number': number,
+            'title': title,
+            'body': f'Changes for #{number}.',
+            'state': 'open',
+            'draft': False,
+            'labels': [{'name': 'automated-fix'}],
+            'head': {'sha': hashlib.sha1(f'head-{number}'.encode()).hexdigest(), 'ref': f'feature-{number}'},
+            'base': {'sha': hashlib.sha1(f'base-{number}'.encode()).hexdigest(), 'ref': 'main'},
+            'html_url': f'https://github.com/{REPO}/pull/{number}',
+            'changed_files': len(files),
+            '_files': files,
+        }
+
+    def _pr_file(self, i: int) -> Dict:
+        filename = FILE_KINDS[i % len(FILE_KINDS)].format(i)
+        additions = self.rng.randint(0, 40)
+        deletions = self.rng.randint(0, 20)
+        lines = [f"+line {n} of {filename}" for n in range(additions)]
+        lines += [f"-old line {n}" for n in range(deletions)]
+        if i % 97 == 0:
+            lines.append('+    emergency_stop()')
+        return {
+            'filename': filename,
+            'status': 'modified',
+            'additions': additions,
+            'deletions': deletions,
+            'changes': additions + deletions,
+            'patch': f"@@ -1,{deletions} +1,{additions} @@\n" + '\n'.join(lines),
+        }
+
+    def _jobs(self, run_id: int, run_failed: bool = True) -> List[Dict]:
+        jobs = []
+        for j in range(self.size['jobs']):
+            failed = run_failed and j == 0
+            steps = []
+            for n, name in enumerate(['Set up job', 'Checkout', 'Install dependencies',
+                                      'Run tests', 'Complete job'], 1):
+                conclusion = 'failure' if failed and name == 'Run tests' else 'success'
+                if failed and name == 'Complete job':
+                    conclusion = 'skipped'
+                steps.append({
+                    'number': n,
+                    'name': name,
+                    'status': 'completed',
+                    'conclusion': conclusion,
+                    'started_at': _timestamp(n * 10),
+                    'completed_at': _timestamp(n * 10 + 9),
+                })
+            jobs.append({
+                'id': run_id * 100 + j,
+                'run_id': run_id,
+                'name': f'job-{j}',
+                'status': 'completed',
+                'conclusion': 'failure' if failed else 'success',
+                'started_at': _timestamp(0),
+                # Durations vary between runs (1-6 minutes) for timeout statistics
+                'completed_at': _timestamp(60 + (run_id * 37 + j * 11) % 300),
+                'steps': steps,
+            })
+        return jobs
+
+    def _run(self, run_id: int, conclusion: str) -> Dict:
+        k = run_id - RUN_FAILED
+        # Runs come in pairs on one commit (a re-run); every third pair is the docs workflow
+        commit = RUN_FAILED + k // 2 * 2
+        docs = (k // 2) % 3 == 2
+        created = RUNS_END - timedelta(minutes=30 * k)
+        return {
+            'id': run_id,
+            'name': 'Docs' if docs else 'CI',
+            'head_sha': hashlib.sha1(f'run-{commit}'.encode()).hexdigest(),
+            'status': 'completed',
+            'conclusion': conclusion,
+            'event': 'push',
+            'workflow_id': 2 if docs else 1,
+            'path': '.github/workflows/docs.yml' if docs else '.github/workflows/ci.yml',
+            'run_attempt': 1 + k % 2,
+            'run_started_at': f'{created:%Y-%m-%dT%H:%M:%S}Z',
+            'created_at': f'{created:%Y-%m-%dT%H:%M:%S}Z',
+            'updated_at': f'{created + timedelta(minutes=1):%Y-%m-%dT%H:%M:%S}Z',
+            'html_url': f'https://github.com/{REPO}/actions/runs/{run_id}',
+            'logs_url': f'/repos/{REPO}/actions/runs/{run_id}/logs',
+        }
+
+    # -- Logs -----------------------------------------------------------
+
+    def _step_log(self, job: Dict, step: Dict) -> bytes:
+        """Timestamped log text for one step; failing steps end with an error."""
+        lines = self.size['log_lines'] if step['conclusion'] == 'failure' else 50
+        out = io.StringIO()
+        out.write(f"{step['started_at']} ##[group]Run {step['name']}\n")
+        for n in range(lines):
+            out.write(f"{step['started_at']} {LOG_NOISE[n % len(LOG_NOISE)].format(n=n)}\n")
+        if step['conclusion'] == 'failure':
+            for line in LOG_FAILURE:
+                out.write(f"{step['completed_at']} {line}\n")
+        out.write(f"{step['completed_at']} ##[endgroup]\n")
+        return out.getvalue().encode()
+
+    # Logs depend only on job names and outcomes, so they are built once per kind of run
+
+    def job_log(self, job_id: int) -> bytes:
+        job = self.jobs_by_id[job_id]
+        key = (job['name'], job['conclusion'])
+        with self.lock:
+            if key not in self._job_logs:
+                self._job_logs[key] = b''.join(self._step_log(job, s) for s in job['steps'])
+            return self._job_logs[key]
+
+    def log_zip(self, run_id: int) -> bytes:
+        """Run log archive laid out like GitHub's: ``<job>/<n>_<step>.txt``."""
+        key = self.runs[run_id]['conclusion']
+        with self.lock:
+            if key not in self._log_zips:
+                buf = io.BytesIO()
+                with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zf:
+                    for job in self.jobs:
+                        if job['run_id'] != run_id:
+                            continue
+                        full = []
+                        for step in job['steps']:
+                            text = self._step_log(job, step)
+                            full.append(text)
+                            zf.writestr(f"{job['name']}/{step['number']}_{step['name']}.txt", text)
+                        zf.writestr(f"{job['name']}.txt", b''.join(full))
+                self._log_zips[key] = buf.getvalue()
+            return self._log_zips[key]
+
+    # -- Mutations ------------------------------------------------------
+
+    def create_issue(self, data: Dict) -> Dict:
+        with self.lock:
+            number = self.next_issue
+            self.next_issue += 1
+            issue = self._issue(number, data.get('title', ''), data.get('body', ''),
+                                data.get('labels'))
+            self.issues[number] = issue
+            return issue
+
+    def push(self, number: int, files: List[Dict]) -> str:
+        """Add a commit changing ``files`` (files API entries) to a PR; returns the new head."""
+        with self.lock:
+            pull = self.pulls[number]
+            old = pull['head']['sha']
+            new = hashlib.sha1(f'{old}-push'.encode()).hexdigest()
+            by_name = {f['filename']: f for f in pull['_files']}
+            for change in files:
+                merged = dict(by_name.get(change['filename'], {'additions': 0, 'deletions': 0}))
+                merged.update(change, additions=merged['additions'] + change['additions'],
+                              deletions=merged['deletions'] + change['deletions'])
+                merged['changes'] = merged['additions'] + merged['deletions']
+                by_name[change['filename']] = merged
+            pull['_files'] = list(by_name.values())
+            pull['changed_files'] = len(by_name)
+            pull['head'] = dict(pull['head'], sha=new)
+            self.comparisons[(old, new)] = files
+            return new
+
+
+class FakeGitHubServer(ThreadingHTTPServer):
+    """HTTP server holding fixtures and request counters"""
+
+    daemon_threads = True
+
+    def __init__(self, address, fixtures: Fixtures):
+        super().__init__(address, Handler)
+        self.fixtures = fixtures
+        self.stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.calls: Counter = Counter()
+            self.bytes_sent = 0
+            self.not_modified = 0
+
+    def stats(self) -> Dict:
+        with self.stats_lock:
+            return {
+                'requests': sum(self.calls.values()),
+                'by_endpoint': dict(self.calls),
+                'bytes_sent': self.bytes_sent,
+                'not_modified': self.not_modified,
+            }
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Routes requests to fixture data"""
+
+    protocol_version = 'HTTP/1.1'
+    server: FakeGitHubServer
+
+    ROUTES = [
+        ('GET', r'/_stats', 'stats'),
+        ('POST', r'/_reset', 'reset'),
+        ('GET', r'/repos/[^/]+/[^/]+/issues', 'list_issues'),
+        ('POST', r'/repos/[^/]+/[^/]+/issues', 'create_issue'),
+        ('PATCH', r'/repos/[^/]+/[^/]+/issues/(\d+)', 'update_issue'),
+        ('POST', r'/repos/[^/]+/[^/]+/issues/(\d+)/comments', 'create_comment'),
+        ('POST', r'/repos/[^/]+/[^/]+/issues/(\d+)/labels', 'add_labels'),
+        ('GET', r'/repos/[^/]+/[^/]+/pulls/(\d+)', 'get_pull'),
+        ('GET', r'/repos/[^/]+/[^/]+/pulls/(\d+)/files', 'list_pull_files'),
+        ('GET', r'/repos/[^/]+/[^/]+/compare/([0-9a-f]+)\.\.\.([0-9a-f]+)', 'compare'),
+        ('POST', r'/graphql', 'graphql'),
+        ('GET', r'/repos/[^/]+/[^/]+/actions/runs', 'list_runs'),
+        ('GET', r'/repos/[^/]+/[^/]+/actions/workflows/([^/]+)/runs', 'list_runs'),
+        ('GET', r'/repos/[^/]+/[^/]+/actions/runs/(\d+)', 'get_run'),
+        ('GET', r'/repos/[^/]+/[^/]+/actions/runs/(\d+)/jobs', 'list_jobs'),
+        ('GET', r'/repos/[^/]+/[^/]+/actions/runs/(\d+)/logs', 'run_logs'),
+        ('GET', r'/repos/[^/]+/[^/]+/actions/jobs/(\d+)/logs', 'job_logs'),
+        ('GET', r'/_blobs/runs/(\d+)\.zip', 'run_logs_blob'),
+        ('GET', r'/_blobs/jobs/(\d+)\.txt', 'job_logs_blob'),
+    ]
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def fixtures(self) -> Fixtures:
+        return self.server.fixtures
+
+    # -- Plumbing -------------------------------------------------------
+
+    def _dispatch(self, method: str):
+        parsed = urlparse(self.path)
+        self.query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        self.body = json.loads(raw) if raw else {}
+
+        self.counted = not parsed.path.startswith(('/_stats', '/_reset'))
+        for route_method, pattern, name in self.ROUTES:
+            match = re.fullmatch(pattern, parsed.path)
+            if route_method == method and match:
+                if self.counted:
+                    with self.server.stats_lock:
+                        self.server.calls[f'{method} {name}'] += 1
+                getattr(self, name)(*match.groups())
+                return
+        self._json({'message': 'Not Found'}, status=404)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-RateLimit-Limit', '5000')
+        self.send_header('X-RateLimit-Remaining', '4999')
+        self.send_header('X-RateLimit-Reset', '0')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+        if self.counted:
+            with self.server.stats_lock:
+                self.server.bytes_sent += len(body)
+
+    def _json(self, data, status: int = 200, headers: Optional[Dict] = None, etag: bool = False):
+        body = json.dumps(data).encode()
+        headers = dict(headers or {})
+        if etag and status == 200:
+            tag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            headers['ETag'] = tag
+            if self.headers.get('If-None-Match') == tag:
+                with self.server.stats_lock:
+                    self.server.not_modified += 1
+                self._send(304, b'', 'application/json', {'ETag': tag})
+                return
+        self._send(status, body, 'application/json; charset=utf-8', headers)
+
+    def _page(self, items: List, path: str):
+        """Serve one page of ``items`` with a GitHub-style Link header."""
+        per_page = min(int(self.query.get('per_page', 30)), 100)
+        page = int(self.query.get('page', 1))
+        chunk = items[(page - 1) * per_page:page * per_page]
+        headers = {}
+        if page * per_page < len(items):
+            extra = ''.join(f'&{k}={v}' for k, v in self.query.items() if k not in ('page', 'per_page'))
+            headers['Link'] = (f'<{self.server.url}{path}?per_page={per_page}&page={page + 1}{extra}>; '
+                               f'rel="next"')
+        return chunk, headers
+
+    def _range(self, data: bytes, content_type: str):
+        """Serve bytes, honouring a single ``Range: bytes=`` header."""
+        spec = self.headers.get('Range', '')
+        match = re.fullmatch(r'bytes=(\d*)-(\d*)', spec.strip())
+        if not match:
+            self._send(200, data, content_type, {'Accept-Ranges': 'bytes'})
+            return
+        start, end = match.groups()
+        if start == '':
+            start = max(0, len(data) - int(end))
+            end = len(data) - 1
+        else:
+            start = int(start)
+            end = int(end) if end else len(data) - 1
+        end = min(end, len(data) - 1)
+        self._send(206, data[start:end + 1], content_type, {
+            'Content-Range': f'bytes {start}-{end}/{len(data)}',
+            'Accept-Ranges': 'bytes',
+        })
+
+    # -- Control --------------------------------------------------------
+
+    def stats(self):
+        self._json(self.server.stats())
+
+    def reset(self):
+        self.server.reset_stats()
+        self._json({'ok': True})
+
+    # -- Issues ---------------------------------------------------------
+
+    def list_issues(self):
+        state = self.query.get('state', 'open')
+        issues = [i for i in self.fixtures.issues.values() if state == 'all' or i['state'] == state]
+        chunk, headers = self._page(issues, urlparse(self.path).path)
+        self._json(chunk, headers=headers, etag=True)
+
+    def create_issue(self):
+        self._json(self.fixtures.create_issue(self.body), status=201)
+
+    def update_issue(self, number):
+        issue = self.fixtures.issues.get(int(number))
+        if not issue:
+            return self._json({'message': 'Not Found'}, status=404)
+        for key in ('title', 'body', 'state'):
+            if key in self.body:
+                issue[key] = self.body[key]
+        if 'labels' in self.body:
+            issue['labels'] = [{'name': name} for name in self.body['labels']]
+        self._json(issue)
+
+    def create_comment(self, number):
+        self.fixtures.comments[int(number)] += 1
+        self._json({'id': self.fixtures.comments[int(number)], 'body': self.body.get('body')},
+                   status=201)
+
+    def add_labels(self, number):
+        issue = self.fixtures.issues.get(int(number))
+        if issue:
+            issue['labels'] += [{'name': name} for name in self.body.get('labels', [])]
+        self._json([{'name': name} for name in self.body.get('labels', [])])
+
+    # -- Pull requests --------------------------------------------------
+
+    def get_pull(self, number):
+        pull = self.fixtures.pulls.get(int(number))
+        if not pull:
+            return self._json({'message': 'Not Found'}, status=404)
+        self._json({k: v for k, v in pull.items() if not k.startswith('_')}, etag=True)
+
+    def list_pull_files(self, number):
+        pull = self.fixtures.pulls.get(int(number))
+        if not pull:
+            return self._json({'message': 'Not Found'}, status=404)
+        chunk, headers = self._page(pull['_files'][:MAX_PR_FILES], urlparse(self.path).path)
+        self._json(chunk, headers=headers, etag=True)
+
+    def compare(self, base, head):
+        files = self.fixtures.comparisons.get((base, head))
+        if files is None:
+            # Unrelated commits (e.g. after a force push)
+            return self._json({'status': 'diverged', 'ahead_by': 0, 'files': []})
+        self._json({'status': 'ahead', 'ahead_by': 1, 'total_commits': 1, 'files': files[:300]},
+                   etag=True)
+
+    # -- GraphQL --------------------------------------------------------
+
+    def _connection(self, items: List, first: int, after: Optional[str], node) -> Dict:
+        """A GraphQL connection page; cursors are plain offsets."""
+        start = int(after or 0)
+        end = start + min(first, 100)
+        return {
+            'pageInfo': {'hasNextPage': end < len(items), 'endCursor': str(min(end, len(items)))},
+            'nodes': [node(item) for item in items[start:end]],
+        }
+
+    def _file_node(self, file: Dict) -> Dict:
+        return {'path': file['filename'], 'additions': file['additions'],
+                'deletions': file['deletions'], 'changeType': file['status'].upper()}
+
+    def graphql(self):
+        """The two query shapes the batch reviewer sends: open PRs, and one PR's files."""
+        query, variables = self.body.get('query', ''), self.body.get('variables') or {}
+        files = int(variables.get('files', 100))
+        if 'pullRequests(' in query:
+            pulls = [p for n, p in sorted(self.fixtures.pulls.items()) if p['state'] == 'open']
+
+            def node(pull):
+                return {
+                    'number': pull['number'], 'title': pull['title'], 'body': pull['body'],
+                    'isDraft': pull['draft'], 'changedFiles': pull['changed_files'],
+                    'headRefOid': pull['head']['sha'], 'headRefName': pull['head']['ref'],
+                    'baseRefOid': pull['base']['sha'], 'baseRefName': pull['base']['ref'],
+                    'labels': {'nodes': pull['labels']},
+                    'files': self._connection(pull['_files'][:MAX_PR_FILES], files, None, self._file_node),
+                }
+            repository = {'pullRequests': self._connection(
+                pulls, int(variables.get('first', 50)), variables.get('after'), node)}
+        elif 'pullRequest(' in query:
+            pull = self.fixtures.pulls.get(int(variables.get('number', 0)))
+            if not pull:
+                return self._json({'data': None, 'errors': [{'message': 'Could not resolve to a PullRequest'}]})
+            repository = {'pullRequest': {'files': self._connection(
+                pull['_files'][:MAX_PR_FILES], files, variables.get('after'), self._file_node)}}
+        else:
+            return self._json({'errors': [{'message': 'Unsupported query'}]}, status=400)
+        self._json({'data': {'rateLimit': {'cost': 1, 'remaining': 4999}, 'repository': repository}})
+
+    # -- Actions --------------------------------------------------------
+
+    def list_runs(self, workflow=None):
+        runs = sorted(self.fixtures.runs.values(), key=lambda r: r['created_at'], reverse=True)
+        if workflow:
+            # A workflow is addressed by id or by file name
+            runs = [r for r in runs if workflow in (str(r['workflow_id']), r['path'].rsplit('/', 1)[-1])]
+        status = self.query.get('status')
+        if status:
+            runs = [r for r in runs if status in (r['status'], r['conclusion'])]
+        created = self.query.get('created', '')
+        if created.startswith('>='):
+            runs = [r for r in runs if r['created_at'] >= created[2:]]
+        chunk, headers = self._page(runs, urlparse(self.path).path)
+        self._json({'total_count': len(runs), 'workflow_runs': chunk}, headers=headers, etag=True)
+
+    def get_run(self, run_id):
+        run = self.fixtures.runs.get(int(run_id))
+        if not run:
+            return self._json({'message': 'Not Found'}, status=404)
+        self._json(run, etag=True)
+
+    def list_jobs(self, run_id):
+        jobs = [j for j in self.fixtures.jobs if j['run_id'] == int(run_id)]
+        chunk, headers = self._page(jobs, urlparse(self.path).path)
+        self._json({'total_count': len(jobs), 'jobs': chunk}, headers=headers, etag=True)
+
+    def run_logs(self, run_id):
+        self._send(302, b'', 'text/plain', {'Location': f'{self.server.url}/_blobs/runs/{run_id}.zip'})
+
+    def run_logs_blob(self, run_id):
+        if int(run_id) not in self.fixtures.runs:
+            return self._json({'message': 'Not Found'}, status=404)
+        self._send(200, self.fixtures.log_zip(int(run_id)), 'application/zip')
+
+    def job_logs(self, job_id):
+        self._send(302, b'', 'text/plain', {'Location': f'{self.server.url}/_blobs/jobs/{job_id}.txt'})
+
+    def job_logs_blob(self, job_id):
+        if int(job_id) not in self.fixtures.jobs_by_id:
+            return self._json({'message': 'Not Found'}, status=404)
+        self._range(self.fixtures.job_log(int(job_id)), 'text/plain')
+
+
+def start_server(scenario: str = 'small', host: str = '127.0.0.1', port: int = 0) -> FakeGitHubServer:
+    """Start a server on a background thread and return it."""
+    server = FakeGitHubServer((host, port), Fixtures(scenario))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake GitHub - local REST API stand-in')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='small')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args()
+
+    server = FakeGitHubServer((args.host, args.port), Fixtures(args.scenario))
+    print(f"🧪 Fake GitHub ({args.scenario}) listening on {server.url}")
+    print(f"   export GITHUB_API_URL={server.url} GITHUB_REPOSITORY={REPO} GITHUB_TOKEN=fake")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
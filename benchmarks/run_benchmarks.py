@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Benchmarks - End-to-end cost of the agent scripts
+
+Runs orchestrator, auto-reviewer and workflow doctor as subprocesses against
+the local fake GitHub (fake_github.py) and a synthetic working tree, once
+with a cold cache and once warm, and reports for each run:
+
+- wall time
+- API calls (as counted by the server) and 304 answers
+- bytes sent by the server
+- peak RSS of the script process
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --scenario large --script reviewer --json out.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+from urllib.request import urlopen, Request
+
+from fake_github import PR_LARGE, REPO, RUN_FAILED, SCENARIOS, start_server
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = REPO_ROOT / '.github' / 'scripts'
+
+# Python files in the synthetic tree per scenario
+TREE_FILES = {'small': 50, 'medium': 2_000, 'large': 20_000}
+
+WORKFLOW_FIXTURE = """name: CI
+
+on:
+  push:
+    branches: [main]
+
+jobs:
+  test:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/checkout@v4
+      - run: pip install -r requirements.txt
+      - run: pytest
+"""
+
+
+def build_tree(root: Path, files: int):
+    """Write a synthetic project: Python packages with TODOs, tests and a workflow."""
+    for i in range(files):
+        package = root / 'src' / f'pkg_{i // 100}'
+        package.mkdir(parents=True, exist_ok=True)
+        lines = [f'"""Module {i}."""', '']
+        for n in range(40):
+            lines.append(f'def func_{n}(x):')
+            if n % 13 == i % 13:
+                lines.append(f'    # TODO: handle edge case {n}')
+            lines.append(f'    return x + {n}')
+            lines.append('')
+        (package / f'module_{i}.py').write_text('\n'.join(lines))
+    (root / 'tests').mkdir(exist_ok=True)
+    (root / 'tests' / 'test_smoke.py').write_text('def test_smoke():\n    assert True\n')
+    (root / 'node_modules' / 'dep').mkdir(parents=True, exist_ok=True)
+    (root / 'node_modules' / 'dep' / 'index.js').write_text('// TODO: vendored\n')
+    workflows = root / '.github' / 'workflows'
+    workflows.mkdir(parents=True, exist_ok=True)
+    (workflows / 'ci.yml').write_text(WORKFLOW_FIXTURE)
+
+
+def script_commands(scenario: str) -> Dict[str, List[str]]:
+    python = sys.executable
+    return {
+        'orchestrator': [python, str(SCRIPTS_DIR / 'orchestrator.py')],
+        'reviewer': [python, str(SCRIPTS_DIR / 'auto_reviewer.py'),
+                     '--repo', REPO, '--pr-number', str(PR_LARGE)],
+        'doctor': [python, str(SCRIPTS_DIR / 'workflow_doctor.py'),
+                   '--repo', REPO, '--run-id', str(RUN_FAILED), '--workflow-name', 'CI'],
+    }
+
+
+def server_call(url: str, method: str = 'GET') -> Dict:
+    with urlopen(Request(url, method=method, data=b'' if method == 'POST' else None)) as response:
+        return json.loads(response.read())
+
+
+def run_script(command: List[str], cwd: Path, env: Dict[str, str], log_path: Path) -> Dict:
+    """Run one script to completion and measure it."""
+    started = time.monotonic()
+    with open(log_path, 'w') as log:
+        process = subprocess.Popen(command, cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return {
+        'exit_code': process.returncode,
+        'wall_s': round(time.monotonic() - started, 3),
+        # ru_maxrss is in KiB on Linux
+        'peak_rss_mb': round(usage.ru_maxrss / 1024, 1),
+        'cpu_s': round(usage.ru_utime + usage.ru_stime, 3),
+    }
+
+
+def benchmark(scenario: str, scripts: List[str], keep: bool = False) -> List[Dict]:
+    """Run the selected scripts for one scenario, cold then warm."""
+    server = start_server(scenario)
+    workdir = Path(tempfile.mkdtemp(prefix=f'agent-bench-{scenario}-'))
+    results = []
+    try:
+        print(f"🏗️  Building {scenario} tree ({TREE_FILES[scenario]} files) in {workdir}")
+        build_tree(workdir, TREE_FILES[scenario])
+
+        env = {
+            **os.environ,
+            'GITHUB_API_URL': server.url,
+            'GITHUB_REPOSITORY': REPO,
+            'GITHUB_TOKEN': 'fake',
+            'AGENT_CACHE_DIR': str(workdir / '.agent-cache'),
+            'ORCHESTRATOR_WRITE_INTERVAL': '0',
+            'PYTHONDONTWRITEBYTECODE': '1',
+        }
+        env.pop('GITHUB_OUTPUT', None)
+        env.pop('GITHUB_STEP_SUMMARY', None)
+
+        commands = script_commands(scenario)
+        for name in scripts:
+            shutil.rmtree(workdir / '.agent-cache', ignore_errors=True)
+            for phase in ('cold', 'warm'):
+                server_call(f'{server.url}/_reset', 'POST')
+                log_path = workdir / f'{name}-{phase}.log'
+                measured = run_script(commands[name], workdir, env, log_path)
+                stats = server_call(f'{server.url}/_stats')
+                row = {
+                    'scenario': scenario,
+                    'script': name,
+                    'phase': phase,
+                    **measured,
+                    'api_calls': stats['requests'],
+                    'not_modified': stats['not_modified'],
+                    'bytes': stats['bytes_sent'],
+                    'by_endpoint': stats['by_endpoint'],
+                }
+                results.append(row)
+                status = '✅' if measured['exit_code'] == 0 else f"❌ exit {measured['exit_code']}"
+                print(f"  {status} {name:<12} {phase:<4} {measured['wall_s']:>7.2f}s "
+                      f"{stats['requests']:>5} calls {stats['bytes_sent']:>11} bytes "
+                      f"{measured['peak_rss_mb']:>7.1f} MiB")
+                if measured['exit_code'] != 0:
+                    print(f"     log: {log_path}")
+                    keep = True
+    finally:
+        server.shutdown()
+        server.server_close()
+        if not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def print_table(results: List[Dict]):
+    header = (f"{'scenario':<8} {'script':<12} {'run':<4} {'wall s':>8} {'cpu s':>7} "
+              f"{'calls':>6} {'304s':>5} {'bytes':>11} {'rss MiB':>8} {'exit':>4}")
+    print('\n' + header)
+    print('-' * len(header))
+    for row in results:
+        print(f"{row['scenario']:<8} {row['script']:<12} {row['phase']:<4} {row['wall_s']:>8.2f} "
+              f"{row['cpu_s']:>7.2f} {row['api_calls']:>6} {row['not_modified']:>5} "
+              f"{row['bytes']:>11} {row['peak_rss_mb']:>8.1f} {row['exit_code']:>4}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the agent scripts against a fake GitHub')
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='Scenario to run (repeatable, default: small and medium)')
+    parser.add_argument('--script', action='append', choices=['orchestrator', 'reviewer', 'doctor'],
+                        help='Script to run (repeatable, default: all)')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    parser.add_argument('--keep', action='store_true', help='Keep working directories and logs')
+    args = parser.parse_args()
+
+    scenarios = args.scenario or ['small', 'medium']
+    scripts = args.script or ['orchestrator', 'reviewer', 'doctor']
+
+    results = []
+    for scenario in scenarios:
+        results += benchmark(scenario, scripts, keep=args.keep)
+
+    print_table(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.json}")
+
+    if any(row['exit_code'] != 0 for row in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -63,6 +63,28 @@ cp "$TEMP_DIR/.github/workflows/manual-pr-review.yml" .github/workflows/
 cp "$TEMP_DIR/.github/scripts/orchestrator.py" .github/scripts/
 cp "$TEMP_DIR/.github/scripts/auto_reviewer.py" .github/scripts/
 cp "$TEMP_DIR/.github/scripts/workflow_doctor.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/todo_scanner.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/tree_walker.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/agent_cache.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/scan_cache.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/issue_index.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/rate_limit.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/issue_pipeline.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/github_client.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/http_cache.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/telemetry.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/log_reader.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/failure_classifier.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/failure_signatures.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/failure_archive.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/workflow_patch.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/workflow_index.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/workflow_lint.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/path_policy.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/git_diff.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/diff_scanner.py" .github/scripts/
+cp "$TEMP_DIR/.github/scripts/review_cache.py" .github/scripts/
+cp "$TEMP_DIR/.github/review-policy" .github/
 
 # Copy documentation
 cp "$TEMP_DIR/.github/PR-REVIEW-FLOW.md" .github/ 2>/dev/null || true
@@ -122,7 +144,6 @@ if [ ! -f requirements.txt ]; then
     echo "📦 Creating requirements.txt..."
     cat > requirements.txt << 'EOF'
 # Autonomous Loop dependencies
-PyGithub>=2.1.1
 requests>=2.31.0
 pyyaml>=6.0
 
@@ -151,7 +172,28 @@ echo "  │   └── manual-pr-review.yml      ← ⚙️  Manual control"
 echo "  ├── scripts/"
 echo "  │   ├── orchestrator.py           ← Analysis engine"
 echo "  │   ├── auto_reviewer.py          ← PR validator"
-echo "  │   └── workflow_doctor.py        ← Diagnostics"
+echo "  │   ├── workflow_doctor.py        ← Diagnostics"
+echo "  │   ├── todo_scanner.py           ← TODO/FIXME scanner"
+echo "  │   ├── tree_walker.py            ← Pruned .gitignore-aware tree walk"
+echo "  │   ├── agent_cache.py            ← Shared cache directory"
+echo "  │   ├── scan_cache.py             ← Content-keyed findings cache"
+echo "  │   ├── issue_index.py            ← Open-issue fingerprint index"
+echo "  │   ├── rate_limit.py             ← Shared GitHub rate limiter"
+echo "  │   ├── issue_pipeline.py         ← Concurrent issue filing"
+echo "  │   ├── github_client.py          ← Shared pooled GitHub REST client"
+echo "  │   ├── http_cache.py             ← ETag/conditional GET cache"
+echo "  │   ├── telemetry.py              ← Per-run spans/counters (JSON, Prometheus, step summary)"
+echo "  │   ├── log_reader.py             ← Streams failing-step logs (zip members / Range tail)"
+echo "  │   ├── failure_classifier.py     ← Compiled, weighted failure-pattern ranking"
+echo "  │   ├── failure_signatures.py     ← Known-failure signatures + recurrence report"
+echo "  │   ├── failure_archive.py        ← Compressed, token-indexed failure log history"
+echo "  │   ├── workflow_patch.py         ← Comment-preserving, minimal-diff workflow edits"
+echo "  │   ├── workflow_index.py         ← Cached, parsed summary of every workflow file"
+echo "  │   ├── workflow_lint.py          ← CI-time anti-pattern linter for workflow files"
+echo "  │   ├── path_policy.py            ← CODEOWNERS-style path rules for the reviewer"
+echo "  │   ├── git_diff.py               ← PR diff stats and patches from the local checkout"
+echo "  │   ├── diff_scanner.py           ← Critical-pattern scanner for PR diff lines"
+echo "  │   └── review_cache.py           ← Cached reviewer verdicts keyed by PR head SHA"
 echo "  └── copilot-instructions.md       ← ⚠️  CUSTOMIZE THIS!"
 echo ""
 
@@ -163,6 +205,7 @@ echo "1. 📝 CUSTOMIZE YOUR PROJECT CONTEXT:"
 echo "   nano .github/copilot-instructions.md"
 echo ""
 echo "2. 🔧 OPTIONAL: Adjust critical files and thresholds:"
+echo "   nano .github/review-policy"
 echo "   nano .github/scripts/auto_reviewer.py"
 echo ""
 echo "3. 💾 COMMIT THE AUTOMATION:"
@@ -54,6 +54,27 @@ SCRIPTS=(
     ".github/scripts/orchestrator.py"
     ".github/scripts/auto_reviewer.py"
     ".github/scripts/workflow_doctor.py"
+    ".github/scripts/todo_scanner.py"
+    ".github/scripts/tree_walker.py"
+    ".github/scripts/agent_cache.py"
+    ".github/scripts/scan_cache.py"
+    ".github/scripts/issue_index.py"
+    ".github/scripts/rate_limit.py"
+    ".github/scripts/issue_pipeline.py"
+    ".github/scripts/github_client.py"
+    ".github/scripts/http_cache.py"
+    ".github/scripts/telemetry.py"
+    ".github/scripts/log_reader.py"
+    ".github/scripts/failure_classifier.py"
+    ".github/scripts/failure_signatures.py"
+    ".github/scripts/failure_archive.py"
+    ".github/scripts/workflow_patch.py"
+    ".github/scripts/workflow_index.py"
+    ".github/scripts/workflow_lint.py"
+    ".github/scripts/path_policy.py"
+    ".github/scripts/git_diff.py"
+    ".github/scripts/diff_scanner.py"
+    ".github/scripts/review_cache.py"
 )
 
 for script in "${SCRIPTS[@]}"; do
@@ -85,11 +106,11 @@ fi
 
 # Check requirements.txt
 if [ -f "requirements.txt" ]; then
-    # Check if PyGithub is there
-    if grep -q "PyGithub" requirements.txt; then
-        echo "  ✅ requirements.txt (has PyGithub)"
+    # Check if requests is there (used by the shared GitHub client)
+    if grep -q "^requests" requirements.txt; then
+        echo "  ✅ requirements.txt (has requests)"
     else
-        echo "  ⚠️  requirements.txt missing PyGithub dependency"
+        echo "  ⚠️  requirements.txt missing requests dependency"
         WARNINGS=$((WARNINGS + 1))
     fi
 else